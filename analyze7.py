@@ -1,163 +1,34 @@
-import random
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import os
 import datetime
 from pathlib import Path
-import sys 
+import sys
+
+from mondrian.batch import run_batch
+from mondrian.derivation import generate_l_system_string
+from mondrian.engine import get_engine
+from mondrian.render import save_composition_png
 
 # ----------------------------------------------------------------------
-# 伍吉布吉配置 (V6.0)
+# L-System 规则、颜色与解释规则见 mondrian/profiles.py 中的 'v6_boogie_woogie' 配置
 # ----------------------------------------------------------------------
-MONDRIAN_EARLY_RULES = {
-    'S': [
-        (0.40, 'H[S][S]'), # 增加分割概率
-        (0.40, 'V[S][S]'), # 增加分割概率
-        (0.20, 'F')        # 降低终止概率，强制进行更细致的分割 (0.4+0.4+0.2=1.0)
-    ],
-}
-
-# 主要填充颜色：增加原色比重，降低白色，以模拟伍吉布吉的密集色彩。
-COLORS = ['white'] * 20 + ['red', 'yellow', 'blue'] * 6 + ['0.9']*10 
-
-# --- 关键修改 1: 网格颜色配置 ---
-# 模拟伍吉布吉的动态线条（网格元素）：以黄红为主，灰色为辅。
-GRID_COLORS = ['red', 'yellow'] * 5 + ['0.9'] * 2 
-# ----------------------------------
+ENGINE = get_engine('v6_boogie_woogie')
+MONDRIAN_EARLY_RULES = ENGINE.profile.rules
 
-SPLIT_RATIOS = [0.25, 0.33, 0.4, 0.6, 0.67, 0.75]
-MIN_SIZE = 0.005 
-
-# 随机线条粗细配置 (保持不变，用于彩色网格元素)
-LINE_WIDTH_BASE = 0.005
-LINE_WIDTH_DEVIATION = 0.001 
-LINE_WIDTH_MIN = LINE_WIDTH_BASE - LINE_WIDTH_DEVIATION
-LINE_WIDTH_MAX = LINE_WIDTH_BASE + LINE_WIDTH_DEVIATION
+# 解释器 (线性扫描、非递归) 与流式模式
+interpret_mondrian_functional = ENGINE.interpret
+stream_mondrian_functional = ENGINE.stream
 
 # ----------------------------------------------------------------------
-# L-System 字符串生成函数 (保持不变)
+# 绘图函数 (保存图像)
 # ----------------------------------------------------------------------
-def generate_l_system_string(axiom, rules, iterations):
-    current_string = axiom
-    for i in range(iterations):
-        next_string = []
-        for char in current_string:
-            if char in rules:
-                successors = [item[1] for item in rules[char]]
-                probabilities = [item[0] for item in rules[char]]
-                chosen_successor = random.choices(successors, weights=probabilities, k=1)[0]
-                next_string.append(chosen_successor)
-            else:
-                next_string.append(char)
-        current_string = "".join(next_string)
-    return current_string
-
-# ----------------------------------------------------------------------------------
-# parse_and_subdivide 函数 (移除过细分割排斥逻辑，线条着色)
-# ----------------------------------------------------------------------------------
-def parse_and_subdivide(l_string, rect, required_colors_set):
-    x, y, w, h = rect
-    final_rects = []
-
-    if not l_string:
-        return "", []
-
-    char = l_string[0]
-    rest_string = l_string[1:]
-
-    if char == 'F':
-        if w > MIN_SIZE and h > MIN_SIZE:
-            fill_color = random.choice(COLORS)
-            if required_colors_set:
-                fill_color = required_colors_set.pop() 
-            final_rects.append((x, y, w, h, fill_color))
-        return rest_string, final_rects 
-
-    elif char == 'H' or char == 'V':
-        
-        current_line_width = random.uniform(LINE_WIDTH_MIN, LINE_WIDTH_MAX)
-        
-        # 使用随机宽度检查最小尺寸
-        if (char == 'H' and h < 2 * MIN_SIZE + current_line_width) or \
-           (char == 'V' and w < 2 * MIN_SIZE + current_line_width):
-            if w > MIN_SIZE and h > MIN_SIZE:
-                 fill_color = random.choice(COLORS)
-                 if required_colors_set:
-                     fill_color = required_colors_set.pop()
-                 final_rects.append((x, y, w, h, fill_color))
-            return rest_string, final_rects
-            
-        # --- 关键修改 2: 移除分割比例重选逻辑，直接使用随机比例 ---
-        split_ratio = random.choice(SPLIT_RATIOS)
-        
-        # 几何计算
-        if char == 'H':
-            total_h1 = h * split_ratio
-            rect1 = (x, y, w, total_h1 - current_line_width / 2)
-            line_rect = (x, y + total_h1 - current_line_width / 2, w, current_line_width)
-            rect2 = (x, y + total_h1 + current_line_width / 2, w, h - total_h1 - current_line_width / 2)
-        else: # V
-            total_w1 = w * split_ratio
-            rect1 = (x, y, total_w1 - current_line_width / 2, h)
-            line_rect = (x + total_w1 - current_line_width / 2, y, current_line_width, h)
-            rect2 = (x + total_w1 + current_line_width / 2, y, w - total_w1 - current_line_width / 2, h)
-
-        # --- 关键修改 3: 网格着色（不再是黑色） ---
-        grid_color = random.choice(GRID_COLORS)
-        final_rects.append((line_rect[0], line_rect[1], line_rect[2], line_rect[3], grid_color))
-        # ---------------------------------------------
-        
-        # 递归调用
-        if rest_string and rest_string[0] == '[':
-            rest_string = rest_string[1:]
-            remaining_after_s1, rects_s1 = parse_and_subdivide(rest_string, rect1, required_colors_set)
-            final_rects.extend(rects_s1)
-            rest_string = remaining_after_s1
-            if rest_string and rest_string[0] == ']':
-                rest_string = rest_string[1:]
-
-        if rest_string and rest_string[0] == '[':
-            rest_string = rest_string[1:]
-            remaining_after_s2, rects_s2 = parse_and_subdivide(rest_string, rect2, required_colors_set)
-            final_rects.extend(rects_s2)
-            rest_string = remaining_after_s2
-            if rest_string and rest_string[0] == ']':
-                rest_string = rest_string[1:]
-
-        return rest_string, final_rects
-    
-    elif char == ']':
-        return rest_string, []
-
-    return rest_string, []
-
-# ... (interpret_mondrian_functional, plot_and_save_composition, 主程序 if __name__ == '__main__': 保持不变) ...
-def interpret_mondrian_functional(l_string, initial_rect=(0, 0, 1, 1)):
-    all_primaries = ['red', 'yellow', 'blue']
-    required_colors_list = random.sample(all_primaries, 2)
-    required_colors = set(required_colors_list)
-    _, final_rects = parse_and_subdivide(l_string, initial_rect, required_colors)
-    return final_rects
-
 def plot_and_save_composition(rect_data, file_path):
-    fig, ax = plt.subplots(1, figsize=(8, 8))
-    ax.set_aspect('equal', adjustable='box')
-    ax.set_xlim(0, 1)
-    ax.set_ylim(0, 1)
-    ax.set_axis_off()
-    
-    ax.add_patch(patches.Rectangle((0, 0), 1, 1, facecolor='white', linewidth=0)) 
-
-    for x, y, w, h, color in rect_data:
-        rect = patches.Rectangle((x, y), w, h, linewidth=0, facecolor=color)
-        ax.add_patch(rect)
-        
-    plt.savefig(file_path, bbox_inches='tight', pad_inches=0.1)
-    plt.close(fig) 
+    # 直接栅格化到 uint8 缓冲区并写出 PNG，不再为每个矩形创建 matplotlib patch
+    save_composition_png(rect_data, file_path)
 
 if __name__ == '__main__':
     
     NUM_IMAGES = 100
+    NUM_WORKERS = None # None 表示使用全部 CPU 核心
+    SEED = None # 批次种子，固定后可复现整批图像
     BASE_DIR = "mondrian_compositions"
     
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -174,40 +45,8 @@ if __name__ == '__main__':
         print(f"错误详情: {e}", file=sys.stderr)
         sys.exit(1)
 
-    total_rects = 0
-    axiom = 'S'
-    # --- 关键修改 4: 增加迭代次数，实现更细致的分割 ---
-    iterations = 6 
-    # ----------------------------------------------------
-    
-    for i in range(1, NUM_IMAGES + 1):
-        try:
-            l_string = ''
-            while len(l_string) <= 1:
-                l_string = generate_l_system_string(axiom, MONDRIAN_EARLY_RULES, iterations)
-            
-            rectangles = interpret_mondrian_functional(l_string, initial_rect=(0, 0, 1, 1)) 
-            
-            if not rectangles:
-                 print(f"警告: 图像 {i} 未能生成任何矩形。跳过保存。", file=sys.stderr)
-                 continue 
-                 
-            file_name = f"composition_{i:03d}.png"
-            file_path = output_path / file_name
-            plot_and_save_composition(rectangles, file_path)
-            
-            total_rects += len(rectangles)
-            
-            if i % 10 == 0 or i == 1:
-                print(f"进度: {i}/{NUM_IMAGES} 张图像已保存。矩形数: {len(rectangles)}个。")
-
-        except Exception as e:
-            print(f"\n致命错误: 图像 {i} 绘制或保存时发生异常。", file=sys.stderr)
-            print(f"错误详情: {e}", file=sys.stderr)
-            print("--- 终止批量生成 ---", file=sys.stderr)
-            sys.exit(1)
-
-    avg_rects = total_rects / NUM_IMAGES if NUM_IMAGES > 0 else 0
-    print("\n--- 批量生成完成 ---")
-    print(f"总共生成 {NUM_IMAGES} 张图像。")
-    print(f"平均每张图像包含 {avg_rects:.1f} 个矩形/线条元素。")
\ No newline at end of file
+    # 迭代次数与字符串长度要求 (min_length) 见 Profile
+    # 每张图像的推导、解释和保存都在工作进程中完成，单张失败只记录、不终止整个批次
+    report = run_batch(ENGINE.derive, ENGINE.interpret, NUM_IMAGES, output_path,
+                       seed=SEED, workers=NUM_WORKERS, save=plot_and_save_composition)
+    report.print_summary()
@@ -0,0 +1,36 @@
+# ----------------------------------------------------------------------
+# 基准：逐个 generate_l_system_string vs. 向量化批量推导
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_derivation.py [构图数量]
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analyze9 import MONDRIAN_EARLY_RULES, generate_l_system_string
+from mondrian.vectorized import generate_l_system_batch
+
+ITERATIONS = 8
+SERIAL_SAMPLE = 5000 # 逐个生成太慢，只计时一部分再按比例折算
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    random.seed(0)
+    start = time.perf_counter()
+    serial_lengths = [len(generate_l_system_string('S', MONDRIAN_EARLY_RULES, ITERATIONS))
+                      for _ in range(SERIAL_SAMPLE)]
+    serial_time = (time.perf_counter() - start) * n / SERIAL_SAMPLE
+
+    start = time.perf_counter()
+    batch = generate_l_system_batch('S', MONDRIAN_EARLY_RULES, ITERATIONS, n, np.random.default_rng(0))
+    batch_time = time.perf_counter() - start
+
+    print(f"构图数量: {n}，迭代次数: {ITERATIONS}")
+    print(f"逐个生成 (按 {SERIAL_SAMPLE} 个折算): {serial_time:.2f} 秒，平均长度 {np.mean(serial_lengths):.1f}")
+    print(f"向量化批量生成: {batch_time:.2f} 秒，平均长度 {np.mean([s.size for s in batch]):.1f}")
+    print(f"加速比: {serial_time / batch_time:.1f}x")
@@ -0,0 +1,60 @@
+# ----------------------------------------------------------------------
+# 基准：逐尺度 np.histogram2d vs. BoxCounter 一次量化
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_fractal.py [点数]
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from mondrian.fractal import box_counts, fit_dimension
+
+# 谢尔宾斯基垫片的三个顶点
+VERTICES = np.array([(0, 0), (1, 0), (0.5, np.sqrt(3) / 2)])
+
+
+def histogram_counts(points, epsilons):
+    """原 lsystem1.py 的写法：每个尺度重新构造网格并做一次完整的二维直方图。"""
+    X, Y = points[:, 0], points[:, 1]
+    counts = []
+    for epsilon in epsilons:
+        bins_x = np.arange(X.min(), X.max() + epsilon, epsilon)
+        bins_y = np.arange(Y.min(), Y.max() + epsilon, epsilon)
+        H, _, _ = np.histogram2d(X, Y, bins=[bins_x, bins_y])
+        counts.append(np.sum(H > 0))
+    return np.array(counts)
+
+
+if __name__ == '__main__':
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1000000
+    rng = np.random.default_rng(0)
+    # 垫片上的点：x = Σ v_{d_k} / 2^k，每个点取 24 位随机三进制数字
+    digits = rng.integers(0, 3, (n, 24))
+    weights = 0.5 ** np.arange(1, 25)
+    points = np.stack([VERTICES[digits, 0] @ weights, VERTICES[digits, 1] @ weights], axis=1)
+    del digits
+    epsilons = np.exp(-np.linspace(0.5, 5, 20))
+
+    start = time.perf_counter()
+    reference = histogram_counts(points, epsilons)
+    histogram_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, counts = box_counts(points, epsilons)
+    engine_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dyadic_eps, dyadic = box_counts(points)
+    dyadic_time = time.perf_counter() - start
+
+    print(f"{n} 个点，{len(epsilons)} 个尺度")
+    print(f"逐尺度直方图: {histogram_time:7.3f} 秒，D = {fit_dimension(epsilons, reference)[0]:.4f}")
+    print(f"一次量化:     {engine_time:7.3f} 秒 ({histogram_time / engine_time:.1f}x)，"
+          f"D = {fit_dimension(epsilons, counts)[0]:.4f}，各尺度计数最大差异 {np.abs(counts - reference).max()}")
+    # 只用与上面相同尺度范围内的二进尺度拟合 (更细的尺度上点数不足以填满格子)
+    in_range = (dyadic_eps >= epsilons.min()) & (dyadic_eps <= epsilons.max())
+    print(f"全部 {len(dyadic)} 个二进尺度: {dyadic_time:7.3f} 秒，"
+          f"D = {fit_dimension(dyadic_eps[in_range], dyadic[in_range])[0]:.4f} (同一尺度范围内拟合)")
@@ -0,0 +1,67 @@
+# ----------------------------------------------------------------------
+# 基准：shapely 多边形网格单元 vs. NumPy 边界数组
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_grid.py [每个方向的网格线数量]
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from revies1 import grid_stats
+from mondrian.lines import grid_cells
+
+
+def shapely_cells(h_lines, v_lines):
+    """原 build_dcel_and_stats 的写法：每个单元一个 shapely Polygon，只读取面积。"""
+    from shapely.geometry import Polygon
+    rects, areas = [], []
+    for y1, y2 in zip(h_lines[:-1], h_lines[1:]):
+        for x1, x2 in zip(v_lines[:-1], v_lines[1:]):
+            poly = Polygon([(x1, y1), (x2, y1), (x2, y2), (x1, y2)])
+            rects.append(poly)
+            areas.append(poly.area)
+    return rects, np.array(areas)
+
+
+def import_seconds(statement, repeat=5):
+    """在新的解释器中执行 statement 的最短耗时 (包括解释器启动)。"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], cwd=ROOT, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = np.random.default_rng(0)
+    h_lines = np.unique(rng.integers(0, 6000, n)).tolist()
+    v_lines = np.unique(rng.integers(0, 6000, n)).tolist()
+
+    start = time.perf_counter()
+    rects, areas = shapely_cells(h_lines, v_lines)
+    reference = grid_stats(areas, len(h_lines), len(v_lines))
+    shapely_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bounds, fast_areas = grid_cells(h_lines, v_lines)
+    stats = grid_stats(fast_areas, len(h_lines), len(v_lines))
+    numpy_time = time.perf_counter() - start
+
+    same_bounds = np.array_equal(np.array([poly.bounds for poly in rects]), bounds)
+    same_stats = all(np.isclose(reference[k], stats[k]) for k in stats)
+    print(f"{len(areas)} 个网格单元：shapely {shapely_time * 1000:.1f} 毫秒，NumPy {numpy_time * 1000:.2f} 毫秒 "
+          f"(加速 {shapely_time / numpy_time:.0f} 倍)；边界{'一致' if same_bounds else '不一致'}，"
+          f"统计量{'一致' if same_stats else '不一致'}")
+
+    baseline = import_seconds('import cv2, numpy')
+    legacy = import_seconds('import cv2, numpy, tqdm; from shapely.geometry import Polygon; from shapely.ops import unary_union')
+    current = import_seconds('import revies1')
+    print(f"启动耗时 (最短 / 5 次)：cv2 + numpy {baseline:.3f} 秒；再加 shapely + tqdm {legacy:.3f} 秒；"
+          f"import revies1 {current:.3f} 秒")
@@ -0,0 +1,96 @@
+# ----------------------------------------------------------------------
+# 基准：断头台分解——积分图差分 vs. 每个节点重新投影像素
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_inverse.py [生成构图的数量]
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import cv2
+import numpy as np
+
+import mondrian.inverse as inverse
+from mondrian.colors import BLACK, label_colors
+from mondrian.engine import MondrianEngine
+from mondrian.profiles import get_profile
+from mondrian.render import DEFAULT_PAD, DEFAULT_SIZE, render_rects
+from mondrian.seeding import CompositionStreams
+from revies1 import IMG_PATH
+
+
+def naive_decompose(mask, rect=None):
+    """同一算法，但每个节点都对子数组重新求行/列和 (逐层 O(像素数))。"""
+    original = inverse._profiles
+
+    def profiles(table, x0, y0, x1, y1):
+        block = mask[y0:y1, x0:x1]
+        return np.count_nonzero(block, axis=1), np.count_nonzero(block, axis=0)
+
+    inverse._profiles = profiles
+    try:
+        return inverse.guillotine_decompose(mask, rect)
+    finally:
+        inverse._profiles = original
+
+
+def best_of(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def flatten(l_string):
+    """把同方向的嵌套切割展平 (H[a][H[b][c]] 与 H[H[a][b]][c] 视为相同)，用于比较推导树。"""
+    pos = 0
+
+    def node():
+        nonlocal pos
+        char = l_string[pos]
+        pos += 1
+        if char not in 'HV' or pos >= len(l_string) or l_string[pos] != '[':
+            return 'F'
+        children = []
+        for _ in range(2):
+            pos += 1
+            child = node()
+            pos += 1
+            children += child[1] if child[0] == char else [child]
+        return char, children
+
+    def text(tree):
+        return tree if tree == 'F' else tree[0] + '(' + ','.join(text(c) for c in tree[1]) + ')'
+
+    return text(node())
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    mask = label_colors(cv2.imread(str(ROOT / IMG_PATH))) == BLACK
+    fast_time, tree = best_of(lambda: inverse.guillotine_decompose(mask))
+    naive_time, reference = best_of(lambda: naive_decompose(mask))
+    print(f"扫描件 {mask.shape[1]}×{mask.shape[0]}：{tree.l_string} (深度 {tree.depth})")
+    print(f"  积分图 {fast_time * 1000:.1f} 毫秒，逐节点投影 {naive_time * 1000:.1f} 毫秒；"
+          f"结果{'相同' if reference.l_string == tree.l_string else '不同'}")
+
+    # 往返：推导 -> 解释 -> 栅格化 -> 逆向分解，与原字符串 (未展开的 S 视为 F) 比较展平后的推导树
+    rect = (DEFAULT_PAD, DEFAULT_PAD, DEFAULT_PAD + DEFAULT_SIZE, DEFAULT_PAD + DEFAULT_SIZE)
+    for name in ('v2', 'v3', 'v5'):
+        engine = MondrianEngine(get_profile(name))
+        same = 0
+        elapsed = 0.0
+        for index in range(1, n + 1):
+            streams = CompositionStreams(0, index)
+            l_string = engine.derive(streams)
+            img = np.ascontiguousarray(render_rects(engine.interpret(l_string, streams=streams))[:, :, ::-1])
+            start = time.perf_counter()
+            recovered = inverse.guillotine_decompose(label_colors(img) == BLACK, rect)
+            elapsed += time.perf_counter() - start
+            same += flatten(recovered.l_string) == flatten(l_string.replace('S', 'F'))
+        print(f"{name}：{same}/{n} 幅构图恢复出相同的推导树 (含颜色分类每幅 {elapsed / n * 1000:.2f} 毫秒)")
@@ -0,0 +1,34 @@
+# ----------------------------------------------------------------------
+# 基准：先推导完整字符串再解释 (compose) vs. 推导与解释融合 (compose_lazy)
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_lazy.py [每个配置的构图数量]
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mondrian.engine import get_engine
+from mondrian.profiles import PROFILES
+from mondrian.seeding import CompositionStreams
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    # PROFILES 中同一配置有多个别名，按配置名去重
+    for name in dict.fromkeys(profile.name for profile in PROFILES.values()):
+        engine = get_engine(name)
+        full_symbols = sum(len(engine.derive(CompositionStreams(0, index))) for index in range(n))
+
+        start = time.perf_counter()
+        for index in range(n):
+            engine.compose(CompositionStreams(0, index))
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        lazy_symbols = sum(engine.compose_lazy(CompositionStreams(0, index))[1] for index in range(n))
+        lazy_time = time.perf_counter() - start
+
+        saved = 1 - lazy_symbols / full_symbols
+        print(f"{name:>18}: 平均推导 {full_symbols / n:7.1f} -> {lazy_symbols / n:7.1f} 个符号 (省去 {saved:6.1%})，"
+              f"{full_time / n * 1000:6.2f} -> {lazy_time / n * 1000:6.2f} 毫秒/幅")
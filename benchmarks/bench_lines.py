@@ -0,0 +1,67 @@
+# ----------------------------------------------------------------------
+# 基准：逐次降阈值的 cv2.HoughLines vs. 轴对齐投影 / 限定角度 Hough
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_lines.py [图像路径]
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cv2
+import numpy as np
+
+from mondrian.colors import BLACK, label_colors
+from mondrian.lines import detect_grid_lines, edge_map
+
+DEFAULT_IMAGE = 'Piet_Mondriaan,_1930_-_Mondrian_Composition_II_in_Red,_Blue,_and_Yellow.jpg'
+
+
+def legacy_lines(img_bgr):
+    """原 build_dcel_and_stats 的写法 (包括 Canny)，返回 (θ≈0 的 ρ, θ≈π/2 的 ρ) 与变换次数。"""
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(gray, 50, 150)
+    lines = cv2.HoughLines(edges, 1, np.pi / 180, 2000)
+    runs = 1
+    thresh = 2000
+    while lines is None and thresh > 100:
+        thresh -= 200
+        lines = cv2.HoughLines(edges, 1, np.pi / 180, thresh)
+        runs += 1
+    theta0, theta90 = [], []
+    for rho, theta in (lines[:, 0] if lines is not None else []):
+        if abs(theta) < np.pi / 180:
+            theta0.append(int(rho))
+        elif abs(theta - np.pi / 2) < np.pi / 180:
+            theta90.append(int(rho))
+    return sorted(set(theta0)), sorted(set(theta90)), runs
+
+
+def best_of(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_IMAGE
+    img = cv2.imread(path)
+    if img is None:
+        sys.exit(f"无法读取图像: {path}")
+    print(f"{path}: {img.shape[1]}×{img.shape[0]} 像素")
+
+    legacy_time, (theta0, theta90, runs) = best_of(lambda: legacy_lines(img))
+    print(f"cv2.HoughLines 降阈值: {legacy_time:.3f} 秒 ({runs} 次变换)，"
+          f"θ≈0: {len(theta0)} 条，θ≈π/2: {len(theta90)} 条")
+    for method in ('projection', 'hough'):
+        elapsed, (h_lines, v_lines) = best_of(lambda: detect_grid_lines(edge_map(img), method=method))
+        print(f"{method}: {elapsed:.3f} 秒 (加速 {legacy_time / elapsed:.1f} 倍)，"
+              f"水平线 {len(h_lines)} 条 {h_lines}，竖直线 {len(v_lines)} 条 {v_lines}")
+    # 低票数初筛 + 黑色线条确认 (revies1.build_dcel 的用法)：只画到另一条线条为止的短线条也能找到
+    black = label_colors(img) == BLACK
+    elapsed, (h_lines, v_lines) = best_of(lambda: detect_grid_lines(edge_map(img), black=black))
+    print(f"projection + 黑色确认: {elapsed:.3f} 秒，"
+          f"水平线 {len(h_lines)} 条 {h_lines}，竖直线 {len(v_lines)} 条 {v_lines}")
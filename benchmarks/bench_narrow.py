@@ -0,0 +1,54 @@
+# ----------------------------------------------------------------------
+# 基准：analyze6.py 的过细分割逐次重选 vs. NarrowSplitTable 直接抽样
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_narrow.py [抽样次数]
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mondrian.engine import NarrowSplitTable, get_engine
+
+
+def retry_split(split_ratios, threshold, retry_probability, max_attempts, size):
+    """原 analyze6.py 的写法：抽取、检查，过细时最多重选 max_attempts 次。"""
+    split_ratio = random.choice(split_ratios)
+    is_narrow_split = min(split_ratio, 1 - split_ratio) * size < threshold
+    if is_narrow_split and random.random() < retry_probability:
+        attempt = 0
+        while is_narrow_split and attempt < max_attempts:
+            split_ratio = random.choice(split_ratios)
+            is_narrow_split = min(split_ratio, 1 - split_ratio) * size < threshold
+            attempt += 1
+    return split_ratio
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    profile = get_engine('v5').profile
+    ratios = list(profile.split_ratios)
+    table = NarrowSplitTable(ratios, profile.narrow_threshold, profile.narrow_retry_probability,
+                             profile.narrow_max_attempts)
+    random.seed(0)
+    # analyze6.py 中待分割区域的边长大多在 0.1 ~ 1 之间
+    sizes = [random.uniform(0.1, 1.0) for _ in range(n)]
+
+    start = time.perf_counter()
+    retried = [retry_split(ratios, profile.narrow_threshold, profile.narrow_retry_probability,
+                           profile.narrow_max_attempts, size) for size in sizes]
+    retry_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sampled = [table.sample(size, random) for size in sizes]
+    table_time = time.perf_counter() - start
+
+    print(f"逐次重选: {retry_time / n * 1e9:7.0f} 纳秒/次")
+    print(f"直接抽样: {table_time / n * 1e9:7.0f} 纳秒/次 ({retry_time / table_time:.1f}x)")
+
+    # 两种方式的比例频率应在抽样误差范围内一致
+    a, b = Counter(retried), Counter(sampled)
+    worst = max(abs(a[r] - b[r]) / n for r in ratios)
+    print(f"各比例频率的最大差异: {worst:.4f}")
@@ -0,0 +1,29 @@
+# ----------------------------------------------------------------------
+# 基准：在同一进程中依次运行全部版本配置
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_profiles.py [每个配置的构图数量]
+import random
+import sys
+import time
+from pathlib import Path
+
+start = time.perf_counter()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mondrian.engine import get_engine
+from mondrian.profiles import profile_names
+
+import_time = time.perf_counter() - start
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    print(f"导入引擎: {import_time * 1000:.0f} 毫秒 (不导入 matplotlib: {'matplotlib' not in sys.modules})")
+    random.seed(0)
+    for name in profile_names():
+        engine = get_engine(name)
+        engine.derive() # 预热 (长度窗口采样器的动态规划只做一次)
+        start = time.perf_counter()
+        num_rects = sum(len(engine.compose()) for _ in range(n))
+        elapsed = time.perf_counter() - start
+        print(f"{name:>20}: {elapsed / n * 1e6:8.1f} 微秒/幅，平均 {num_rects / n:6.1f} 个矩形")
@@ -0,0 +1,54 @@
+# ----------------------------------------------------------------------
+# 基准：栅格化边界再盒计数 vs. rect_box_counts 直接按边计数
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_rect_dimension.py [构图数量] [配置]
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from mondrian.engine import get_engine
+from mondrian.fractal import DEFAULT_RECT_LEVELS, rect_box_counts
+from mondrian.seeding import CompositionStreams
+
+
+def raster_counts(rects, levels):
+    """逐级把每条边画进占据网格 (每条边一次切片赋值)，再统计非空格子。"""
+    counts = []
+    white = rects.palette.index('white')
+    boxes = [(x, y, w, h) for x, y, w, h, c in zip(rects.x.astype(float), rects.y.astype(float),
+                                                    rects.w.astype(float), rects.h.astype(float),
+                                                    rects.color.tolist())
+             if c != white and w > 0 and h > 0]
+    for k in levels:
+        n = 1 << k
+        grid = np.zeros((n, n), dtype=bool)
+        cell = lambda v: min(max(int(np.floor(v * n)), 0), n - 1)
+        for x, y, w, h in boxes:
+            x0, x1, y0, y1 = cell(x), cell(x + w), cell(y), cell(y + h)
+            grid[y0, x0:x1 + 1] = grid[y1, x0:x1 + 1] = True
+            grid[y0:y1 + 1, x0] = grid[y0:y1 + 1, x1] = True
+        counts.append(np.count_nonzero(grid))
+    return counts
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    profile = sys.argv[2] if len(sys.argv) > 2 else 'v10'
+    engine = get_engine(profile)
+    batches = [engine.compose(CompositionStreams(0, index)) for index in range(1, n + 1)]
+    print(f"{profile}: {n} 幅构图，平均 {np.mean([len(r) for r in batches]):.1f} 个矩形")
+
+    start = time.perf_counter()
+    reference = np.array([raster_counts(rects, DEFAULT_RECT_LEVELS) for rects in batches])
+    raster_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    counts = rect_box_counts(batches)
+    edge_time = time.perf_counter() - start
+
+    print(f"栅格化计数: {raster_time:7.3f} 秒")
+    print(f"按边计数:   {edge_time:7.3f} 秒 ({raster_time / edge_time:.1f}x)，结果相同: {bool((counts == reference).all())}")
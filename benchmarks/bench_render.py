@@ -0,0 +1,73 @@
+# ----------------------------------------------------------------------
+# 基准：matplotlib patches + savefig vs. 直接栅格化 + 索引色 PNG
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_render.py [构图数量]
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.image as mpimg
+import matplotlib.patches as patches
+import matplotlib.pyplot as plt
+import numpy as np
+
+from analyze8 import MONDRIAN_EARLY_RULES, interpret_mondrian_functional
+from mondrian.render import render_rects, save_composition_png
+from mondrian.sampler import LengthBoundedSampler
+
+ITERATIONS = 8
+
+
+def matplotlib_save(rect_data, file_path):
+    """原 plot_and_save_composition 的实现，作为对照。"""
+    fig, ax = plt.subplots(1, figsize=(8, 8))
+    ax.set_aspect('equal', adjustable='box')
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    ax.set_axis_off()
+    ax.add_patch(patches.Rectangle((0, 0), 1, 1, facecolor='white', linewidth=0))
+    for x, y, w, h, color in rect_data:
+        ax.add_patch(patches.Rectangle((x, y), w, h, linewidth=0, facecolor=color))
+    plt.savefig(file_path, bbox_inches='tight', pad_inches=0.1)
+    plt.close(fig)
+
+
+if __name__ == '__main__':
+    num_images = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    random.seed(0)
+    sampler = LengthBoundedSampler('S', MONDRIAN_EARLY_RULES, ITERATIONS, 200, 1000)
+    compositions = [interpret_mondrian_functional(sampler.sample()) for _ in range(num_images)]
+    num_rects = sum(len(c) for c in compositions)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for i, rect_data in enumerate(compositions):
+            matplotlib_save(rect_data, Path(tmp) / f"mpl_{i}.png")
+        mpl_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i, rect_data in enumerate(compositions):
+            save_composition_png(rect_data, Path(tmp) / f"raster_{i}.png")
+        raster_time = time.perf_counter() - start
+
+        # 与 matplotlib 输出逐像素比较 (允许抗锯齿造成的轻微差异)
+        mismatch = []
+        for i, rect_data in enumerate(compositions):
+            reference = mpimg.imread(Path(tmp) / f"mpl_{i}.png")[..., :3]
+            image = render_rects(rect_data) / 255.0
+            if reference.shape != image.shape:
+                mismatch.append(1.0)
+                continue
+            mismatch.append(float((np.abs(reference - image).max(axis=-1) > 0.1).mean()))
+
+    print(f"{num_images} 幅构图，共 {num_rects} 个矩形 (平均每幅 {num_rects / num_images:.0f} 个)")
+    print(f"matplotlib: {mpl_time / num_images * 1000:.1f} 毫秒/幅")
+    print(f"直接栅格化: {raster_time / num_images * 1000:.2f} 毫秒/幅 (加速 {mpl_time / raster_time:.0f} 倍)")
+    print(f"像素差异比例: 平均 {np.mean(mismatch):.4%}，最大 {np.max(mismatch):.4%}")
@@ -0,0 +1,41 @@
+# ----------------------------------------------------------------------
+# 基准：拒绝采样 vs. 按长度窗口条件化的直接采样
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_sampler.py [最小长度] [最大长度]
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analyze9 import MONDRIAN_EARLY_RULES, generate_l_system_string
+from mondrian.sampler import LengthBoundedSampler
+
+ITERATIONS = 8
+NUM_SAMPLES = 5000
+
+if __name__ == '__main__':
+    min_len = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    max_len = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    random.seed(0)
+    start = time.perf_counter()
+    draws = 0
+    for _ in range(NUM_SAMPLES):
+        l_string = ''
+        while len(l_string) < min_len or len(l_string) > max_len:
+            l_string = generate_l_system_string('S', MONDRIAN_EARLY_RULES, ITERATIONS)
+            draws += 1
+    rejection_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sampler = LengthBoundedSampler('S', MONDRIAN_EARLY_RULES, ITERATIONS, min_len, max_len)
+    for _ in range(NUM_SAMPLES):
+        sampler.sample()
+    direct_time = time.perf_counter() - start
+
+    print(f"长度窗口 [{min_len}, {max_len}]，{NUM_SAMPLES} 个样本")
+    print(f"理论接受率: {sampler.acceptance_rate:.1%}，实测: {NUM_SAMPLES / draws:.1%} ({draws} 次完整生成)")
+    print(f"拒绝采样: {rejection_time:.2f} 秒")
+    print(f"直接采样 (含动态规划预处理): {direct_time:.2f} 秒")
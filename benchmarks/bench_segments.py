@@ -0,0 +1,74 @@
+# ----------------------------------------------------------------------
+# 基准：逐个生成破碎线条小方块 vs. SegmentTiling 一次性铺设
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_segments.py [构图数量]
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from mondrian.engine import get_engine
+from mondrian.interpreter import run_subdivision
+from mondrian.rects import SHARED_PALETTE
+from mondrian.seeding import CompositionStreams
+
+
+def loop_tiling(tiling, lines):
+    """原 analyze9.py 的写法：每个小方块一次尺寸检查、一次 random.random() 和一次 random.choice()。"""
+    rects = []
+    for lx, ly, horizontal, num_segments, step, extent, cross in lines:
+        for seg_i in range(int(num_segments)):
+            x = lx + seg_i * step if horizontal else lx
+            y = ly if horizontal else ly + seg_i * step
+            w = extent if horizontal else cross
+            h = cross if horizontal else extent
+            if w >= tiling.min_size and h >= tiling.min_size and \
+               w <= tiling.max_dim and h <= tiling.max_dim and max(w / h, h / w) <= tiling.max_aspect:
+                color = random.choice(tiling.grid_colors) if random.random() < tiling.fill_probability else 'white'
+            else:
+                color = 'white'
+            rects.append((x, y, w, h, color))
+    return rects
+
+
+class _Recorder:
+    """只记录 step 交给 LineSegments 的线条参数。"""
+
+    def __init__(self):
+        self.lines = []
+
+    def add(self, final_rects, lx, ly, horizontal, num_segments, step, extent, cross):
+        self.lines.append((lx, ly, 1.0 if horizontal else 0.0, num_segments, step, extent, cross))
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    engine = get_engine('v11')
+    tiling = engine.tiling
+
+    # 收集 n 幅构图中所有线条的参数 (从较小的初始区域开始解释，避免整页被严格检查直接留白)
+    recorder = _Recorder()
+    for index in range(n):
+        streams = CompositionStreams(0, index)
+        run_subdivision(engine.derive(streams), (0, 0, 0.08, 0.08), engine.step, streams.interpretation,
+                        None, recorder, out=[])
+    lines = recorder.lines
+    num_segments = int(sum(line[3] for line in lines))
+    print(f"{n} 幅构图，{len(lines)} 条线条，{num_segments} 个小方块")
+
+    start = time.perf_counter()
+    loop_tiling(tiling, lines)
+    loop_time = time.perf_counter() - start
+
+    uniforms = np.random.default_rng(0).random((num_segments, 2))
+    tiling.tile(np.array(lines[:1], dtype=np.float64), SHARED_PALETTE, uniforms[:int(lines[0][3])]) # 预热
+    start = time.perf_counter()
+    tiling.tile(np.array(lines, dtype=np.float64), SHARED_PALETTE, uniforms)
+    vector_time = time.perf_counter() - start
+
+    print(f"逐个生成: {loop_time * 1000:8.2f} 毫秒")
+    print(f"一次铺设: {vector_time * 1000:8.2f} 毫秒 ({loop_time / vector_time:.1f}x)")
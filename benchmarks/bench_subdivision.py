@@ -0,0 +1,67 @@
+# ----------------------------------------------------------------------
+# 基准：全网格单元 vs. 扫描线平面剖分
+# ----------------------------------------------------------------------
+# 用法 (在仓库根目录)：python benchmarks/bench_subdivision.py [随机剖分的最大深度]
+import glob
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import cv2
+import numpy as np
+
+from revies1 import IMG_PATH, build_dcel, build_dcel_and_stats
+from mondrian.colors import BLACK, label_colors
+from mondrian.lines import detect_grid_lines, edge_map, grid_cells
+from mondrian.subdivision import planar_subdivision
+
+
+def random_guillotine(rng, depth, size):
+    """递归随机切分 size×size 的画布，返回 (水平线段, 竖直线段, 矩形数)。"""
+    horizontal, vertical = [], []
+    stack = [(0, 0, size, size, depth)]
+    count = 0
+    while stack:
+        x0, y0, x1, y1, d = stack.pop()
+        if d == 0 or x1 - x0 < 4 or y1 - y0 < 4:
+            count += 1
+            continue
+        if rng.random() < 0.5:
+            y = int(rng.integers(y0 + 1, y1 - 1))
+            horizontal.append((y, x0, x1))
+            stack += [(x0, y0, x1, y, d - 1), (x0, y, x1, y1, d - 1)]
+        else:
+            x = int(rng.integers(x0 + 1, x1 - 1))
+            vertical.append((x, y0, y1))
+            stack += [(x0, y0, x, y1, d - 1), (x, y0, x1, y1, d - 1)]
+    return horizontal, vertical, count
+
+
+if __name__ == '__main__':
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+
+    for path in [str(ROOT / IMG_PATH)] + sorted(glob.glob(str(ROOT / 'composition_*.png')))[:3]:
+        img = cv2.imread(path)
+        labels = label_colors(img)
+        h_lines, v_lines = detect_grid_lines(edge_map(img), black=labels == BLACK)
+        cells, _ = grid_cells(h_lines, v_lines)
+        start = time.perf_counter()
+        faces, _, adjacency, _ = build_dcel(img, labels=labels)
+        elapsed = time.perf_counter() - start
+        fields, _, _ = build_dcel_and_stats(img, labels=labels)
+        print(f"{Path(path).name[:40]}: 网格单元 {len(cells)} 个；平面剖分 {len(faces)} 个面 "
+              f"(其中色块 {len(fields)} 个，相邻 {len(adjacency)} 对)，用时 {elapsed * 1000:.1f} 毫秒")
+
+    # 扫描线的耗时随面数近似线性增长
+    rng = np.random.default_rng(0)
+    for depth in range(8, max_depth + 1, 2):
+        horizontal, vertical, count = random_guillotine(rng, depth, 10 ** 6)
+        start = time.perf_counter()
+        bounds, _, adjacency = planar_subdivision(horizontal, vertical, (10 ** 6, 10 ** 6))
+        elapsed = time.perf_counter() - start
+        assert len(bounds) == count
+        print(f"{len(horizontal) + len(vertical)} 条线段 → {len(bounds)} 个面、{len(adjacency)} 对相邻："
+              f"{elapsed * 1000:.1f} 毫秒 ({elapsed / len(bounds) * 1e6:.1f} 微秒/面)")
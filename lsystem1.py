@@ -1,111 +1,175 @@
+import argparse
+import csv
+import json
+from pathlib import Path
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import linregress
+
+from mondrian.fractal import box_counts, chaos_game, fit_dimension, vertex_maps
+
+# matplotlib 只在需要绘图时才导入 (见 _pyplot)：批量计算和无界面模式 (--headless) 完全不加载它，
+# 启动时间只取决于 numpy。
+
+def _pyplot():
+    import matplotlib.pyplot as plt
+    return plt
 
 # --- 1. L-System 几何体生成：使用迭代函数系统 (IFS) 生成谢尔宾斯基点集 ---
-def generate_sierpinski_points(num_points=10000, initial_points=[(0, 0), (1, 0), (0.5, np.sqrt(3)/2)]):
+def generate_sierpinski_points(num_points=10000, initial_points=[(0, 0), (1, 0), (0.5, np.sqrt(3)/2)], rng=None):
     """
     通过迭代函数系统 (IFS) 生成谢尔宾斯基垫片的点集。
+
+    每一步随机选择一个顶点，将当前点移动到当前点与该顶点之间距离的一半；
+    所有顶点编号一次抽取，递推按块向量化计算 (见 mondrian.fractal.chaos_game)。
+
+    Args:
+        rng (np.random.Generator): 随机数生成器；默认使用全局 np.random (结果不可复现)。
+
+    Returns:
+        np.ndarray: (num_points + 1, 2) 的点集，第一个点为 initial_points[0]。
     """
-    P0 = initial_points[0]
-    P1 = initial_points[1]
-    P2 = initial_points[2]
-    
-    # 随机选择一个初始点
-    points = [P0]
-    current_point = P0
-
-    for _ in range(num_points):
-        # 随机选择一个初始顶点 (0, 1, or 2)
-        target_vertex = initial_points[np.random.randint(3)]
-        
-        # 将当前点移动到当前点与目标顶点之间距离的一半
-        next_x = 0.5 * (current_point[0] + target_vertex[0])
-        next_y = 0.5 * (current_point[1] + target_vertex[1])
-        
-        current_point = (next_x, next_y)
-        points.append(current_point)
-        
-    return np.array(points)
+    return chaos_game(vertex_maps(initial_points, 0.5), num_points, start=initial_points[0], rng=rng)
 
 # --- 2. 盒计数法核心实现 ---
-def box_counting_dimension(points, min_log_eps=-5, max_log_eps=0, num_scales=15):
+def box_counting_fit(points, min_log_eps=-5, max_log_eps=0, num_scales=15):
     """
-    计算给定点集的分形维数。
-    
+    盒计数的计算部分 (不绘图)。
+
     Args:
         points: (N, 2) 形状的 NumPy 数组，表示点的坐标。
-        min_log_eps, max_log_eps: 盒子尺度的对数范围。
+        min_log_eps, max_log_eps: 盒子尺度的对数范围 (log(1/epsilon))。
         num_scales: 要测试的盒子尺度数量。
-    
+
     Returns:
-        float: 计算出的盒计数维数。
+        dict: log_1_epsilons、log_counts、dimension (拟合斜率)、intercept、r_squared。
     """
-    X = points[:, 0]
-    Y = points[:, 1]
-    
-    # 确定计算区域的边界
-    min_x, max_x = X.min(), X.max()
-    min_y, max_y = Y.min(), Y.max()
-    
     # 定义尺度的对数范围 (log(1/epsilon))
     log_1_epsilons = np.linspace(min_log_eps, max_log_eps, num_scales)
-    
-    counts = [] # 存储 N(epsilon)
-    log_epsilons = -log_1_epsilons # 存储 log(epsilon)
-
-    for log_eps in log_epsilons:
-        epsilon = np.exp(log_eps) # 盒子边长
-        
-        # 计算网格划分
-        bins_x = np.arange(min_x, max_x + epsilon, epsilon)
-        bins_y = np.arange(min_y, max_y + epsilon, epsilon)
-        
-        # 将点分配到网格中 (二维直方图)
-        # H 是一个二维数组，其中每个元素是该盒子中点的数量
-        H, _, _ = np.histogram2d(X, Y, bins=[bins_x, bins_y])
-        
-        # 统计非空盒子的数量 N(epsilon)
-        count = np.sum(H > 0)
-        counts.append(count)
-        
-    log_counts = np.log(counts)
-    
-    # 执行线性回归：拟合 log(N(epsilon)) 和 log(1/epsilon)
-    # log(N) = D * log(1/epsilon) + C
-    slope, intercept, r_value, p_value, std_err = linregress(log_1_epsilons, log_counts)
-    
-    # 斜率即为分形维数 D
-    dimension = slope
-    
-    # 可视化结果
+    epsilons = np.exp(-log_1_epsilons)
+
+    # 所有点只量化一次，各尺度的非空盒子数 N(epsilon) 一并得出 (网格与逐尺度 np.histogram2d 相同，误差不超过一个最细格子)
+    _, counts = box_counts(points, epsilons)
+
+    # 线性回归：log(N) = D * log(1/epsilon) + C，斜率即为分形维数 D
+    dimension, intercept, r_squared = fit_dimension(epsilons, counts)
+    return {
+        'log_1_epsilons': log_1_epsilons,
+        'log_counts': np.log(counts),
+        'dimension': dimension,
+        'intercept': intercept,
+        'r_squared': r_squared,
+    }
+
+
+def plot_box_counting(fit):
+    """绘制 box_counting_fit 的结果 (阻塞直到窗口关闭)。"""
+    plt = _pyplot()
+    log_1_epsilons = fit['log_1_epsilons']
     plt.figure(figsize=(8, 6))
-    plt.plot(log_1_epsilons, log_counts, 'o', label='Data Points')
-    plt.plot(log_1_epsilons, intercept + slope * log_1_epsilons, 'r', 
-             label=f'Fit: D={dimension:.4f} (R^2={r_value**2:.4f})')
+    plt.plot(log_1_epsilons, fit['log_counts'], 'o', label='Data Points')
+    plt.plot(log_1_epsilons, fit['intercept'] + fit['dimension'] * log_1_epsilons, 'r',
+             label=f"Fit: D={fit['dimension']:.4f} (R^2={fit['r_squared']:.4f})")
     plt.xlabel(r'$\log(1/\epsilon)$')
     plt.ylabel(r'$\log(N(\epsilon))$')
     plt.title('Box-Counting Method for Fractal Dimension')
     plt.legend()
     plt.grid(True, linestyle='--')
     plt.show()
-    
-    return dimension
 
-# --- 主程序执行 ---
-if __name__ == '__main__':
-    print("--- 1. 生成谢尔宾斯基垫片点集 ---")
-    sierpinski_points = generate_sierpinski_points(num_points=50000)
-    
-    # 可视化生成的点集
+
+def plot_points(points):
+    """绘制点集 (阻塞直到窗口关闭)。"""
+    plt = _pyplot()
     plt.figure(figsize=(6, 6))
-    plt.plot(sierpinski_points[:, 0], sierpinski_points[:, 1], 'k.', markersize=0.5)
+    plt.plot(points[:, 0], points[:, 1], 'k.', markersize=0.5)
     plt.title('Generated Sierpinski Gasket Point Set')
     plt.axis('equal')
     plt.show()
-    
-    print("\n--- 2. 执行盒计数法计算分形维数 ---")
-    D = box_counting_dimension(sierpinski_points, min_log_eps=-5, max_log_eps=-0.5, num_scales=20)
-    
-    print(f"\n计算出的谢尔宾斯基垫片分形维数 D ≈ {D:.4f}")
-    print(f"理论值 D_theory = log(3)/log(2) ≈ 1.5850")
\ No newline at end of file
+
+
+def box_counting_dimension(points, min_log_eps=-5, max_log_eps=0, num_scales=15, plot=True):
+    """
+    计算给定点集的分形维数。
+
+    Args:
+        points: (N, 2) 形状的 NumPy 数组，表示点的坐标。
+        min_log_eps, max_log_eps: 盒子尺度的对数范围 (log(1/epsilon))。
+        num_scales: 要测试的盒子尺度数量。
+        plot (bool): 是否绘制拟合图；批量任务中传 False。
+
+    Returns:
+        float: 计算出的盒计数维数。
+    """
+    fit = box_counting_fit(points, min_log_eps, max_log_eps, num_scales)
+    if plot:
+        plot_box_counting(fit)
+    return fit['dimension']
+
+
+# --- 3. 无界面批量估计 ---
+def load_points(path):
+    """读取点集文件：.npy，或每行 "x,y" / "x y" 的文本文件 (.csv / .txt)。"""
+    path = Path(path)
+    if path.suffix == '.npy':
+        points = np.load(path)
+    else:
+        points = np.loadtxt(path, delimiter=',' if path.suffix == '.csv' else None, ndmin=2)
+    return np.asarray(points, dtype=np.float64)[:, :2]
+
+
+def write_results(rows, path):
+    """按扩展名把结果写成 JSON (.json) 或 CSV (其他)。"""
+    path = Path(path)
+    if path.suffix == '.json':
+        path.write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding='utf-8')
+        return
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="谢尔宾斯基垫片 (或给定点集) 的盒计数分形维数")
+    parser.add_argument('inputs', nargs='*', help="点集文件 (.npy / .csv / .txt)；不给出时生成谢尔宾斯基垫片")
+    parser.add_argument('--num-points', type=int, default=50000, help="生成的点数")
+    parser.add_argument('--repeat', type=int, default=1, help="生成的点集数量 (未给出输入文件时)")
+    parser.add_argument('--seed', type=int, default=None, help="随机种子；第 i 个点集使用 seed + i")
+    parser.add_argument('--min-log-eps', type=float, default=0.5, help="log(1/epsilon) 的下限")
+    parser.add_argument('--max-log-eps', type=float, default=5.0, help="log(1/epsilon) 的上限")
+    parser.add_argument('--num-scales', type=int, default=20, help="尺度数量")
+    parser.add_argument('--headless', action='store_true', help="不绘图 (不导入 matplotlib)")
+    parser.add_argument('--out', default=None, help="结果文件 (.json 或 .csv)")
+    args = parser.parse_args(argv)
+
+    if args.inputs:
+        sources = [(str(path), lambda path=path: load_points(path)) for path in args.inputs]
+    else:
+        def generate(i):
+            seed = None if args.seed is None else args.seed + i
+            return generate_sierpinski_points(num_points=args.num_points, rng=np.random.default_rng(seed))
+        sources = [(f"sierpinski[{i}]", lambda i=i: generate(i)) for i in range(args.repeat)]
+
+    rows = []
+    for name, load_source in sources:
+        print(f"--- {name} ---")
+        points = load_source()
+        if not args.headless:
+            plot_points(points)
+        fit = box_counting_fit(points, args.min_log_eps, args.max_log_eps, args.num_scales)
+        if not args.headless:
+            plot_box_counting(fit)
+        print(f"分形维数 D ≈ {fit['dimension']:.4f} (R^2 = {fit['r_squared']:.4f})")
+        rows.append({'input': name, 'num_points': len(points), 'dimension': fit['dimension'],
+                     'intercept': fit['intercept'], 'r_squared': fit['r_squared']})
+
+    if not args.inputs:
+        print(f"理论值 D_theory = log(3)/log(2) ≈ 1.5850")
+    if args.out and rows:
+        write_results(rows, args.out)
+        print(f"结果已写入 {args.out} ({len(rows)} 行)")
+
+
+# --- 主程序执行 ---
+if __name__ == '__main__':
+    main()
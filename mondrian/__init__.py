@@ -0,0 +1,12 @@
+"""
+蒙德里安构图生成的公共引擎。
+
+analyze*.py 各版本脚本共享的解释、生成与绘制逻辑集中在这里。
+"""
+
+from mondrian.derivation import compile_rules, generate_l_system_string, iter_derivation
+from mondrian.engine import MondrianEngine, get_engine
+from mondrian.interpreter import HALT, iter_subdivision, run_subdivision
+from mondrian.profiles import PROFILES, Profile, get_profile, profile_names
+from mondrian.rects import SHARED_PALETTE, Palette, RectBatch
+from mondrian.seeding import GLOBAL_STREAMS, CompositionStreams
@@ -0,0 +1,197 @@
+# ----------------------------------------------------------------------
+# 多进程批量生成
+# ----------------------------------------------------------------------
+# 各版本脚本的主程序逐张执行 “推导 → 解释 → 保存”，任一张出错就 sys.exit(1)。
+# run_batch 把每张图像作为独立任务分发到进程池：
+#   * 每张图像使用由 (批次种子, 图像编号) 派生的独立随机数流 (seeding.CompositionStreams)，
+#     与工作进程数量、调度顺序无关，同一批次种子总能复现同样的图像；
+#   * 单张失败时换用该图像的另一组随机数流 (CompositionStreams 的 attempt) 重试，
+#     仍失败则记录下来继续运行，不会中断整个批次；
+#   * 分别统计推导、解释、保存三个阶段的耗时。
+import multiprocessing
+import os
+import time
+import traceback
+from pathlib import Path
+
+import numpy as np
+
+from mondrian.render import save_composition_png
+from mondrian.seeding import CompositionStreams
+
+# 主进程每完成多少张图像打印一次进度 (至少 10 张，最多约 20 次)
+_PROGRESS_STEPS = 20
+
+# 工作进程中的任务描述 (由进程池 initializer 设置，避免每个任务重复序列化)
+_worker_job = None
+
+
+def _init_worker(job):
+    global _worker_job
+    _worker_job = job
+
+
+def _run_item(index):
+    """
+    生成并保存第 index 张图像。
+
+    Returns:
+        tuple: (编号, 状态, 矩形数, 写出的元素数, (推导, 解释, 保存) 耗时, 错误信息, 尝试序号)；
+        状态为 'ok'、'empty' (未生成矩形，跳过保存) 或 'failed'。
+        save 返回整数时作为写出的元素数 (例如合并线条小方块之后)，否则与矩形数相同。
+        尝试序号为成功时所用的 CompositionStreams(seed, index, attempt) 的 attempt。
+    """
+    derive, interpret, save, output_dir, name_width, seed, retries = _worker_job
+    error = None
+    for attempt in range(retries + 1):
+        # 同一组随机数流只会重复同一个错误：每次重试换用该图像的另一组流 (首次与不重试时相同)
+        streams = CompositionStreams(seed, index, attempt)
+        try:
+            t0 = time.perf_counter()
+            l_string = derive(streams)
+            t1 = time.perf_counter()
+            rectangles = interpret(l_string, streams=streams)
+            t2 = time.perf_counter()
+            if not rectangles:
+                return index, 'empty', 0, 0, (t1 - t0, t2 - t1, 0.0), None, attempt
+            written = save(rectangles, Path(output_dir) / f"composition_{index:0{name_width}d}.png")
+            t3 = time.perf_counter()
+            if written is None:
+                written = len(rectangles)
+            return index, 'ok', len(rectangles), written, (t1 - t0, t2 - t1, t3 - t2), None, attempt
+        except Exception:
+            error = traceback.format_exc()
+    return index, 'failed', 0, 0, (0.0, 0.0, 0.0), error, retries
+
+
+class BatchReport:
+    """批量生成的汇总结果。"""
+
+    STAGES = ('推导', '解释', '保存')
+
+    def __init__(self, num_images, seed, workers):
+        self.num_images = num_images
+        self.seed = seed
+        self.workers = workers
+        self.saved = 0
+        self.total_rects = 0
+        self.total_written = 0
+        # 每张成功保存的图像：(编号, 矩形数, 写出的元素数)
+        self.per_image = []
+        self.empty = []
+        self.failures = []
+        self.retried = []
+        self.stage_seconds = [0.0, 0.0, 0.0]
+        self.wall_seconds = 0.0
+
+    def add(self, index, status, num_rects, num_written, timings, error, attempt=0):
+        for k, t in enumerate(timings):
+            self.stage_seconds[k] += t
+        if attempt and status != 'failed':
+            self.retried.append((index, attempt))
+        if status == 'ok':
+            self.saved += 1
+            self.total_rects += num_rects
+            self.total_written += num_written
+            self.per_image.append((index, num_rects, num_written))
+        elif status == 'empty':
+            self.empty.append(index)
+        else:
+            self.failures.append((index, error))
+
+    def reductions(self):
+        """按编号排序的 [(编号, 写出元素相对矩形数的减少比例), ...]。"""
+        return [(index, 1 - num_written / num_rects)
+                for index, num_rects, num_written in sorted(self.per_image)]
+
+    def print_summary(self):
+        avg_rects = self.total_rects / self.saved if self.saved > 0 else 0
+        print("\n--- 批量生成完成 ---")
+        print(f"批次种子: {self.seed}，工作进程: {self.workers}")
+        print(f"总共生成 {self.saved} 张图像 (计划 {self.num_images} 张，"
+              f"空白跳过 {len(self.empty)} 张，失败 {len(self.failures)} 张)。")
+        if self.retried:
+            print(f"重试后成功 {len(self.retried)} 张 (图像 i 第 k 次重试的结果"
+                  f"由 CompositionStreams({self.seed}, i, k) 复现)："
+                  + '、'.join(f"{index} (k={attempt})" for index, attempt in sorted(self.retried)[:10]))
+        print(f"平均每张图像包含 {avg_rects:.1f} 个矩形/线条元素。")
+        if self.total_written != self.total_rects:
+            avg_written = self.total_written / self.saved
+            reduction = 1 - self.total_written / self.total_rects
+            print(f"合并后平均每张写出 {avg_written:.1f} 个元素 (减少 {reduction:.0%})。")
+            per_image = self.reductions()
+            values = np.array([r for _, r in per_image])
+            low, high = per_image[values.argmin()], per_image[values.argmax()]
+            print(f"  每张减少: 最少 {low[1]:.0%} (图像 {low[0]})，中位数 {np.median(values):.0%}，"
+                  f"最多 {high[1]:.0%} (图像 {high[0]})")
+        rate = self.num_images / self.wall_seconds if self.wall_seconds > 0 else 0
+        print(f"总耗时 {self.wall_seconds:.2f} 秒，{rate:.1f} 张/秒。")
+        busy = sum(self.stage_seconds)
+        for name, seconds in zip(self.STAGES, self.stage_seconds):
+            share = seconds / busy if busy > 0 else 0
+            print(f"  {name}: 累计 {seconds:.2f} 秒 ({share:.0%})")
+        for index, error in self.failures[:5]:
+            print(f"失败: 图像 {index}\n{error}")
+
+
+def run_batch(derive, interpret, num_images, output_dir, seed=None, workers=None,
+              retries=1, save=save_composition_png, chunksize=None):
+    """
+    用进程池批量生成并保存构图。
+
+    Args:
+        derive (callable): derive(streams) 返回一个 L 系统字符串 (随机数取自 streams)。
+        interpret (callable): interpret(l_string, streams=streams) 返回矩形集合。
+        num_images (int): 图像数量，编号从 1 开始。
+        output_dir (Path): 输出目录 (需已存在)。
+        seed (int): 批次种子；None 时随机生成并在汇总中打印，便于复现。
+        workers (int): 工作进程数；None 表示 CPU 核心数，1 表示在当前进程内串行执行。
+        retries (int): 单张图像失败后的重试次数 (每次换用该图像的另一组随机数流)。
+        save (callable): save(rectangles, file_path) 保存一张图像；可返回实际写出的元素数。
+        chunksize (int): 每次派发给工作进程的图像数量；默认按总量自动选择。
+
+    Returns:
+        BatchReport: 汇总结果；失败的图像同时写入 output_dir/failures.txt。
+
+    derive / interpret / save 需要可被 pickle (模块级函数、functools.partial 或其绑定方法)。
+    """
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % (1 << 63))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, num_images))
+    if chunksize is None:
+        chunksize = max(1, min(64, num_images // (workers * 8)))
+
+    name_width = max(3, len(str(num_images)))
+    job = (derive, interpret, save, str(output_dir), name_width, seed, retries)
+    report = BatchReport(num_images, seed, workers)
+    progress_every = max(10, num_images // _PROGRESS_STEPS)
+
+    start = time.perf_counter()
+    indices = range(1, num_images + 1)
+    if workers == 1:
+        _init_worker(job)
+        results = map(_run_item, indices)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(job,))
+        results = pool.imap_unordered(_run_item, indices, chunksize=chunksize)
+    try:
+        for done, result in enumerate(results, 1):
+            report.add(*result)
+            if result[1] == 'failed':
+                print(f"错误: 图像 {result[0]} 重试 {retries} 次后仍失败，已记录并继续。")
+            if done % progress_every == 0 or done == 1:
+                print(f"进度: {done}/{num_images} 张图像已完成。")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    report.wall_seconds = time.perf_counter() - start
+
+    if report.failures:
+        with open(Path(output_dir) / 'failures.txt', 'w', encoding='utf-8') as f:
+            for index, error in sorted(report.failures):
+                f.write(f"# 图像 {index} (批次种子 {seed})\n{error}\n")
+    return report
@@ -0,0 +1,269 @@
+# ----------------------------------------------------------------------
+# 画作集合的批量分析
+# ----------------------------------------------------------------------
+# revies1.py 原先只分析写死在 IMG_PATH 中的一幅画。run_collection 把同样的几何与颜色统计
+# 用在一个目录 / 通配符匹配到的全部图像上 (例如博物馆藏品扫描或仓库中的 composition_*.png)：
+#   * 线程池读取并解码图像 (cv2.imdecode 释放 GIL)，解码结果直接写入共享内存，
+#     工作进程按名称映射同一块内存，不经过 pickle 复制像素；
+#   * 同时在途的图像数有上限，内存占用与集合大小无关；
+#   * 每完成一幅就向 CSV 追加一行并刷新 (每个统计量一列)，中断后重跑时跳过表中已有的路径，
+#     写了一半的末行会被截掉重做；失败的图像记录到 <输出>.failures.txt，下次重跑时会再试。
+# analyze 回调决定统计哪些量，见 revies1.analyze_image。
+import csv
+import glob
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp')
+
+# 固定列：图像路径、尺寸与分析耗时；其后为 analyze 返回的各项统计
+BASE_FIELDS = ('path', 'width', 'height', 'seconds')
+
+
+def expand_inputs(inputs, recursive=False):
+    """
+    把目录、通配符和文件路径展开为去重、排序后的图像路径列表。
+
+    目录展开为其中 (recursive 时包括子目录) 后缀属于 IMAGE_SUFFIXES 的文件。
+    """
+    found = set()
+    for item in inputs:
+        item = str(item)
+        if os.path.isdir(item):
+            pattern = os.path.join(item, '**', '*') if recursive else os.path.join(item, '*')
+            candidates = glob.glob(pattern, recursive=recursive)
+        elif glob.has_magic(item):
+            candidates = glob.glob(item, recursive=True)
+        else:
+            candidates = [item]
+        found.update(os.path.normpath(p) for p in candidates
+                     if os.path.isfile(p) and p.lower().endswith(IMAGE_SUFFIXES))
+    return sorted(found)
+
+
+def _completed_paths(out_path, fields):
+    """
+    读取已有输出中完成的路径；表头不符时报错，写了一半的末行截掉。
+
+    Returns:
+        set: 已完成的图像路径；文件不存在或为空时为空集。
+    """
+    if not out_path.exists() or out_path.stat().st_size == 0:
+        return set()
+    with open(out_path, 'rb+') as f:
+        data = f.read()
+        if not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+    with open(out_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return set()
+        if tuple(header) != fields:
+            raise ValueError(f"{out_path} 的表头与当前统计项不一致，无法续跑: {header}")
+        return {row[0] for row in reader if row}
+
+
+def _decode(path):
+    """读取并解码一幅图像，放入共享内存；返回 (路径, 共享内存, 形状) 或 (路径, None, 错误信息)。"""
+    import cv2
+    try:
+        buffer = np.fromfile(path, dtype=np.uint8)
+        img = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+        if img is None:
+            return path, None, "无法解码图像\n"
+        block = shared_memory.SharedMemory(create=True, size=img.nbytes)
+        np.ndarray(img.shape, dtype=np.uint8, buffer=block.buf)[:] = img
+        return path, block, img.shape
+    except Exception:
+        return path, None, traceback.format_exc()
+
+
+# 工作进程中的分析回调 (由进程池 initializer 设置)
+_worker_analyze = None
+
+
+def _init_worker(analyze):
+    global _worker_analyze
+    _worker_analyze = analyze
+
+
+def _run_item(task):
+    """在工作进程中分析共享内存里的一幅图像；返回 (路径, 统计字典或 None, 耗时, 错误信息)。"""
+    path, name, shape = task
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        img = np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+        start = time.perf_counter()
+        stats = _worker_analyze(img)
+        del img
+        return path, stats, time.perf_counter() - start, None
+    except Exception:
+        return path, None, 0.0, traceback.format_exc()
+    finally:
+        block.close()
+
+
+def _format(value):
+    """统计值写入 CSV 的文本：浮点数保留足够的有效数字，numpy 标量转换为 Python 数值。"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return repr(value)
+    return value
+
+
+class CollectionReport:
+    """批量分析的汇总结果。"""
+
+    def __init__(self, total, skipped, workers):
+        self.total = total
+        self.skipped = skipped
+        self.workers = workers
+        self.done = 0
+        self.failures = []
+        self.busy_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def print_summary(self):
+        print("\n--- 批量分析完成 ---")
+        print(f"共 {self.total} 幅图像：本次完成 {self.done} 幅，此前已完成 {self.skipped} 幅，"
+              f"失败 {len(self.failures)} 幅 (工作进程 {self.workers})。")
+        rate = self.done / self.wall_seconds if self.wall_seconds > 0 else 0
+        print(f"总耗时 {self.wall_seconds:.2f} 秒，{rate:.2f} 幅/秒；分析累计 {self.busy_seconds:.2f} 秒。")
+        for path, error in self.failures[:5]:
+            print(f"失败: {path}\n{error}")
+
+
+def run_collection(paths, out_path, analyze, fields, workers=None, decode_threads=4, max_pending=None):
+    """
+    并行分析一组图像，结果逐行追加到 CSV，可中断后续跑。
+
+    Args:
+        paths (list): 图像路径 (见 expand_inputs)。
+        out_path (Path): 输出 CSV；已存在时跳过其中已完成的图像。
+        analyze (callable): analyze(img_bgr) 返回统计字典，键为 fields；需要可被 pickle。
+        fields (tuple): analyze 返回的统计项名称 (决定 CSV 的列)。
+        workers (int): 工作进程数；None 表示 CPU 核心数。
+        decode_threads (int): 解码线程数。
+        max_pending (int): 同时在途 (已解码未分析完) 的图像数上限；默认 2 × workers。
+
+    Returns:
+        CollectionReport: 汇总结果；失败的图像同时写入 <out_path>.failures.txt。
+    """
+    out_path = Path(out_path)
+    columns = BASE_FIELDS + tuple(fields)
+    completed = _completed_paths(out_path, columns)
+    todo = [str(p) for p in paths if str(p) not in completed]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(todo) or 1))
+    if max_pending is None:
+        max_pending = 2 * workers
+    report = CollectionReport(len(paths), len(paths) - len(todo), workers)
+    if not todo:
+        return report
+
+    slots = threading.BoundedSemaphore(max_pending)
+    finished = threading.Condition()
+    state = {'outstanding': 0}
+    blocks = {}
+
+    new_file = not out_path.exists() or out_path.stat().st_size == 0
+    out = open(out_path, 'a', newline='', encoding='utf-8')
+    writer = csv.writer(out)
+    if new_file:
+        writer.writerow(columns)
+        out.flush()
+
+    def settle(path, error=None, row=None, seconds=0.0):
+        # 在主线程 (同步失败) 或结果回调线程中调用：写出结果、释放共享内存和在途名额
+        block = blocks.pop(path, None)
+        if block is not None:
+            block.close()
+            block.unlink()
+        with finished:
+            if row is not None:
+                writer.writerow(row)
+                out.flush()
+                report.done += 1
+                report.busy_seconds += seconds
+            else:
+                report.failures.append((path, error))
+                print(f"错误: {path} 分析失败，已记录并继续。")
+            state['outstanding'] -= 1
+            done = report.done + len(report.failures)
+            if done % max(10, len(todo) // 20) == 0 or done == len(todo):
+                print(f"进度: {done}/{len(todo)} 幅图像已处理。")
+            finished.notify_all()
+        slots.release()
+
+    def on_result(result):
+        path, stats, seconds, error = result
+        if stats is None:
+            settle(path, error=error)
+            return
+        try:
+            shape = shapes.pop(path)
+            row = [path, shape[1], shape[0], f"{seconds:.4f}"] + [_format(stats[k]) for k in fields]
+        except Exception:
+            # 回调在进程池的结果线程中执行，异常不能抛出 (否则结果线程退出，后续结果全部丢失)
+            settle(path, error=traceback.format_exc())
+            return
+        settle(path, row=row, seconds=seconds)
+
+    shapes = {}
+    window = max(1, min(decode_threads, max_pending))
+    start = time.perf_counter()
+    # 先启动本进程的资源跟踪器，工作进程继承同一个跟踪器：它们映射共享内存时的登记与主进程 unlink 时的注销相互抵消，
+    # 否则每个工作进程各自启动跟踪器，退出时会把仍在使用 (或已释放) 的共享内存当作泄漏处理
+    resource_tracker.ensure_running()
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(analyze,))
+    try:
+        with ThreadPoolExecutor(max_workers=decode_threads) as decoders:
+            def decoded():
+                # 解码任务按在途名额提交，最多比工作进程领先 max_pending 幅；
+                # 已提交未取出的解码任务不超过 window 个，保证取名额时总有图像在分析中 (不会互相等待)
+                pending = []
+                for path in todo:
+                    slots.acquire()
+                    with finished:
+                        state['outstanding'] += 1
+                    pending.append(decoders.submit(_decode, path))
+                    while pending and (pending[0].done() or len(pending) >= window):
+                        yield pending.pop(0).result()
+                for future in pending:
+                    yield future.result()
+
+            for path, block, info in decoded():
+                if block is None:
+                    settle(path, error=info)
+                    continue
+                blocks[path] = block
+                shapes[path] = info
+                pool.apply_async(_run_item, ((path, block.name, info),), callback=on_result,
+                                 error_callback=lambda exc, path=path: settle(path, error=repr(exc)))
+        with finished:
+            finished.wait_for(lambda: state['outstanding'] == 0)
+    finally:
+        pool.terminate()
+        pool.join()
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+        out.close()
+    report.wall_seconds = time.perf_counter() - start
+
+    if report.failures:
+        with open(out_path.with_name(out_path.name + '.failures.txt'), 'w', encoding='utf-8') as f:
+            for path, error in sorted(report.failures):
+                f.write(f"# {path}\n{error}\n")
+    return report
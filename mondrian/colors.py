@@ -0,0 +1,157 @@
+# ----------------------------------------------------------------------
+# 颜色面积：标签图 + 积分图
+# ----------------------------------------------------------------------
+# revies1.red_area_ratio 原先先用 cv2.inRange 得到整幅红色掩膜，再对每个多边形只看质心一个像素，
+# 质心是红色就把整块面积计入——逐块 Python 循环，而且一个像素决定整块。这里：
+#   * 每幅图像只做一次颜色分类，得到 uint8 标签图 (白 / 灰 / 黑 / 红 / 黄 / 蓝)：
+#     在 HSV 空间先按明度分出黑色，再按饱和度分出无彩色 (按明度再分白与灰，扫描件与渲染出的构图阈值不同)，
+#     其余像素按色相归入最近的三原色 (色相、明度各一张 cv2.LUT 查找表)；
+#   * 每种颜色一张积分图 (summed-area table，cv2.integral)，任意轴对齐矩形内该颜色的像素数由四个角的值得出，
+#     每个矩形 O(1)，全部矩形一次向量化查询；
+#   * 积分图逐个颜色建立、查询后即释放，峰值内存只有一张 (H+1)×(W+1) 的 int32 表。
+import functools
+
+import cv2
+import numpy as np
+
+from mondrian.profiles import DEEPER_GRAY
+from mondrian.render import color_to_rgb
+
+COLORS = ('white', 'grey', 'black', 'red', 'yellow', 'blue')
+PRIMARIES = ('red', 'yellow', 'blue')
+WHITE, GREY, BLACK, RED, YELLOW, BLUE = range(len(COLORS))
+
+# 分类阈值 (OpenCV HSV：色相 0~179，饱和度与明度 0~255)
+BLACK_MAX_VALUE = 80        # 明度低于此值为黑色
+ACHROMATIC_MAX_SATURATION = 60   # 饱和度低于此值为无彩色
+# 生成构图用到的灰色 (HSV 明度)：lightgray 211 (v2)、'0.9' 230 (v3_gray ~ v6)、DEEPER_GRAY 192 (v10、v11)
+GENERATOR_GREYS = ('lightgray', '0.9', DEEPER_GRAY)
+# 无彩色中明度不低于此值为白色 (label_colors 的默认阈值，针对扫描件)。
+# 扫描件的白色画布并不纯白 (明度大多在 216~248，阴影处低至 200 左右)，阈值越高，被误判为灰色的画布越多：
+# 取 lightgray 之上的第一个明度，扫描件中 96.6% 的无彩色像素为白色 (取 233 时只有 40%)。
+# 这样 lightgray 与 DEEPER_GRAY 归入灰色，但 '0.9' 与画布的明度范围重叠，会被归入白色
+WHITE_MIN_VALUE = max(color_to_rgb('lightgray')) + 1
+# 渲染出的构图没有噪声，白色恰为 255：阈值取最浅的灰色 ('0.9'，230) 与 255 的中点，所有灰色都归入灰色
+RENDERED_WHITE_MIN_VALUE = (max(max(color_to_rgb(c)) for c in GENERATOR_GREYS) + 256) // 2
+# 三原色的参考色相；有彩色像素归入色相 (环形) 距离最近的一个
+_PRIMARY_HUES = ((RED, 0), (YELLOW, 30), (BLUE, 110))
+
+
+def _hue_lookup():
+    """色相 -> 最近的三原色的 256 项查找表 (cv2.LUT 要求 256 项)。"""
+    hue = np.arange(256)
+    best = np.full(256, 255, dtype=np.int64)
+    hue_labels = np.zeros(256, dtype=np.uint8)
+    for label, reference in _PRIMARY_HUES:
+        distance = np.abs(hue - reference) % 180
+        distance = np.minimum(distance, 180 - distance)
+        closer = distance < best
+        best[closer] = distance[closer]
+        hue_labels[closer] = label
+    return hue_labels
+
+
+@functools.lru_cache(maxsize=None)
+def _value_lookup(white_min_value):
+    """明度 -> 黑 / 灰 / 白的 256 项查找表。"""
+    value = np.arange(256)
+    return np.where(value < BLACK_MAX_VALUE, BLACK,
+                    np.where(value >= white_min_value, WHITE, GREY)).astype(np.uint8)
+
+
+_HUE_LABELS = _hue_lookup()
+
+
+def label_colors(img_bgr, white_min_value=WHITE_MIN_VALUE):
+    """
+    把 BGR 图像分类为颜色标签图。
+
+    Args:
+        img_bgr (np.ndarray): (H, W, 3) 的 BGR 图像。
+        white_min_value (int): 无彩色中明度不低于此值为白色；默认针对扫描件，
+            分析渲染出的构图 (render.save_composition_png) 时传入 RENDERED_WHITE_MIN_VALUE。
+
+    Returns:
+        np.ndarray: (H, W) 的 uint8 数组，取值为 COLORS 中的下标。
+    """
+    hsv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
+    hue, saturation, value = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    # 有彩色且不太暗的像素按色相归类，其余 (黑色与无彩色) 按明度归类
+    chromatic = (saturation >= ACHROMATIC_MAX_SATURATION) & (value >= BLACK_MAX_VALUE)
+    return np.where(chromatic, cv2.LUT(np.ascontiguousarray(hue), _HUE_LABELS).reshape(hue.shape),
+                    cv2.LUT(np.ascontiguousarray(value), _value_lookup(int(white_min_value))).reshape(value.shape))
+
+
+def summed_area_table(mask):
+    """
+    掩膜的积分图 S，S[y, x] 为 mask[:y, :x] 中非零元素的个数。
+
+    Returns:
+        np.ndarray: (H+1, W+1) 的 int32 数组 (像素数不超过 2^31 - 1)。
+    """
+    mask = np.ascontiguousarray(mask)
+    # 布尔掩膜按字节重新解释为 uint8 (不复制)
+    mask = mask.view(np.uint8) if mask.dtype == bool else mask.astype(np.uint8)
+    return cv2.integral(mask, sdepth=cv2.CV_32S)
+
+
+def _pixel_bounds(bounds, shape):
+    """把 (n, 4) 的 (x0, y0, x1, y1) 换算为裁剪到图像内的整数像素边界 (左闭右开)。"""
+    bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+    height, width = shape
+    x0 = np.clip(np.rint(bounds[:, 0]), 0, width).astype(np.intp)
+    y0 = np.clip(np.rint(bounds[:, 1]), 0, height).astype(np.intp)
+    x1 = np.clip(np.rint(bounds[:, 2]), 0, width).astype(np.intp)
+    y1 = np.clip(np.rint(bounds[:, 3]), 0, height).astype(np.intp)
+    return x0, y0, np.maximum(x1, x0), np.maximum(y1, y0)
+
+
+def rect_color_counts(labels, bounds, colors=COLORS):
+    """
+    每个矩形内各颜色的像素数。
+
+    Args:
+        labels (np.ndarray): label_colors 得到的标签图。
+        bounds (array-like): (n, 4) 的矩形边界 (x0, y0, x1, y1)，像素坐标，左闭右开。
+        colors (tuple): 需要统计的颜色名称。
+
+    Returns:
+        np.ndarray: (n, len(colors)) 的 int64 像素数。
+    """
+    x0, y0, x1, y1 = _pixel_bounds(bounds, labels.shape)
+    counts = np.zeros((len(x0), len(colors)), dtype=np.int64)
+    for j, name in enumerate(colors):
+        table = summed_area_table(labels == COLORS.index(name))
+        counts[:, j] = (table[y1, x1].astype(np.int64) - table[y0, x1]
+                        - table[y1, x0] + table[y0, x0])
+        del table
+    return counts
+
+
+def rect_color_fractions(labels, bounds, colors=COLORS):
+    """
+    每个矩形内各颜色所占的比例 (空矩形为 0)。
+
+    Returns:
+        np.ndarray: (n, len(colors)) 的 float64 比例。
+    """
+    x0, y0, x1, y1 = _pixel_bounds(bounds, labels.shape)
+    area = ((x1 - x0) * (y1 - y0)).astype(np.float64)
+    counts = rect_color_counts(labels, bounds, colors)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(area[:, None] > 0, counts / area[:, None], 0.0)
+
+
+def color_area_ratios(labels, bounds, colors=PRIMARIES):
+    """
+    各颜色在全部矩形中所占的像素数与整幅图像面积之比。
+
+    矩形互不重叠时 (如网格单元) 即为该颜色在这些矩形覆盖范围内的面积占比。
+
+    Returns:
+        dict: 颜色名称 -> 面积比例。
+    """
+    if len(bounds) == 0:
+        return {name: 0.0 for name in colors}
+    totals = rect_color_counts(labels, bounds, colors).sum(axis=0)
+    return {name: float(total) / labels.size for name, total in zip(colors, totals)}
@@ -0,0 +1,113 @@
+# ----------------------------------------------------------------------
+# L 系统推导：深度优先、惰性展开
+# ----------------------------------------------------------------------
+# generate_l_system_string 逐轮重写整条字符串，第 8 轮以后字符串长度成倍增长。
+# 对 S -> H[S][S] | V[S][S] | F 这类文法，每一次重写选择都只对应一个矩形的一次分割，
+# 因此可以深度优先地展开文法、逐个产出最终字符串中的符号：
+# 同时在内存中的只有从根到当前位置的一条路径 (每层一个后继串)，与迭代次数成正比。
+# 两种推导都从随机数流 (seeding.py) 中按“层号 + 层内从左到右的次序”取随机数，
+# 同一 CompositionStreams 下逐轮重写与深度优先展开得到相同的字符串。
+from bisect import bisect_right
+
+from mondrian.seeding import GLOBAL_STREAMS
+
+
+def compile_rules(rules):
+    """把 {符号: [(概率, 后继串), ...]} 预处理为 {符号: (后继串列表, 累积权重)}。"""
+    compiled = {}
+    for symbol, options in rules.items():
+        successors = [item[1] for item in options]
+        cum_weights = []
+        total = 0.0
+        for probability, _ in options:
+            total += probability
+            cum_weights.append(total)
+        compiled[symbol] = (successors, cum_weights)
+    return compiled
+
+
+def generate_l_system_string(axiom, rules, iterations, compiled=None, streams=None):
+    """
+    逐轮重写生成完整的 L 系统字符串 (各版本 generate_l_system_string 的公共实现)。
+
+    每个非终结符的规则选择与 random.choices(successors, cum_weights=...) 的计算完全相同，
+    使用全局 random 模块时消耗的随机数也与原实现一致；累积权重预先算好，不再为每个符号重建概率列表。
+
+    Args:
+        axiom (str): 公理。
+        rules (dict): 产生式规则。
+        iterations (int): 迭代次数。
+        compiled (dict): compile_rules(rules) 的结果；反复调用时传入以免重复预处理。
+        streams (CompositionStreams): 随机数流；默认使用全局 random 模块。
+
+    Returns:
+        str: 推导结果。
+    """
+    if compiled is None:
+        compiled = compile_rules(rules)
+    if streams is None:
+        streams = GLOBAL_STREAMS
+    current_string = axiom
+    for level in range(iterations):
+        # 本层每个非终结符依次取一个随机数
+        count = sum(current_string.count(symbol) for symbol in compiled)
+        draws = iter(streams.uniforms(level, count))
+        next_string = []
+        for char in current_string:
+            rule = compiled.get(char)
+            if rule is None:
+                next_string.append(char)
+            else:
+                successors, cum_weights = rule
+                next_string.append(successors[bisect_right(cum_weights, next(draws) * cum_weights[-1],
+                                                           0, len(cum_weights) - 1)])
+        current_string = "".join(next_string)
+    return current_string
+
+
+def iter_derivation(axiom, rules, iterations, streams=None):
+    """
+    深度优先地产出 L 系统推导结果的每一个符号，不生成完整字符串。
+
+    第 k 层产生的非终结符只有在 k < iterations 时才会继续重写，
+    因此产出的符号序列与 generate_l_system_string 的结果同分布；
+    深度优先遍历访问同一层节点的顺序也是从左到右，给定 CompositionStreams 时两者结果相同。
+
+    Args:
+        axiom (str): 公理 (初始字符串)。
+        rules (dict): 产生式规则，格式同 MONDRIAN_EARLY_RULES。
+        iterations (int): 迭代次数。
+        streams (CompositionStreams): 随机数流；默认使用全局 random 模块。
+
+    Yields:
+        str: 最终字符串中的符号，按从左到右的顺序。
+    """
+    compiled = compile_rules(rules)
+    if streams is None:
+        streams = GLOBAL_STREAMS
+    level_draws = [streams.draws(level) for level in range(iterations)]
+    # 三个并行的栈：后继串、串内下一个位置、该串所在的推导层
+    fragments = [axiom]
+    positions = [0]
+    levels = [0]
+
+    while fragments:
+        fragment = fragments[-1]
+        i = positions[-1]
+        if i == len(fragment):
+            fragments.pop()
+            positions.pop()
+            levels.pop()
+            continue
+        positions[-1] = i + 1
+
+        char = fragment[i]
+        level = levels[-1]
+        if level < iterations and char in compiled:
+            successors, cum_weights = compiled[char]
+            u = level_draws[level]()
+            fragments.append(successors[bisect_right(cum_weights, u * cum_weights[-1], 0, len(cum_weights) - 1)])
+            positions.append(0)
+            levels.append(level + 1)
+        else:
+            yield char
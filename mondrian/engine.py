@@ -0,0 +1,494 @@
+# ----------------------------------------------------------------------
+# 按 Profile 配置的统一生成引擎
+# ----------------------------------------------------------------------
+# MondrianEngine 把一个 Profile 编译成：
+#   * 推导用的累积权重 (compile_rules)，generate_string 不再每个符号重建概率列表；
+#   * 闭包形式的 step 函数，热路径上的常量 (颜色表、线宽范围、尺寸阈值) 都是局部变量，
+#     不再逐次查找模块全局变量；
+#   * 预先登记到共享调色板中的颜色，保证各进程中的颜色下标顺序一致。
+# 各 step 函数与原 analyze*.py 中的版本逐条对应，随机数的调用顺序完全相同，
+# 因此在同一随机种子下得到与原脚本相同的矩形列表。
+# 所有随机选择都通过 step 的 rng 参数进行：默认是全局 random 模块 (与原脚本一致)，
+# 传入 CompositionStreams 时使用该构图自己的解释流 (见 seeding.py)。
+# compose_lazy 把推导和解释融合在一起：文法只展开到解释器实际读取的位置，
+# HALT 之后以及顶层节点结束之后被丢弃的子树不再推导。
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import chain, islice
+
+from mondrian.derivation import compile_rules, generate_l_system_string, iter_derivation
+from mondrian.interpreter import HALT, iter_subdivision, run_subdivision
+from mondrian.profiles import get_profile
+from mondrian.rects import SHARED_PALETTE, RectBatch
+from mondrian.seeding import GLOBAL_STREAMS
+from mondrian.segments import LineSegments, SegmentTiling
+
+
+def _split_with_line(char, x, y, w, h, split_ratio, line_width):
+    """按比例分割并在分割处留出线条空间，返回 (rect1, 线条空间, rect2)。"""
+    if char == 'H':
+        total_h1 = h * split_ratio
+        return ((x, y, w, total_h1 - line_width / 2),
+                (x, y + total_h1 - line_width / 2, w, line_width),
+                (x, y + total_h1 + line_width / 2, w, h - total_h1 - line_width / 2))
+    total_w1 = w * split_ratio
+    return ((x, y, total_w1 - line_width / 2, h),
+            (x + total_w1 - line_width / 2, y, line_width, h),
+            (x + total_w1 + line_width / 2, y, w - total_w1 - line_width / 2, h))
+
+
+class NarrowSplitTable:
+    """
+    analyze6.py 过细分割重选规则的等价分布 (按尺寸分桶预先算好)。
+
+    原规则：抽取 split_ratio；若 min(split_ratio, 1 - split_ratio) * size < threshold (过细)，
+    则以 retry_probability 的概率重选，最多 max_attempts 次，直到不过细为止。
+    对给定的 size，设 a 为候选比例中不过细的比例，则最终不过细的概率为
+        P = a + (1 - a) * retry_probability * (1 - (1 - a) ** max_attempts)，
+    并且在“不过细”“过细”两类内部仍是均匀的。哪些比例过细只取决于 size 落在哪个区间，
+    因此每个区间的分布可以预先算好，每次分割只需一次随机数和一次二分查找。
+
+    Args:
+        split_ratios (tuple): 分割比例候选 (可重复)。
+        threshold (float): 过细分割阈值。
+        retry_probability (float): 过细时重选比例的概率。
+        max_attempts (int): 重选的最大次数。
+    """
+
+    def __init__(self, split_ratios, threshold, retry_probability, max_attempts):
+        self.split_ratios = list(split_ratios)
+        self.threshold = threshold
+        shorter = [min(r, 1 - r) for r in self.split_ratios]
+        # 尺寸增大时，较短边比例大的候选先变为“不过细”
+        self._levels = sorted(set(shorter), reverse=True)
+        self._bounds = [threshold / m if m > 0 else float('inf') for m in self._levels]
+        n = len(self.split_ratios)
+        self._cum_weights = []
+        for k in range(len(self._levels) + 1):
+            accepted = set(self._levels[:k])
+            ok = [m in accepted for m in shorter]
+            num_ok = sum(ok)
+            a = num_ok / n
+            p_ok = a + (1 - a) * retry_probability * (1 - (1 - a) ** max_attempts)
+            weights = [(p_ok / num_ok if is_ok else (1 - p_ok) / (n - num_ok)) for is_ok in ok]
+            cum_weights = []
+            total = 0.0
+            for weight in weights:
+                total += weight
+                cum_weights.append(total)
+            self._cum_weights.append(cum_weights)
+
+    def bucket(self, size):
+        """size 所在的区间编号，即不过细的较短边比例的种数 (与原规则的比较方式逐位一致)。"""
+        levels = self._levels
+        threshold = self.threshold
+        k = bisect_right(self._bounds, size)
+        # 边界附近以乘积比较为准
+        while k < len(levels) and levels[k] * size >= threshold:
+            k += 1
+        while k > 0 and levels[k - 1] * size < threshold:
+            k -= 1
+        return k
+
+    def probabilities(self, size):
+        """在该尺寸下最终选中各候选比例的概率 (与 split_ratios 一一对应)。"""
+        cum_weights = self._cum_weights[self.bucket(size)]
+        return [b - a for a, b in zip([0.0] + cum_weights[:-1], cum_weights)]
+
+    def sample(self, size, rng):
+        """按等价分布直接抽取一个分割比例 (只消耗一个随机数)。"""
+        cum_weights = self._cum_weights[self.bucket(size)]
+        u = rng.random() * cum_weights[-1]
+        return self.split_ratios[bisect_right(cum_weights, u, 0, len(cum_weights) - 1)]
+
+
+def _classic_step(profile):
+    """analyze1.py ~ analyze7.py 的单符号解释规则。"""
+    colors = list(profile.colors)
+    split_ratios = list(profile.split_ratios)
+    min_size = profile.min_size
+    has_line = profile.line_width is not None
+    jitter = has_line and profile.line_width_deviation > 0
+    if has_line:
+        line_width = profile.line_width
+        line_width_min = profile.line_width_min
+        line_width_max = profile.line_width_max
+    grid_colors = list(profile.grid_colors)
+    narrow_table = None
+    if profile.narrow_threshold is not None:
+        narrow_table = NarrowSplitTable(split_ratios, profile.narrow_threshold,
+                                        profile.narrow_retry_probability, profile.narrow_max_attempts)
+
+    def step(char, rect, final_rects, rng, required_colors_set=None, lines=None):
+        x, y, w, h = rect
+
+        if char == 'F':
+            if w > min_size and h > min_size:
+                fill_color = rng.choice(colors)
+                if required_colors_set:
+                    fill_color = required_colors_set.pop()
+                final_rects.append((x, y, w, h, fill_color))
+            return None
+
+        elif char == 'H' or char == 'V':
+            if not has_line:
+                # 无线条版本：尺寸太小时直接填充 (不检查是否可见，也不使用强制原色)
+                if w < min_size or h < min_size:
+                    final_rects.append((x, y, w, h, rng.choice(colors)))
+                    return None
+                split_ratio = rng.choice(split_ratios)
+                if char == 'H':
+                    return (x, y, w, h * split_ratio), (x, y + h * split_ratio, w, h * (1 - split_ratio))
+                return (x, y, w * split_ratio, h), (x + w * split_ratio, y, w * (1 - split_ratio), h)
+
+            # 每次分割时生成一个随机线条宽度 (固定线宽的版本不消耗随机数)
+            current_line_width = rng.uniform(line_width_min, line_width_max) if jitter else line_width
+
+            # 尺寸太小，无法再容纳线条和两个子矩形，则强制终止并填充
+            if (char == 'H' and h < 2 * min_size + current_line_width) or \
+               (char == 'V' and w < 2 * min_size + current_line_width):
+                if w > min_size and h > min_size:
+                    fill_color = rng.choice(colors)
+                    if required_colors_set:
+                        fill_color = required_colors_set.pop()
+                    final_rects.append((x, y, w, h, fill_color))
+                return None
+
+            if narrow_table is None:
+                split_ratio = rng.choice(split_ratios)
+            else:
+                # 过细分割以一定概率重选比例 (降低概率，而非禁止)：直接按等价分布抽取，不再逐次重选
+                split_ratio = narrow_table.sample(w if char == 'V' else h, rng)
+
+            rect1, (lx, ly, lw, lh), rect2 = _split_with_line(char, x, y, w, h, split_ratio, current_line_width)
+            line_color = rng.choice(grid_colors) if grid_colors else 'black'
+            final_rects.append((lx, ly, lw, lh, line_color))
+            # 随后的 [S1][S2] 由 run_subdivision 依次解释到 rect1 / rect2
+            return rect1, rect2
+
+        # '['、']' 以及未定义符号直接跳过
+        return None
+
+    return step
+
+
+def _boogie_woogie_step(profile):
+    """analyze8.py 的单符号解释规则：破碎彩色线条，不合格的 F 区域留白。"""
+    colors = list(profile.colors)
+    split_ratios = list(profile.split_ratios)
+    min_size = profile.min_size
+    line_width_min = profile.line_width_min
+    line_width_max = profile.line_width_max
+    max_dim = profile.max_rect_dimension
+    max_aspect = profile.max_aspect_ratio
+
+    def step(char, rect, final_rects, rng, required_colors_set=None, lines=None):
+        x, y, w, h = rect
+
+        if char == 'F':
+            if w < min_size or h < min_size: # 小于最小尺寸，直接跳过
+                return None
+            is_oversized = (w > max_dim or h > max_dim)
+            aspect_ratio_bad = (max(w/h, h/w) > max_aspect) if h != 0 and w != 0 else False
+            if is_oversized or aspect_ratio_bad:
+                # 尺寸过大或纵横比太差，整个区域留白
+                final_rects.append((x, y, w, h, 'white'))
+                return None
+            fill_color = rng.choice(colors)
+            if required_colors_set:
+                fill_color = required_colors_set.pop()
+            final_rects.append((x, y, w, h, fill_color))
+            return None
+
+        elif char == 'H' or char == 'V':
+            current_line_width = rng.uniform(line_width_min, line_width_max)
+
+            if (char == 'H' and h < 2 * min_size + current_line_width) or \
+               (char == 'V' and w < 2 * min_size + current_line_width):
+                if w > min_size and h > min_size:
+                    final_rects.append((x, y, w, h, 'white')) # 小尺寸区域强制留白
+                return None
+
+            split_ratio = rng.choice(split_ratios)
+            rect1, (lx, ly, lw, lh), rect2 = _split_with_line(char, x, y, w, h, split_ratio, current_line_width)
+
+            # 在线条空间中生成彩色小方块 (模拟破碎线条)，由 lines 统一铺设
+            is_horizontal = lw > lh
+            main_length = lw if is_horizontal else lh
+            segment_dimension = lw if is_horizontal else lh
+
+            num_segments = max(1, int(main_length / max_dim))
+            segment_size = main_length / num_segments
+            if segment_size > max_dim:
+                segment_size = max_dim
+                num_segments = int(main_length / segment_size)
+
+            lines.add(final_rects, lx, ly, is_horizontal, num_segments, segment_size,
+                      min(segment_size, max_dim), segment_dimension)
+            return rect1, rect2
+
+        return None
+
+    return step
+
+
+def _boogie_woogie_strict_step(profile):
+    """analyze9.py 的单符号解释规则：任何不合格区域整体留白并终止整个解析。"""
+    colors = list(profile.colors)
+    split_ratios = list(profile.split_ratios)
+    min_size = profile.min_size
+    line_width_min = profile.line_width_min
+    line_width_max = profile.line_width_max
+    max_dim = profile.max_rect_dimension
+    max_aspect = profile.max_aspect_ratio
+    segment_size = min(profile.line_width, max_dim) # 每个小方块的理想长度
+
+    def step(char, rect, final_rects, rng, required_colors_set=None, lines=None):
+        x, y, w, h = rect
+
+        # 在处理任何符号之前先做严格的尺寸和纵横比检查
+        if w < min_size or h < min_size:
+            return HALT # 区域太小，直接终止，不绘制
+        is_oversized = (w > max_dim or h > max_dim)
+        aspect_ratio_bad = (max(w/h, h/w) > max_aspect) if h != 0 and w != 0 else False
+        if is_oversized or aspect_ratio_bad:
+            final_rects.append((x, y, w, h, 'white'))
+            return HALT
+
+        if char is None:
+            return None
+
+        if char == 'F':
+            fill_color = rng.choice(colors)
+            if required_colors_set:
+                fill_color = required_colors_set.pop()
+            final_rects.append((x, y, w, h, fill_color))
+            return None
+
+        elif char == 'H' or char == 'V':
+            current_line_width = rng.uniform(line_width_min, line_width_max)
+            split_ratio = rng.choice(split_ratios)
+            rect1, (lx, ly, lw, lh), rect2 = _split_with_line(char, x, y, w, h, split_ratio, current_line_width)
+
+            is_horizontal = lw > lh
+            main_length = lw if is_horizontal else lh
+            segment_dimension = lw if is_horizontal else lh
+
+            num_segments = max(1, int(main_length / segment_size))
+            final_segment_length = main_length / num_segments
+            final_segment_dimension = min(segment_dimension, max_dim) # 垂直于线条方向的尺寸
+
+            # 小方块自身尺寸不合格时强制白色 (检查在 SegmentTiling 中整段完成)
+            lines.add(final_rects, lx, ly, is_horizontal, num_segments, final_segment_length,
+                      final_segment_length, final_segment_dimension)
+            return rect1, rect2
+
+        return None
+
+    return step
+
+
+_STEP_FACTORIES = {
+    'classic': _classic_step,
+    'boogie_woogie': _boogie_woogie_step,
+    'boogie_woogie_strict': _boogie_woogie_strict_step,
+}
+
+
+def _segment_tiling(profile):
+    """破碎线条版本的小方块铺设规则；其余版本返回 None。"""
+    if profile.interpreter not in ('boogie_woogie', 'boogie_woogie_strict'):
+        return None
+    return SegmentTiling(profile.grid_colors, profile.grid_fill_probability, profile.min_size,
+                         profile.max_rect_dimension, profile.max_aspect_ratio,
+                         check_segments=profile.interpreter == 'boogie_woogie_strict')
+
+
+class MondrianEngine:
+    """
+    按 Profile 生成、解释构图。
+
+    Args:
+        profile (Profile): 生成参数。
+    """
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.compiled_rules = compile_rules(profile.rules)
+        try:
+            self.step = _STEP_FACTORIES[profile.interpreter](profile)
+        except KeyError:
+            raise ValueError(f"未知的解释规则: {profile.interpreter}") from None
+        self.tiling = _segment_tiling(profile)
+        self._length_sampler = None
+        # 预先登记颜色，调色板下标与解释顺序无关
+        for color in ('white', 'black') + profile.colors + profile.grid_colors + profile.primaries:
+            SHARED_PALETTE.index(color)
+
+    def __reduce__(self):
+        # step 是闭包，无法直接 pickle；在工作进程中按 Profile 重新编译
+        return (MondrianEngine, (self.profile,))
+
+    def __repr__(self):
+        return f"MondrianEngine({self.profile.name!r})"
+
+    def generate_string(self, iterations=None, axiom='S', streams=None):
+        """逐轮重写生成 L 系统字符串 (与各版本的 generate_l_system_string 同分布、同随机数序列)。"""
+        if iterations is None:
+            iterations = self.profile.iterations
+        return generate_l_system_string(axiom, self.profile.rules, iterations, self.compiled_rules, streams)
+
+    @property
+    def length_sampler(self):
+        """长度窗口采样器 (仅设置了 max_length 的配置)，首次访问时构建。"""
+        if self._length_sampler is None and self.profile.max_length is not None:
+            from mondrian.sampler import LengthBoundedSampler
+            profile = self.profile
+            self._length_sampler = LengthBoundedSampler('S', profile.rules, profile.iterations,
+                                                        profile.min_length, profile.max_length)
+        return self._length_sampler
+
+    def derive(self, streams=None):
+        """
+        按 Profile 的长度要求 (min_length / max_length) 生成主程序使用的 L 系统字符串。
+
+        Args:
+            streams (CompositionStreams): 随机数流；默认使用全局 random 模块。
+        """
+        if self.profile.max_length is not None:
+            # 长度窗口：直接按长度条件分布抽样，无需反复重新生成
+            return self.length_sampler.sample(streams)
+        if streams is None:
+            streams = GLOBAL_STREAMS
+        l_string = self.generate_string(streams=streams)
+        attempt = 0
+        while len(l_string) < self.profile.min_length:
+            # 计数器式推导流重新生成会得到同一个字符串，每次重试改用一条新的派生推导流
+            attempt += 1
+            l_string = self.generate_string(streams=streams.retry(attempt))
+        return l_string
+
+    def iter_symbols(self, streams=None):
+        """
+        derive 的惰性版本：按从左到右的顺序逐个产出符号，下游读取到哪里才推导到哪里。
+
+        给定 CompositionStreams 时，产出的符号序列与 derive(streams) 完全相同
+        (深度优先展开与逐轮重写使用同样的计数器式随机数；长度下限只需预读 min_length 个符号即可判定)。
+        使用全局 random 模块时只保证同分布。
+
+        Args:
+            streams (CompositionStreams): 随机数流；默认使用全局 random 模块。
+
+        Returns:
+            iterator: 逐个产出符号的迭代器。
+        """
+        if self.profile.max_length is not None:
+            return chain.from_iterable(self.length_sampler.iter_sample(streams))
+        if streams is None:
+            streams = GLOBAL_STREAMS
+        profile = self.profile
+        attempt = 0
+        current = streams
+        while True:
+            symbols = iter_derivation('S', profile.rules, profile.iterations, current)
+            head = list(islice(symbols, profile.min_length))
+            if len(head) >= profile.min_length:
+                return chain(head, symbols)
+            # 与 derive 相同的重试方式
+            attempt += 1
+            current = streams.retry(attempt)
+
+    def _required_colors(self, rng):
+        """本幅构图强制出现的原色集合。"""
+        profile = self.profile
+        if profile.required_primaries == 0:
+            return None
+        if profile.required_primaries >= len(profile.primaries):
+            return set(profile.primaries)
+        return set(rng.sample(list(profile.primaries), profile.required_primaries))
+
+    def interpret(self, l_string, initial_rect=(0, 0, 1, 1), streams=None):
+        """
+        解释 L 系统字符串，返回矩形 RectBatch。
+
+        Args:
+            l_string (str): L 系统字符串。
+            initial_rect (tuple): 初始矩形 (x, y, w, h)。
+            streams (CompositionStreams): 随机数流 (使用其中的解释流)；默认使用全局 random 模块。
+        """
+        streams = streams or GLOBAL_STREAMS
+        rng = streams.interpretation
+        required_colors = self._required_colors(rng)
+        final_rects = RectBatch()
+        lines = None if self.tiling is None else LineSegments(self.tiling, streams)
+        run_subdivision(l_string, initial_rect, self.step, rng, required_colors, lines, out=final_rects)
+        if lines is not None:
+            # 所有线条的小方块在解释结束后一次性铺设，写入预留的行 (GLOBAL_STREAMS 下画线时已逐条铺设)
+            lines.flush()
+        return final_rects
+
+    def stream(self, iterations=None, initial_rect=(0, 0, 1, 1), axiom='S', streams=None):
+        """
+        流式模式：深度优先展开文法，边推导边产出矩形，不生成完整的 L 系统字符串。
+
+        给定 streams 时，产出的矩形与 interpret(generate_string(streams=streams), streams=streams) 相同。
+        """
+        if iterations is None:
+            iterations = self.profile.iterations
+        streams = streams or GLOBAL_STREAMS
+        rng = streams.interpretation
+        required_colors = self._required_colors(rng)
+        # 流式模式逐条铺设线条小方块 (与批量铺设使用同样的随机数)
+        lines = None if self.tiling is None else LineSegments(self.tiling, streams, deferred=False)
+        symbols = iter_derivation(axiom, self.profile.rules, iterations, streams)
+        return iter_subdivision(symbols, initial_rect, self.step, rng, required_colors, lines)
+
+    def compose(self, streams=None):
+        """生成一幅完整构图 (推导 + 解释)。"""
+        return self.interpret(self.derive(streams), streams=streams)
+
+    def compose_lazy(self, streams=None, initial_rect=(0, 0, 1, 1)):
+        """
+        推导与解释融合的 compose：解释器读取到哪里，文法才展开到哪里。
+
+        原流程先推导出完整字符串再解释，而解释器在 HALT (analyze9.py 的过大区域) 或顶层节点结束后
+        就不再读取，其后的子树推导完全是浪费。这里把惰性推导 (iter_symbols) 直接交给流式解释器，
+        这些子树根本不会展开。给定 CompositionStreams 时结果与 compose(streams) 完全相同。
+
+        Args:
+            streams (CompositionStreams): 随机数流；默认使用全局 random 模块 (此时只保证同分布)。
+            initial_rect (tuple): 初始矩形 (x, y, w, h)。
+
+        Returns:
+            tuple: (矩形 RectBatch, 实际推导出的符号数)
+        """
+        streams = streams or GLOBAL_STREAMS
+        rng = streams.interpretation
+        required_colors = self._required_colors(rng)
+        final_rects = RectBatch()
+        lines = None if self.tiling is None else LineSegments(self.tiling, streams)
+        step = self.step
+        num_symbols = 0
+
+        def counted(symbols):
+            nonlocal num_symbols
+            for char in symbols:
+                num_symbols += 1
+                yield char
+
+        def step_into_batch(char, rect, emitted, *step_args):
+            # 矩形直接写入 RectBatch (线条小方块仍可预留行、最后一次性铺设)，流式解释器只负责控制流
+            return step(char, rect, final_rects, *step_args)
+
+        for _ in iter_subdivision(counted(self.iter_symbols(streams)), initial_rect, step_into_batch,
+                                  rng, required_colors, lines):
+            pass
+        if lines is not None:
+            lines.flush()
+        return final_rects, num_symbols
+
+
+@lru_cache(maxsize=None)
+def get_engine(name):
+    """按配置名称 (或别名) 返回共享的 MondrianEngine。"""
+    return MondrianEngine(get_profile(name))
@@ -0,0 +1,536 @@
+# ----------------------------------------------------------------------
+# 盒计数分形维数
+# ----------------------------------------------------------------------
+# lsystem1.py 的 box_counting_dimension 对每个尺度都重新构造一次 np.arange 网格，
+# 再对全部点做一次完整的 np.histogram2d，而盒计数只关心格子“有没有点”。这里：
+#   * 所有点只在最细一级网格 (每个坐标轴 2^bits 格) 上量化一次，只记录被占据的格子；
+#   * 二进尺度 (边长 L/2^k)：格子编号采用 Morton (Z 序) 编码，编码右移两位就是上一级的父格子，
+#     有序编码右移后仍然有序，相邻不同的个数即为该级的非空格子数 (method='unique')；
+#     或者在稠密的占据网格上逐级做 2×2 的 OR 归约 (method='pyramid')；
+#   * 任意尺度：由最细一级的非空格子 (而不是全部点) 换算，误差不超过一个最细格子；
+#   * 点可以分块加入 (BoxCounter.add)，内存只与非空格子数 (或网格大小) 有关，与点数无关。
+# 混沌游戏 (迭代函数系统) 的点集同样分块生成 (iter_chaos_game)：
+#   * 每块的映射编号一次抽取，序列切成若干条等长的“车道”，逐步推进时对所有车道做同一次向量运算；
+#   * 除第一条车道从上一块的最后一个点精确接续外，其余车道从任意点出发，
+#     先用前面 burn_in 个映射编号预热——压缩映射经过 burn_in 步后初始点的影响小于双精度舍入误差，
+#     因此结果与逐点迭代一致 (至多相差舍入误差)。
+# 蒙德里安构图的盒计数直接在矩形列表上进行 (rect_box_counts)，不采样点、也不栅格化：
+#   * 边界集合取非白色矩形 (黑色线条、色块、Boogie-Woogie 小方块) 的四条边；
+#   * 每个尺度下一条水平边占据一行中连续的一段格子，由两个端点的格子编号直接得出；
+#     同一行的各段先求并集，再减去水平段与垂直段共同占据的格子 (容斥)；
+#   * 一批构图的所有边拼在一起按 (构图, 行) 分组，一次向量运算得到全部构图的计数。
+import argparse
+import csv
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from mondrian.engine import MondrianEngine
+from mondrian.profiles import get_profile
+from mondrian.seeding import CompositionStreams
+
+DEFAULT_BITS = 14
+# pyramid 方法的稠密网格为 4^bits 字节，超过这个级数时改用 unique 方法
+_PYRAMID_MAX_BITS = 12
+# 每次量化的点数上限 (控制临时数组的峰值内存)
+_CHUNK = 1 << 22
+# 构图盒计数的尺度：单位画布上边长 2^-k 的格子 (k = 1 .. 8，最细约为 1000 像素画布上的 4 像素)
+DEFAULT_RECT_LEVELS = tuple(range(1, 9))
+
+
+def _spread_bits(v):
+    """把 32 位整数的各位分散到偶数位上 (Morton 编码的一半)。"""
+    v = v.astype(np.uint64)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return v
+
+
+def _compact_bits(v):
+    """_spread_bits 的逆运算：取出偶数位。"""
+    v = v & np.uint64(0x5555555555555555)
+    v = (v | (v >> np.uint64(1))) & np.uint64(0x3333333333333333)
+    v = (v | (v >> np.uint64(2))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v >> np.uint64(4))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v >> np.uint64(8))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v >> np.uint64(16))) & np.uint64(0x00000000FFFFFFFF)
+    return v.astype(np.int64)
+
+
+def _distinct_sorted(codes):
+    """有序数组中去掉相邻重复的元素。"""
+    if len(codes) == 0:
+        return codes
+    keep = np.empty(len(codes), dtype=bool)
+    keep[0] = True
+    np.not_equal(codes[1:], codes[:-1], out=keep[1:])
+    return codes[keep]
+
+
+class BoxCounter:
+    """
+    在固定的边界内累积点集的最细一级占据格子，一次给出所有尺度的盒计数。
+
+    网格原点为 (xmin, ymin)，格子为正方形，最细一级边长 h = L / 2^bits，
+    其中 L 为边界的较长边。
+
+    Args:
+        bounds (tuple): (xmin, ymin, xmax, ymax)；所有点都应落在其中 (越界的点归入边缘格子)。
+        bits (int): 最细一级每个坐标轴的格子数为 2^bits (1 ~ 31)。
+        method (str): 'unique' (有序 Morton 编码) 或 'pyramid' (稠密占据网格)；
+            默认 bits 不超过 12 时使用 'pyramid'，否则使用 'unique'。
+    """
+
+    def __init__(self, bounds, bits=DEFAULT_BITS, method=None):
+        if not 1 <= bits <= 31:
+            raise ValueError(f"bits 必须在 1 ~ 31 之间: {bits}")
+        if method is None:
+            method = 'pyramid' if bits <= _PYRAMID_MAX_BITS else 'unique'
+        if method not in ('unique', 'pyramid'):
+            raise ValueError(f"未知的盒计数方法: {method}")
+        xmin, ymin, xmax, ymax = (float(v) for v in bounds)
+        self.origin = (xmin, ymin)
+        self.extent = (xmax - xmin, ymax - ymin)
+        self.size = max(self.extent) or 1.0
+        self.bits = bits
+        self.method = method
+        self.cell = self.size / (1 << bits)
+        self.num_points = 0
+        if method == 'pyramid':
+            self._grid = np.zeros((1 << bits, 1 << bits), dtype=bool)
+        else:
+            self._codes = np.zeros(0, dtype=np.uint64)
+
+    def _quantize(self, points):
+        """最细一级的格子坐标 (ix, iy)。"""
+        top = (1 << self.bits) - 1
+        scale = 1.0 / self.cell
+        ix = np.clip(np.floor((points[:, 0] - self.origin[0]) * scale), 0, top).astype(np.int64)
+        iy = np.clip(np.floor((points[:, 1] - self.origin[1]) * scale), 0, top).astype(np.int64)
+        return ix, iy
+
+    def add(self, points):
+        """
+        加入一块点。
+
+        Args:
+            points (np.ndarray): (n, 2) 的坐标数组。
+        """
+        points = np.asarray(points, dtype=np.float64)
+        for begin in range(0, len(points), _CHUNK):
+            ix, iy = self._quantize(points[begin:begin + _CHUNK])
+            if self.method == 'pyramid':
+                self._grid[iy, ix] = True
+            else:
+                codes = _distinct_sorted(np.sort(_spread_bits(ix) | (_spread_bits(iy) << np.uint64(1))))
+                # 两段有序编码拼接后稳定排序 (归并两个有序段，接近线性时间)
+                merged = np.sort(np.concatenate((self._codes, codes)), kind='stable')
+                self._codes = _distinct_sorted(merged)
+        self.num_points += len(points)
+        return self
+
+    def fine_cells(self):
+        """最细一级所有非空格子的坐标 (ix, iy)。"""
+        if self.method == 'pyramid':
+            iy, ix = np.nonzero(self._grid)
+            return ix, iy
+        return _compact_bits(self._codes), _compact_bits(self._codes >> np.uint64(1))
+
+    def dyadic_counts(self):
+        """
+        二进尺度的盒计数 (精确)。
+
+        Returns:
+            tuple: (epsilons, counts)，第 k 项为边长 L/2^k 的格子数 (k = 0 .. bits)。
+        """
+        counts = np.zeros(self.bits + 1, dtype=np.int64)
+        if self.method == 'pyramid':
+            grid = self._grid
+            for k in range(self.bits, -1, -1):
+                counts[k] = np.count_nonzero(grid)
+                if k:
+                    n = grid.shape[0] // 2
+                    grid = grid.reshape(n, 2, n, 2).any(axis=(1, 3))
+        else:
+            codes = self._codes
+            for k in range(self.bits, -1, -1):
+                counts[k] = len(codes)
+                # 父格子编号 = 子格子编号右移两位，顺序保持不变
+                codes = _distinct_sorted(codes >> np.uint64(2))
+        epsilons = self.size / 2.0 ** np.arange(self.bits + 1)
+        return epsilons, counts
+
+    def counts(self, epsilons):
+        """
+        任意尺度的盒计数。
+
+        网格与 lsystem1.py 的 np.histogram2d 相同：从 (xmin, ymin) 起、边长 epsilon，
+        每个坐标轴 max(1, ceil(范围 / epsilon)) 格，落在最后一条边上的点归入最后一格。
+        每个最细格子按其中心归入所在的格子，因此误差不超过一个最细格子。
+
+        Args:
+            epsilons (array-like): 格子边长。
+
+        Returns:
+            np.ndarray: 各尺度的非空格子数 (int64)。
+        """
+        ix, iy = self.fine_cells()
+        cx = (ix + 0.5) * self.cell
+        cy = (iy + 0.5) * self.cell
+        result = []
+        for epsilon in np.asarray(epsilons, dtype=np.float64).ravel():
+            nx = max(1, int(np.ceil(self.extent[0] / epsilon)))
+            ny = max(1, int(np.ceil(self.extent[1] / epsilon)))
+            bx = np.minimum((cx / epsilon).astype(np.int64), nx - 1)
+            by = np.minimum((cy / epsilon).astype(np.int64), ny - 1)
+            result.append(len(_distinct_sorted(np.sort(bx * ny + by))))
+        return np.array(result, dtype=np.int64)
+
+
+def point_bounds(points):
+    """点集的 (xmin, ymin, xmax, ymax)。"""
+    points = np.asarray(points)
+    return (points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max())
+
+
+def box_counts(points, epsilons=None, bounds=None, bits=DEFAULT_BITS, method=None):
+    """
+    一次遍历求点集在多个尺度下的盒计数。
+
+    Args:
+        points: (N, 2) 坐标数组，或逐块产出 (n, 2) 数组的可迭代对象 (此时必须给出 bounds)。
+        epsilons (array-like): 格子边长；None 表示全部二进尺度 L/2^k (k = 0 .. bits)。
+        bounds (tuple): (xmin, ymin, xmax, ymax)；默认取点集的范围。
+        bits (int): 最细一级的级数，见 BoxCounter。
+        method (str): 见 BoxCounter。
+
+    Returns:
+        tuple: (epsilons, counts)
+    """
+    if isinstance(points, np.ndarray):
+        chunks = (points,)
+        if bounds is None:
+            bounds = point_bounds(points)
+    else:
+        chunks = points
+        if bounds is None:
+            raise ValueError("分块输入的点集必须给出 bounds")
+    counter = BoxCounter(bounds, bits=bits, method=method)
+    for chunk in chunks:
+        counter.add(chunk)
+    if epsilons is None:
+        return counter.dyadic_counts()
+    epsilons = np.asarray(epsilons, dtype=np.float64)
+    return epsilons, counter.counts(epsilons)
+
+
+def fit_dimension(epsilons, counts):
+    """
+    拟合 log N(epsilon) = D·log(1/epsilon) + C。
+
+    计数为 0 的尺度不参与拟合。
+
+    Returns:
+        tuple: (D, C, R^2)
+    """
+    epsilons = np.asarray(epsilons, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.float64)
+    valid = counts > 0
+    x = -np.log(epsilons[valid])
+    y = np.log(counts[valid])
+    if len(x) < 2 or np.ptp(x) == 0:
+        return 0.0, float(y.mean()) if len(y) else 0.0, 0.0
+    slope, intercept = np.polyfit(x, y, 1)
+    residual = y - (slope * x + intercept)
+    total = ((y - y.mean()) ** 2).sum()
+    r_squared = 1.0 - (residual ** 2).sum() / total if total > 0 else 1.0
+    return float(slope), float(intercept), float(r_squared)
+
+
+def vertex_maps(vertices, ratio=0.5):
+    """
+    “向顶点移动 ratio 倍距离”的一组相似映射 x -> (1 - ratio)·x + ratio·v (谢尔宾斯基垫片取 ratio = 0.5)。
+
+    Returns:
+        tuple: (A, b)，A 为 (k, 2, 2) 的线性部分，b 为 (k, 2) 的平移部分。
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    A = np.repeat(((1 - ratio) * np.eye(2))[None], len(vertices), axis=0)
+    return A, ratio * vertices
+
+
+def _burn_in(A):
+    """初始点的影响衰减到双精度舍入误差以下所需的步数。"""
+    contraction = float(np.linalg.norm(A, 2, axis=(1, 2)).max())
+    if contraction >= 1:
+        raise ValueError(f"迭代函数系统必须由压缩映射组成 (最大收缩率 {contraction:.4g})")
+    if contraction == 0:
+        return 1
+    return int(np.ceil(-53 * np.log(2) / np.log(contraction))) + 1
+
+
+def _start_point(maps, start):
+    """初始点；未指定时取第一个映射的不动点。"""
+    if start is not None:
+        return np.asarray(start, dtype=np.float64)
+    A, b = (np.asarray(m, dtype=np.float64) for m in maps)
+    return np.linalg.solve(np.eye(2) - A[0], b[0])
+
+
+def iter_chaos_game(maps, num_points, weights=None, start=None, rng=None, block=_CHUNK, lane=1024):
+    """
+    分块生成迭代函数系统 (混沌游戏) 的点列 x_{n+1} = A_{k_n} x_n + b_{k_n}。
+
+    Args:
+        maps (tuple): (A, b)，A 为 (k, 2, 2)、b 为 (k, 2) 的数组 (例如 vertex_maps 的结果)。
+        num_points (int): 生成的点数 (不含初始点)。
+        weights (array-like): 各映射被选中的概率 (自动归一化)；默认等概率。
+        start (tuple): 初始点 x_0；默认取第一个映射的不动点。
+        rng (np.random.Generator): 随机数生成器；默认使用全局 np.random。
+        block (int): 每块的点数 (决定峰值内存)。
+        lane (int): 每条车道的长度下限；实际取 max(lane, 8·burn_in)。
+
+    Yields:
+        np.ndarray: (n, 2) 的点块，依次为 x_1, x_2, ...
+    """
+    A, b = (np.asarray(m, dtype=np.float64) for m in maps)
+    k = len(A)
+    burn = _burn_in(A)
+    lane = max(lane, 8 * burn)
+    randint = np.random.randint if rng is None else rng.integers
+    choice = np.random.choice if rng is None else rng.choice
+    p = None
+    if weights is not None:
+        p = np.asarray(weights, dtype=np.float64)
+        p = p / p.sum()
+    point = _start_point(maps, start)
+
+    # 系数表末尾追加一个恒等映射 (编号 k)，用于第一条车道的预热段和最后一块的填充
+    a11, a12, a21, a22 = (np.append(A[:, i, j], 1.0 if i == j else 0.0) for i in (0, 1) for j in (0, 1))
+    b1, b2 = np.append(b[:, 0], 0.0), np.append(b[:, 1], 0.0)
+
+    done = 0
+    while done < num_points:
+        n = min(block, num_points - done)
+        lanes = -(-n // lane)
+        # 第 j 条车道负责本块第 j·lane ~ (j+1)·lane - 1 个点，预热使用其前面 burn 个映射编号
+        index = np.full(burn + lanes * lane, k, dtype=np.intp)
+        index[burn:burn + n] = randint(k, size=n) if p is None else choice(k, size=n, p=p)
+        offsets = np.arange(lanes) * lane
+        # 第一条车道从上一个点精确接续 (预热段是恒等映射)，其余车道从同一点出发、经预热后收敛
+        x = np.full(lanes, point[0])
+        y = np.full(lanes, point[1])
+        out_x = np.empty((lane, lanes))
+        out_y = np.empty((lane, lanes))
+        for t in range(burn + lane):
+            kk = index[offsets + t]
+            x, y = a11[kk] * x + a12[kk] * y + b1[kk], a21[kk] * x + a22[kk] * y + b2[kk]
+            if t >= burn:
+                out_x[t - burn] = x
+                out_y[t - burn] = y
+        points = np.stack((out_x.T.ravel()[:n], out_y.T.ravel()[:n]), axis=1)
+        point = points[-1]
+        done += n
+        yield points
+
+
+def chaos_game(maps, num_points, weights=None, start=None, rng=None):
+    """
+    iter_chaos_game 的一次性版本。
+
+    Returns:
+        np.ndarray: (num_points + 1, 2) 的点列，第一行为初始点。
+    """
+    blocks = list(iter_chaos_game(maps, num_points, weights, start, rng))
+    return np.concatenate([_start_point(maps, start)[None]] + blocks)
+
+
+def _rect_edges(rect_batches, exclude):
+    """
+    一批构图中需要计数的边。
+
+    Returns:
+        tuple: (水平边, 垂直边)，各为 (构图编号, 所在坐标, 起点, 终点) 四个 float64/int64 数组。
+    """
+    owners, xs, ys, ws, hs = [], [], [], [], []
+    for i, rects in enumerate(rect_batches):
+        excluded = [rects.palette.index(c) for c in exclude]
+        keep = ~np.isin(rects.color, excluded) & (rects.w > 0) & (rects.h > 0)
+        owners.append(np.full(np.count_nonzero(keep), i, dtype=np.int64))
+        for out, column in ((xs, rects.x), (ys, rects.y), (ws, rects.w), (hs, rects.h)):
+            out.append(column[keep].astype(np.float64))
+    owner, x, y, w, h = (np.concatenate(c) if c else np.zeros(0) for c in (owners, xs, ys, ws, hs))
+    owner = owner.astype(np.int64)
+    owner2 = np.concatenate((owner, owner))
+    horizontal = (owner2, np.concatenate((y, y + h)), np.concatenate((x, x)), np.concatenate((x + w, x + w)))
+    vertical = (owner2, np.concatenate((x, x + w)), np.concatenate((y, y)), np.concatenate((y + h, y + h)))
+    return horizontal, vertical
+
+
+def _merge_runs(group, start, stop):
+    """
+    按 group 分组，求各组整数区间 [start, stop] 的并集。
+
+    Returns:
+        tuple: (group, start, stop)，按 (group, start) 排序、组内互不相交的区间。
+    """
+    order = np.lexsort((start, group))
+    group, start, stop = group[order], start[order], stop[order]
+    if len(group) == 0:
+        return group, start, stop
+    # 组内 stop 的前缀最大值：各组的偏移使前面的组永远小于后面的组
+    span = int(stop.max()) + 2
+    reach = np.maximum.accumulate(group * span + stop) - group * span
+    new_group = np.ones(len(group), dtype=bool)
+    new_group[1:] = group[1:] != group[:-1]
+    previous = np.empty_like(reach)
+    previous[0] = -2
+    previous[1:] = reach[:-1]
+    starts = np.flatnonzero(new_group | (start > previous + 1))
+    return group[starts], start[starts], np.maximum.reduceat(stop, starts)
+
+
+def _run_cells(edges, n):
+    """把边换算为边长 1/n 的格子中的区间：(构图·n + 行/列, 起始格, 结束格)。"""
+    owner, line, lo, hi = edges
+    top = n - 1
+    cell = lambda v: np.clip(np.floor(v * n), 0, top).astype(np.int64)
+    return _merge_runs(owner * n + cell(line), cell(lo), cell(hi))
+
+
+def rect_box_counts(rect_batches, levels=DEFAULT_RECT_LEVELS, exclude=('white',)):
+    """
+    一批构图边界集合的盒计数 (单位画布上边长 2^-k 的格子，k 取 levels)。
+
+    每个格子按左闭右开计，落在画布右边/上边 (坐标 1) 的边归入最后一格，与点集的盒计数一致。
+
+    Args:
+        rect_batches (list): RectBatch 列表。
+        levels (tuple): 尺度级数 k。
+        exclude (tuple): 不参与计数的颜色 (默认白色)。
+
+    Returns:
+        np.ndarray: (构图数, 尺度数) 的 int64 非空格子数。
+    """
+    m = len(rect_batches)
+    counts = np.zeros((m, len(levels)), dtype=np.int64)
+    horizontal, vertical = _rect_edges(rect_batches, exclude)
+    for j, k in enumerate(levels):
+        n = 1 << k
+        h_key, h_lo, h_hi = _run_cells(horizontal, n)
+        v_key, v_lo, v_hi = _run_cells(vertical, n)
+        total = (np.bincount(h_key // n, weights=h_hi - h_lo + 1, minlength=m)
+                 + np.bincount(v_key // n, weights=v_hi - v_lo + 1, minlength=m))
+
+        # 水平段与垂直段共同占据的格子：对每个垂直段 (构图 g, 列 c, 行 lo..hi)，
+        # 检查构图 g 中行号在 lo..hi 之间的水平段 (已按 (构图, 行) 排序，是连续的一段) 是否覆盖列 c
+        v_owner, column = v_key // n, v_key % n
+        first = np.searchsorted(h_key, v_owner * n + v_lo, side='left')
+        last = np.searchsorted(h_key, v_owner * n + v_hi, side='right')
+        lengths = last - first
+        if lengths.sum():
+            which = np.repeat(np.arange(len(v_key)), lengths)
+            candidate = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + first[which]
+            hit = (h_lo[candidate] <= column[which]) & (column[which] <= h_hi[candidate])
+            total -= np.bincount(v_owner[which][hit], minlength=m)
+        counts[:, j] = total
+    return counts
+
+
+def rect_dimensions(rect_batches, levels=DEFAULT_RECT_LEVELS, exclude=('white',)):
+    """
+    一批构图边界集合的盒计数维数 (对每幅构图拟合 log N 与 k·log 2 的斜率)。
+
+    Returns:
+        np.ndarray: 每幅构图一个维数；没有任何边的构图为 nan。
+    """
+    counts = rect_box_counts(rect_batches, levels, exclude)
+    x = np.asarray(levels, dtype=np.float64) * np.log(2)
+    x = x - x.mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = np.log(counts.astype(np.float64))
+        slopes = ((y - y.mean(axis=1, keepdims=True)) * x).sum(axis=1) / (x * x).sum()
+    slopes[(counts == 0).any(axis=1)] = np.nan
+    return slopes
+
+
+# 工作进程状态：(配置, 批次种子, 尺度) 以及引擎
+_worker_state = None
+
+
+def _init_worker(state):
+    global _worker_state
+    profile, seed, levels = state
+    _worker_state = (MondrianEngine(profile), seed, levels)
+
+
+def _run_task(task):
+    start, stop = task
+    engine, seed, levels = _worker_state
+    # compose_lazy 与 compose 结果相同，只是不推导解释器不会读取的部分
+    batches = [engine.compose_lazy(CompositionStreams(seed, index))[0] for index in range(start, stop)]
+    return [len(rects) for rects in batches], rect_dimensions(batches, levels)
+
+
+def composition_dimensions(profile, n, seed=0, levels=DEFAULT_RECT_LEVELS, workers=None, chunk=250):
+    """
+    生成 n 幅构图 (编号 1..n，与 run_batch 的第 i 张图像相同)，计算每幅构图边界的盒计数维数。
+
+    Args:
+        profile (Profile | str): 配置或其名称。
+        n (int): 构图数量。
+        seed (int): 批次种子。
+        levels (tuple): 尺度级数 k (格子边长 2^-k)。
+        workers (int): 工作进程数；None 表示 CPU 核心数，1 表示在当前进程内执行。
+        chunk (int): 每个任务处理的构图数量 (同一任务内的构图一起向量化计数)。
+
+    Returns:
+        tuple: (矩形数量数组, 维数数组)，第 i 项对应编号 i + 1。
+    """
+    if isinstance(profile, str):
+        profile = get_profile(profile)
+    tasks = [(lo, min(lo + chunk, n + 1)) for lo in range(1, n + 1, chunk)]
+    state = (profile, seed, tuple(levels))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+    if workers == 1:
+        _init_worker(state)
+        results = list(map(_run_task, tasks))
+    else:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(state,)) as pool:
+            results = pool.map(_run_task, tasks)
+    sizes = np.array([size for result in results for size in result[0]], dtype=np.int64)
+    dimensions = np.concatenate([result[1] for result in results]) if results else np.zeros(0)
+    return sizes, dimensions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="计算生成构图边界集合的盒计数分形维数")
+    parser.add_argument('--profile', default='v5', help="配置名称 (默认 v5，即 analyze6.py)")
+    parser.add_argument('-n', type=int, default=1000, help="构图数量")
+    parser.add_argument('--seed', type=int, default=0, help="批次种子")
+    parser.add_argument('--workers', type=int, default=None, help="工作进程数")
+    parser.add_argument('--out', default='dimensions.csv', help="输出 CSV 路径")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    sizes, dimensions = composition_dimensions(args.profile, args.n, seed=args.seed, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    with open(args.out, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['index', 'num_rects', 'box_dimension'])
+        writer.writerows(zip(range(1, args.n + 1), sizes.tolist(), dimensions.tolist()))
+    valid = dimensions[~np.isnan(dimensions)]
+    print(f"{args.n} 幅构图，用时 {elapsed:.2f} 秒；有边界的构图 {len(valid)} 幅，"
+          f"维数平均 {valid.mean() if len(valid) else float('nan'):.4f}")
+    print(f"结果已写入 {args.out}")
+
+
+if __name__ == '__main__':
+    main()
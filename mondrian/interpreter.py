@@ -0,0 +1,131 @@
+# ----------------------------------------------------------------------
+# 线性时间、非递归的 L 系统几何解释器
+# ----------------------------------------------------------------------
+# 各版本的 parse_and_subdivide 通过 l_string[0] / l_string[1:] 逐符号消费字符串，
+# 每一步都会复制剩余字符串 (O(n²))，且递归深度受 Python 递归上限限制。
+# 这里用「下标游标 + 显式栈」重写同一套控制流：
+#   * 每个版本只需提供一个 step 函数，描述单个符号的几何含义；
+#   * 游标、括号匹配以及“子分支返回后检查 ']' / '['”的顺序与原递归实现逐步一致，
+#     因此在固定随机种子下得到完全相同的矩形列表。
+# 结果默认写入列式的 RectBatch (见 rects.py)，而不是五元组 list。
+# iter_subdivision 是同一控制流的流式版本：从符号迭代器逐个读取 (只需一个字符的前瞻)，
+# 每解释一个符号就产出对应的矩形，配合 derivation.iter_derivation 可以完全不生成字符串。
+
+from mondrian.rects import RectBatch
+
+# step 函数返回 HALT 表示停止解析整个字符串 (对应原实现中的 `return "", ...`)
+HALT = object()
+
+
+def run_subdivision(l_string, rect, step, *step_args, out=None):
+    """
+    以 O(n) 时间、无递归地解释 L 系统字符串。
+
+    step(char, rect, final_rects, *step_args) 处理一个符号：
+    把需要绘制的矩形追加到 final_rects，并返回
+        None           —— 当前符号处理完毕 (F、过小的 H/V、括号、未定义符号)；
+        (rect1, rect2) —— H/V 分割，随后的 [..][..] 分别解释到两个子矩形；
+        HALT           —— 终止整个解析。
+    字符串耗尽时仍会以 char=None 调用一次 step，与原实现“先检查尺寸、再检查空串”的顺序保持一致。
+
+    Args:
+        l_string (str): L 系统字符串。
+        rect (tuple): 初始矩形 (x, y, w, h)。
+        step (callable): 单符号解释函数。
+        *step_args: 透传给 step 的额外参数 (例如 required_colors_set)。
+        out: 追加结果的容器 (需支持 append)；默认新建一个 RectBatch。
+
+    Returns:
+        tuple: (已消耗的字符数, 最终填充的矩形 RectBatch)
+    """
+    n = len(l_string)
+    pos = 0
+    final_rects = RectBatch() if out is None else out
+    # 栈中每一帧对应一个尚未完成的 H/V 节点：
+    # 保存第二个子矩形表示正在解释第一个分支，None 表示正在解释第二个分支
+    stack = []
+
+    while True:
+        char = l_string[pos] if pos < n else None
+        action = step(char, rect, final_rects, *step_args)
+
+        if action is HALT:
+            pos = n
+        elif char is not None:
+            pos += 1
+
+        if action is not None and action is not HALT:
+            rect1, rect2 = action
+            if pos < n and l_string[pos] == '[':
+                pos += 1 # 跳过 '['
+                stack.append(rect2)
+                rect = rect1
+                continue
+            # 没有 '[' 时第二个分支的检查同样失败，节点直接结束
+
+        # 当前节点结束：逐层返回父节点
+        while stack:
+            pending_rect = stack.pop()
+            if pos < n and l_string[pos] == ']':
+                pos += 1 # 跳过 ']'
+            if pending_rect is not None and pos < n and l_string[pos] == '[':
+                pos += 1 # 跳过 '['
+                stack.append(None)
+                rect = pending_rect
+                break
+        else:
+            return pos, final_rects
+
+
+def iter_subdivision(symbols, rect, step, *step_args):
+    """
+    run_subdivision 的流式版本：从任意符号迭代器读取，边解释边产出矩形。
+
+    控制流与 run_subdivision 逐步一致；step 返回 HALT 后不再读取任何符号，
+    因此上游的惰性推导也随之停止。内存只与括号嵌套深度有关。
+
+    Args:
+        symbols (iterable): 符号序列 (字符串或逐字符产出的生成器)。
+        rect (tuple): 初始矩形 (x, y, w, h)。
+        step (callable): 单符号解释函数，约定同 run_subdivision。
+        *step_args: 透传给 step 的额外参数。
+
+    Yields:
+        tuple: 按绘制顺序产出的矩形 (x, y, w, h, color)。
+    """
+    symbol_iter = iter(symbols)
+    lookahead = next(symbol_iter, None)
+    emitted = []
+    stack = []
+
+    while True:
+        char = lookahead
+        action = step(char, rect, emitted, *step_args)
+        if emitted:
+            yield from emitted
+            emitted.clear()
+
+        if action is HALT:
+            return
+        if char is not None:
+            lookahead = next(symbol_iter, None)
+
+        if action is not None:
+            rect1, rect2 = action
+            if lookahead == '[':
+                lookahead = next(symbol_iter, None) # 跳过 '['
+                stack.append(rect2)
+                rect = rect1
+                continue
+
+        while stack:
+            pending_rect = stack.pop()
+            if lookahead == ']':
+                lookahead = next(symbol_iter, None) # 跳过 ']'
+            if pending_rect is not None and lookahead == '[':
+                lookahead = next(symbol_iter, None) # 跳过 '['
+                stack.append(None)
+                rect = pending_rect
+                break
+        else:
+            return
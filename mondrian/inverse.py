@@ -0,0 +1,239 @@
+# ----------------------------------------------------------------------
+# 逆向模式：由画面恢复 H/V/F 推导树
+# ----------------------------------------------------------------------
+# analyze*.py 由 MONDRIAN_EARLY_RULES (S -> H[S][S] | V[S][S] | F) 推导字符串再解释成构图，
+# revies1.py 从画作中提取几何统计，两者之间没有联系。这里把画面按“断头台切割”逆向分解：
+#   * 线条掩膜 (黑色像素) 只建一张积分图 (colors.summed_area_table)，任一矩形内每一行 / 每一列的
+#     线条像素数都由积分图差分得出，一个矩形的两条投影曲线只需 O(高 + 宽)，不再逐层重新扫描像素；
+#   * 投影中线条像素占比不低于 min_fill 的连续行 (列) 是一条贯穿该矩形的线条。离矩形边缘不足 min_size 的
+#     视为边框并裁掉，其余为候选切割，取最靠近中心的一条 (推导树最浅)，两侧子矩形继续分解；
+#     没有贯穿线条的矩形为 F；
+#   * 用显式栈代替递归，按先序直接写出 H[..][..] / V[..][..] / F 字符串。H 的第一个分支是下方的子矩形
+#     (构图坐标自下而上，与 engine 的解释顺序一致)，V 的第一个分支是左侧的子矩形；
+#   * derivation_log_likelihood 给出该字符串在一套规则与迭代次数下的对数概率，用来比较画作与各个 Profile。
+# 用法 (在仓库根目录)：
+#   python -m mondrian.inverse "composition_*.png" --pad 10
+import argparse
+import glob
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from mondrian.colors import summed_area_table
+from mondrian.profiles import get_profile, profile_names
+
+# 一行 (列) 中线条像素的占比不低于此值时视为贯穿矩形的线条 (扫描件的线条并不完全笔直，且画布四周常有留边)
+DEFAULT_MIN_FILL = 0.85
+
+
+@dataclass(frozen=True)
+class GuillotineTree:
+    """
+    断头台分解的结果。
+
+    Attributes:
+        l_string (str): 等价的 H[..][..] / V[..][..] / F 字符串。
+        leaves (np.ndarray): (n, 4) 的叶子矩形 (x0, y0, x1, y1)，像素坐标，按字符串中 F 的顺序排列。
+        split_ratios (np.ndarray): 各次切割中第一个分支所占的比例 (按线条中心计)，按字符串中 H / V 的顺序排列。
+    """
+
+    l_string: str
+    leaves: np.ndarray
+    split_ratios: np.ndarray
+
+    @property
+    def depth(self):
+        return tree_depth(self.l_string)
+
+
+def tree_depth(l_string):
+    """字符串对应推导树的深度 (只有一个 F 时为 0)。"""
+    depth = deepest = 0
+    for char in l_string:
+        if char == '[':
+            depth += 1
+            deepest = max(deepest, depth)
+        elif char == ']':
+            depth -= 1
+    return deepest
+
+
+def _bars(counts, length, min_fill):
+    """投影中占比不低于 min_fill 的连续区段 [start, stop)。"""
+    full = np.concatenate(([False], counts >= min_fill * length, [False]))
+    change = np.flatnonzero(full[1:] != full[:-1])
+    return change[0::2], change[1::2]
+
+
+def _profiles(table, x0, y0, x1, y1):
+    """矩形内每一行、每一列的线条像素数 (积分图差分)。"""
+    rows = np.diff(table[y0:y1 + 1, x1].astype(np.int64) - table[y0:y1 + 1, x0])
+    cols = np.diff(table[y1, x0:x1 + 1].astype(np.int64) - table[y0, x0:x1 + 1])
+    return rows, cols
+
+
+def _trim(starts, stops, length, min_size):
+    """裁掉离两端不足 min_size 的线条，返回 (新起点, 新终点, 其余线条)。"""
+    low, high = 0, length
+    inner = []
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        if start < min_size:
+            low = max(low, stop)
+        elif stop > length - min_size:
+            high = min(high, start)
+        else:
+            inner.append((start, stop))
+    return low, high, [(a, b) for a, b in inner if a >= low and b <= high]
+
+
+def _find_cut(table, rect, min_fill, min_size):
+    """
+    裁掉矩形的边框，找出最靠近中心的贯穿线条。
+
+    Returns:
+        tuple: (裁剪后的矩形, 切割)；切割为 ('H' | 'V', 线条起点, 线条终点) (相对裁剪后的矩形)，没有时为 None。
+    """
+    x0, y0, x1, y1 = rect
+    # 裁掉横向边框会改变各列的占比 (反之亦然)，重复到矩形不再变化
+    while True:
+        rows, cols = _profiles(table, x0, y0, x1, y1)
+        top, bottom, h_bars = _trim(*_bars(rows, x1 - x0, min_fill), y1 - y0, min_size)
+        left, right, v_bars = _trim(*_bars(cols, y1 - y0, min_fill), x1 - x0, min_size)
+        if (top, bottom, left, right) == (0, y1 - y0, 0, x1 - x0):
+            break
+        x0, y0, x1, y1 = x0 + left, y0 + top, x0 + right, y0 + bottom
+        if x1 - x0 < 1 or y1 - y0 < 1:
+            # 整块都是线条 (例如黑色色块)：作为叶子
+            return rect, None
+    candidates = [('H', a, b, abs((a + b) / 2 / (y1 - y0) - 0.5)) for a, b in h_bars]
+    candidates += [('V', a, b, abs((a + b) / 2 / (x1 - x0) - 0.5)) for a, b in v_bars]
+    if not candidates:
+        return (x0, y0, x1, y1), None
+    char, a, b, _ = min(candidates, key=lambda c: c[3])
+    return (x0, y0, x1, y1), (char, a, b)
+
+
+def guillotine_decompose(line_mask, rect=None, min_fill=DEFAULT_MIN_FILL, min_size=None):
+    """
+    把画面递归地按贯穿的线条切分，恢复等价的 L 系统字符串。
+
+    Args:
+        line_mask (np.ndarray): (H, W) 的线条掩膜 (例如 colors.label_colors(img) == colors.BLACK)。
+        rect (tuple): 分解的范围 (x0, y0, x1, y1)，像素坐标；默认整幅图像。
+            生成的构图四周有 render.DEFAULT_PAD 像素的白边，传入去掉白边的范围时切割比例更准确。
+        min_fill (float): 线条像素占一行 (列) 的比例不低于此值时视为贯穿。
+        min_size (int): 子矩形的最小边长 (像素)；离边缘更近的线条视为边框。None 表示 max(3, 图像长边 / 500)。
+
+    Returns:
+        GuillotineTree
+    """
+    mask = np.asarray(line_mask, dtype=bool)
+    height, width = mask.shape
+    if rect is None:
+        rect = (0, 0, width, height)
+    if min_size is None:
+        min_size = max(3, max(mask.shape) // 500)
+    table = summed_area_table(mask)
+
+    tokens, leaves, ratios = [], [], []
+    # 栈中是待分解的矩形 (tuple) 或待写出的括号 (str)
+    stack = [tuple(int(v) for v in rect)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            tokens.append(item)
+            continue
+        (x0, y0, x1, y1), cut = _find_cut(table, item, min_fill, min_size)
+        if cut is None:
+            tokens.append('F')
+            leaves.append((x0, y0, x1, y1))
+            continue
+        char, a, b = cut
+        if char == 'H':
+            # 第一个分支是下方 (行号较大) 的子矩形
+            first, second = (x0, y0 + b, x1, y1), (x0, y0, x1, y0 + a)
+            ratios.append((y1 - y0 - (a + b) / 2) / (y1 - y0))
+        else:
+            first, second = (x0, y0, x0 + a, y1), (x0 + b, y0, x1, y1)
+            ratios.append((a + b) / 2 / (x1 - x0))
+        tokens.append(char)
+        stack.extend([']', second, '[', ']', first, '['])
+
+    return GuillotineTree(''.join(tokens), np.array(leaves, dtype=np.int64).reshape(-1, 4),
+                          np.array(ratios, dtype=np.float64))
+
+
+def derivation_log_likelihood(l_string, rules, iterations, axiom='S'):
+    """
+    H/V/F 字符串在规则 rules 下迭代 iterations 次推导出的对数概率。
+
+    每个 H / V / F 节点对应公理符号的一次规则选择 (按后继串的首字母对应，权重归一化)；
+    深度达到 iterations 的叶子是未展开的公理符号 (解释时留白)，概率为 1；更深的分割不可能出现。
+
+    Returns:
+        float: 对数概率 (自然对数)；不可能推导出时为 -inf。
+    """
+    weights = {}
+    for probability, successor in rules[axiom]:
+        weights[successor[0]] = weights.get(successor[0], 0.0) + probability
+    total = sum(weights.values())
+    log_p = {char: math.log(w / total) if w > 0 else -math.inf for char, w in weights.items()}
+    depth = 0
+    score = 0.0
+    for char in l_string:
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif depth < iterations:
+            score += log_p.get(char, -math.inf)
+        elif char != 'F':
+            return -math.inf
+    return score
+
+
+def score_profiles(l_string, names=None):
+    """
+    字符串在各个 Profile 的规则与迭代次数下的对数概率。
+
+    Returns:
+        list: [(配置名称, 对数概率), ...]，按对数概率从高到低排列。
+    """
+    names = profile_names() if names is None else names
+    scores = []
+    for name in names:
+        profile = get_profile(name)
+        scores.append((profile.name, derivation_log_likelihood(l_string, profile.rules, profile.iterations)))
+    return sorted(scores, key=lambda item: -item[1])
+
+
+def main(argv=None):
+    import cv2
+
+    from mondrian.colors import BLACK, label_colors
+
+    parser = argparse.ArgumentParser(description="由画作或构图 PNG 恢复 H/V/F 推导树，并按各配置的文法打分")
+    parser.add_argument('images', nargs='+', help="图像文件或通配符")
+    parser.add_argument('--pad', type=int, default=0, help="四周忽略的白边宽度 (生成的构图为 10)")
+    parser.add_argument('--min-fill', type=float, default=DEFAULT_MIN_FILL, help="贯穿线条的最低占比")
+    args = parser.parse_args(argv)
+
+    paths = sorted({p for item in args.images for p in (glob.glob(item) or [item])})
+    for path in paths:
+        img = cv2.imread(path)
+        if img is None:
+            print(f"{path}: 无法读取")
+            continue
+        height, width = img.shape[:2]
+        rect = (args.pad, args.pad, width - args.pad, height - args.pad)
+        tree = guillotine_decompose(label_colors(img) == BLACK, rect, args.min_fill)
+        best, score = score_profiles(tree.l_string)[0]
+        print(f"{path}: {tree.l_string}")
+        ratios = '、'.join(f"{r:.2f}" for r in tree.split_ratios)
+        print(f"  {len(tree.leaves)} 个叶子，深度 {tree.depth}，切割比例 [{ratios}]；"
+              f"最可能的配置 {best} (对数概率 {score:.2f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+# ----------------------------------------------------------------------
+# 轴对齐网格线检测
+# ----------------------------------------------------------------------
+# revies1.py 原先对 Canny 边缘图做完整的 cv2.HoughLines (1° 角度分辨率，180 个角度)，
+# 阈值从 2000 开始、找不到线就降低 200 重新做一次整幅变换，最多十次左右；
+# 而蒙德里安的网格线只有水平、竖直两个方向。这里：
+#   * 角度限定为 θ ∈ {0, π/2}：θ = 0 的累加器第 x 格就是边缘图第 x 列的边缘像素数 (竖直线 x = ρ)，
+#     θ = π/2 的第 y 格就是第 y 行的边缘像素数 (水平线 y = ρ)；
+#   * method='projection'：一次行/列求和得到完整的两条累加器曲线 (默认)；
+#     method='hough'：cv2.HoughLinesWithAccumulator 分别只在 θ = 0 与 θ = π/2 上做变换，得到带票数的峰值；
+#   * 两种方法都只取沿 ρ 方向的局部极大值 (与 cv2.HoughLines 的非极大值抑制规则相同)，
+#     水平、竖直两个方向的阈值分别由各自峰值票数的直方图 (Otsu 类间方差最大) 一次确定，不再反复重跑变换；
+#   * 给出黑色掩膜时不再用票数区分线条：票数不低于 min_votes 的峰值都是候选，
+#     只保留沿一段不短于 min_votes 的黑色线条边缘的 (蒙德里安的线条大多只画到另一条线条为止，
+#     票数远低于贯穿画布的线条，单一阈值会把它们全部丢掉；画布 / 白边的边界不是黑色线条，也随之去掉)；
+#   * 间距不超过 merge_gap 的峰值视为同一条 (略有倾斜或被纹理打断的) 边缘，只保留票数最高的一个；
+#     离图像边缘不超过 merge_gap 的峰值是图像本身的边界，不是网格线。
+# 网格单元 (grid_cells) 直接用 (n, 4) 的边界数组表示，面积为行高与列宽的外积，不构造 shapely 多边形。
+import cv2
+import numpy as np
+
+# Canny 双阈值 (与 revies1.py 原实现相同)
+CANNY_LOW = 50
+CANNY_HIGH = 150
+# 直方图阈值使用的分箱数
+_HISTOGRAM_BINS = 256
+
+
+def edge_map(img_bgr):
+    """BGR 图像的 Canny 边缘图 (uint8，边缘为 255)。"""
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+    return cv2.Canny(gray, CANNY_LOW, CANNY_HIGH)
+
+
+def _local_peaks(votes):
+    """沿 ρ 的局部极大值：严格大于前一格、不小于后一格，且票数为正。"""
+    votes = np.asarray(votes, dtype=np.int64)
+    padded = np.concatenate(([0], votes, [0]))
+    center = padded[1:-1]
+    keep = (center > 0) & (center > padded[:-2]) & (center >= padded[2:])
+    positions = np.flatnonzero(keep)
+    return positions, votes[positions]
+
+
+def _hough_peaks(edges, theta):
+    """只在单个角度 theta 上做 Hough 变换，返回全部带票数的峰值 (按位置排序)。"""
+    found = cv2.HoughLinesWithAccumulator(edges, 1, np.pi / 2, 1, min_theta=theta, max_theta=theta)
+    if found is None:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    found = found.reshape(-1, 3)
+    positions = np.rint(found[:, 0]).astype(np.int64)
+    votes = np.rint(found[:, 2]).astype(np.int64)
+    order = np.argsort(positions, kind='stable')
+    return positions[order], votes[order]
+
+
+def axis_peaks(edges, method='projection'):
+    """
+    边缘图在 θ = π/2 (水平线) 与 θ = 0 (竖直线) 两个方向上的累加器峰值。
+
+    Args:
+        edges (np.ndarray): (H, W) 的二值边缘图 (非零为边缘)。
+        method (str): 'projection' (行/列投影) 或 'hough' (限定角度的 cv2 Hough 变换)。
+
+    Returns:
+        tuple: ((行号, 票数), (列号, 票数))，各为按位置排序的 int64 数组。
+    """
+    if method == 'projection':
+        return (_local_peaks(np.count_nonzero(edges, axis=1)),
+                _local_peaks(np.count_nonzero(edges, axis=0)))
+    if method == 'hough':
+        edges = np.ascontiguousarray(edges, dtype=np.uint8)
+        return _hough_peaks(edges, np.pi / 2), _hough_peaks(edges, 0.0)
+    raise ValueError(f"未知的直线检测方法: {method}")
+
+
+def histogram_threshold(votes, bins=_HISTOGRAM_BINS):
+    """
+    由票数直方图确定阈值 (Otsu：使“背景纹理”与“网格线”两类的类间方差最大)。
+
+    Returns:
+        float: 阈值；票数严格大于它的峰值视为直线。票数全部相同时返回 0。
+    """
+    votes = np.asarray(votes, dtype=np.float64)
+    if len(votes) == 0 or votes.min() == votes.max():
+        return 0.0
+    counts, edges = np.histogram(votes, bins=bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    weight = np.cumsum(counts)
+    mass = np.cumsum(counts * centers)
+    total_weight, total_mass = weight[-1], mass[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (total_mass * weight - mass * total_weight) ** 2 / (weight * (total_weight - weight))
+    between[~np.isfinite(between)] = -1
+    # 分割点取第 k 个分箱的右边界：票数不超过它的归入背景
+    return float(edges[int(np.argmax(between)) + 1])
+
+
+def _merge_close(positions, votes, gap):
+    """间距不超过 gap 的相邻峰值归为一组，每组保留票数最高者 (并列时取靠前的)。"""
+    if len(positions) == 0:
+        return positions
+    group = np.concatenate(([0], np.cumsum(np.diff(positions) > gap)))
+    # 组号升序、组内票数降序，每组的第一个即为最强峰值
+    order = np.lexsort((positions, -votes, group))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = group[order][1:] != group[order][:-1]
+    return np.sort(positions[order][first])
+
+
+def band_presence(black, position, band):
+    """
+    black 第 position 行两侧各 band 行的窄带中，每一列是否有线条经过。
+
+    网格线位于黑色线条的边缘 (手绘边缘并不笔直) 或中间：窄带中至少四分之一的行为黑色才算经过。
+    竖直线传入 black.T。
+    """
+    rows = black[max(0, position - band):position + band + 1]
+    return np.count_nonzero(rows, axis=0) >= max(1, len(rows) // 4)
+
+
+def _longest_run(present):
+    """布尔序列中最长的连续 True 的长度。"""
+    padded = np.concatenate(([False], present, [False]))
+    change = np.flatnonzero(padded[1:] != padded[:-1])
+    return int((change[1::2] - change[0::2]).max()) if len(change) else 0
+
+
+def _on_line_edge(black, position, band, min_run):
+    """
+    第 position 行是否沿一段不短于 min_run 的黑色线条的边缘 (或细线条的中间)。
+
+    窄带整体都是黑色的列不算：粗线条内部的裂纹、笔触同样是边缘，但两侧都是线条，不是网格线。
+    """
+    rows = black[max(0, position - band):position + band + 1]
+    count = np.count_nonzero(rows, axis=0)
+    return _longest_run((count >= max(1, len(rows) // 4)) & (count < len(rows))) >= min_run
+
+
+def _select(positions, votes, threshold, merge_gap, length, black, min_run):
+    """一个方向的网格线：票数过阈值、去掉图像边界，给出掩膜时确认沿黑色线条边缘，再合并相邻峰值。"""
+    keep = (votes > threshold) & (positions > merge_gap) & (positions < length - 1 - merge_gap)
+    if black is not None:
+        # 先确认再合并：粗线条内部密集的弱峰值会把相邻的真实边缘串成一组
+        keep[keep] = [_on_line_edge(black, p, merge_gap, min_run) for p in positions[keep].tolist()]
+    return _merge_close(positions[keep], votes[keep], merge_gap).tolist()
+
+
+def detect_grid_lines(edges, method='projection', threshold=None, merge_gap=None, black=None, min_votes=None):
+    """
+    检测轴对齐的网格线。
+
+    Args:
+        edges (np.ndarray): (H, W) 的二值边缘图，见 edge_map。
+        method (str): 见 axis_peaks。
+        threshold (float): 票数阈值；None 表示自动确定 (见 black)。
+        merge_gap (int): 合并相邻峰值的最大间距 (像素)；None 表示取 max(3, 图像长边 / 500)。
+        black (np.ndarray): (H, W) 的黑色掩膜 (colors.label_colors(img) == colors.BLACK)。
+            给出时阈值默认为 min_votes，只保留沿一段不短于 min_votes 的黑色线条边缘的峰值；
+            None 时两个方向的阈值分别由各自的票数直方图确定。
+        min_votes (int): 候选峰值的最低票数与黑色线条的最短长度 (像素)；None 表示 4 × merge_gap。
+
+    Returns:
+        tuple: (水平线的 y 坐标列表, 竖直线的 x 坐标列表)，均为升序的整数列表。
+    """
+    (rows, row_votes), (cols, col_votes) = axis_peaks(edges, method)
+    if merge_gap is None:
+        merge_gap = max(3, max(edges.shape) // 500)
+    if min_votes is None:
+        min_votes = 4 * merge_gap
+    if threshold is not None:
+        row_threshold = col_threshold = threshold
+    elif black is not None:
+        row_threshold = col_threshold = min_votes - 1
+    else:
+        row_threshold, col_threshold = histogram_threshold(row_votes), histogram_threshold(col_votes)
+    height, width = edges.shape
+    black_t = None if black is None else np.asarray(black, dtype=bool).T
+    h_lines = _select(rows, row_votes, row_threshold, merge_gap, height, black, min_votes)
+    v_lines = _select(cols, col_votes, col_threshold, merge_gap, width, black_t, min_votes)
+    return h_lines, v_lines
+
+
+def grid_cells(h_lines, v_lines):
+    """
+    相邻水平线与相邻竖直线围成的全部网格单元。
+
+    Returns:
+        tuple: (bounds, areas)。bounds 为 (n, 4) 的 (x1, y1, x2, y2)，按行优先排列
+        (先自上而下、行内自左而右)；areas 为行高与列宽外积展开的 (n,) 面积。
+    """
+    ys = np.asarray(h_lines, dtype=np.float64)
+    xs = np.asarray(v_lines, dtype=np.float64)
+    if len(ys) < 2 or len(xs) < 2:
+        return np.zeros((0, 4)), np.zeros(0)
+    y1, x1 = np.meshgrid(ys[:-1], xs[:-1], indexing='ij')
+    y2, x2 = np.meshgrid(ys[1:], xs[1:], indexing='ij')
+    bounds = np.stack((x1.ravel(), y1.ravel(), x2.ravel(), y2.ravel()), axis=1)
+    return bounds, np.outer(np.diff(ys), np.diff(xs)).ravel()
@@ -0,0 +1,247 @@
+# ----------------------------------------------------------------------
+# 各版本构图规则的参数化描述
+# ----------------------------------------------------------------------
+# analyze1.py ~ analyze9.py 的生成器只在下列常量上不同：
+#   MONDRIAN_EARLY_RULES、COLORS、SPLIT_RATIOS、线条宽度、MAX_RECT_DIMENSION、
+#   MAX_ASPECT_RATIO、GRID_COLORS 等。
+# 这里把每个版本写成一个不可变的 Profile，由 engine.MondrianEngine 统一解释；
+# 各 analyze*.py 只保留主程序和绘图部分。
+from dataclasses import dataclass, field, replace
+
+# analyze8.py / analyze9.py 使用的加深色
+DEEPER_YELLOW = '#FFD700' # 深黄色 (黄金色)
+DEEPER_GRAY = '#C0C0C0'   # 深灰色 (银灰色)
+
+PRIMARIES = ('red', 'yellow', 'blue')
+
+
+@dataclass(frozen=True)
+class Profile:
+    """
+    一个版本的全部生成参数。
+
+    Attributes:
+        name (str): 配置名称。
+        description (str): 简短说明。
+        rules (dict): 产生式规则，格式同 MONDRIAN_EARLY_RULES。
+        iterations (int): 主程序使用的迭代次数。
+        colors (tuple): 填充颜色 (可重复以表示权重)。
+        split_ratios (tuple): H/V 分割比例候选。
+        min_size (float): 最小可绘制尺寸。
+        interpreter (str): 解释规则：'classic' (analyze1~7)、'boogie_woogie' (analyze8)、
+            'boogie_woogie_strict' (analyze9)。
+        line_width (float): 分割线宽度 (中心值)；None 表示分割不留线条。
+        line_width_deviation (float): 线宽随机浮动范围；0 表示固定线宽。
+        grid_colors (tuple): 线条颜色候选；为空时线条为黑色。
+        grid_fill_probability (float): 破碎线条中每个小方块着色 (而非留白) 的概率。
+        primaries (tuple): 原色。
+        required_primaries (int): 每幅构图强制出现的原色数量 (0 表示不强制)。
+        narrow_threshold (float): 过细分割阈值；None 表示不重选分割比例。
+        narrow_retry_probability (float): 过细分割时重选比例的概率。
+        narrow_max_attempts (int): 重选比例的最大次数。
+        max_rect_dimension (float): 色块的最大边长 (仅 Boogie-Woogie 版本)。
+        max_aspect_ratio (float): 色块的最大纵横比 (仅 Boogie-Woogie 版本)。
+        min_length, max_length (int): 主程序接受的 L 系统字符串长度范围 (max_length=None 表示不限)。
+    """
+
+    name: str
+    description: str
+    rules: dict
+    iterations: int
+    colors: tuple
+    split_ratios: tuple
+    min_size: float = 0.005
+    interpreter: str = 'classic'
+    line_width: float = None
+    line_width_deviation: float = 0.0
+    grid_colors: tuple = ()
+    grid_fill_probability: float = 0.85
+    primaries: tuple = PRIMARIES
+    required_primaries: int = 0
+    narrow_threshold: float = None
+    narrow_retry_probability: float = 0.90
+    narrow_max_attempts: int = 5
+    max_rect_dimension: float = None
+    max_aspect_ratio: float = None
+    min_length: int = 0
+    max_length: int = None
+    # 别名只用于查找，不参与比较
+    aliases: tuple = field(default=(), compare=False)
+
+    @property
+    def line_width_min(self):
+        return self.line_width - self.line_width_deviation
+
+    @property
+    def line_width_max(self):
+        return self.line_width + self.line_width_deviation
+
+    def with_params(self, **changes):
+        """返回修改了部分参数的新 Profile (原配置不变)。"""
+        return replace(self, **changes)
+
+
+def _rules(h, v, f):
+    return {
+        'S': [
+            (h, 'H[S][S]'),
+            (v, 'V[S][S]'),
+            (f, 'F'),
+        ],
+    }
+
+
+_SPLIT_RATIOS = (0.25, 0.33, 0.4, 0.6, 0.67, 0.75)
+
+_PROFILE_LIST = [
+    # analyze1.py：无分割线，矩形边框由绘图时的黑色描边模拟
+    Profile(
+        name='v1',
+        description='早期构图：无分割线，五色均匀填充',
+        rules=_rules(0.40, 0.40, 0.20),
+        iterations=5,
+        colors=('red', 'yellow', 'blue', 'white', 'lightgray'),
+        split_ratios=(0.33, 0.4, 0.5, 0.6, 0.67),
+        aliases=('analyze1',),
+    ),
+    # analyze2.py：独立的黑色线条矩形，白色占主导
+    Profile(
+        name='v2',
+        description='固定宽度黑色分割线',
+        rules=_rules(0.45, 0.45, 0.40),
+        iterations=5,
+        colors=('white',) * 4 + ('red', 'yellow', 'blue') * 6,
+        split_ratios=_SPLIT_RATIOS,
+        line_width=0.005,
+        aliases=('analyze2',),
+    ),
+    # analyze3.py：强制三原色都出现
+    Profile(
+        name='v3',
+        description='黑色分割线，强制出现全部三原色',
+        rules=_rules(0.30, 0.30, 0.40),
+        iterations=5,
+        colors=('white',) * 10 + ('red', 'yellow', 'blue') * 4,
+        split_ratios=_SPLIT_RATIOS,
+        line_width=0.005,
+        required_primaries=3,
+        aliases=('analyze3',),
+    ),
+    # analyze4.py：加入浅灰色，拒绝单色页面
+    Profile(
+        name='v3_gray',
+        description='加入浅灰色 (0.9)，拒绝只有一个矩形的页面',
+        rules=_rules(0.35, 0.25, 0.40),
+        iterations=5,
+        colors=('white',) * 40 + ('red', 'yellow', 'blue') * 4 + ('0.9',) * 10,
+        split_ratios=_SPLIT_RATIOS,
+        line_width=0.005,
+        required_primaries=3,
+        min_length=2,
+        aliases=('analyze4',),
+    ),
+    # analyze5.py：随机线条粗细，随机强制两种原色
+    Profile(
+        name='v4',
+        description='随机线宽，随机强制两种原色',
+        rules=_rules(0.35, 0.25, 0.40),
+        iterations=5,
+        colors=('white',) * 40 + ('red', 'yellow', 'blue') * 4 + ('0.9',) * 10,
+        split_ratios=_SPLIT_RATIOS,
+        line_width=0.005,
+        line_width_deviation=0.001,
+        required_primaries=2,
+        min_length=2,
+        aliases=('analyze5',),
+    ),
+    # analyze6.py：粗线条，降低过细分割的概率
+    Profile(
+        name='v5',
+        description='粗线条，过细分割以 90% 的概率重选比例',
+        rules=_rules(0.35, 0.35, 0.30),
+        iterations=3,
+        colors=('white',) * 60 + ('red', 'yellow', 'blue') * 4 + ('0.9',) * 20,
+        split_ratios=_SPLIT_RATIOS,
+        line_width=0.020,
+        line_width_deviation=0.002,
+        required_primaries=2,
+        narrow_threshold=1 / 5,
+        min_length=2,
+        aliases=('analyze6',),
+    ),
+    # analyze7.py：彩色网格线 (Boogie-Woogie 的雏形)
+    Profile(
+        name='v6_boogie_woogie',
+        description='彩色网格线，以黄红为主',
+        rules=_rules(0.40, 0.40, 0.20),
+        iterations=6,
+        colors=('white',) * 20 + ('red', 'yellow', 'blue') * 6 + ('0.9',) * 10,
+        split_ratios=_SPLIT_RATIOS,
+        line_width=0.005,
+        line_width_deviation=0.001,
+        grid_colors=('red', 'yellow') * 5 + ('0.9',) * 2,
+        required_primaries=2,
+        min_length=2,
+        aliases=('analyze7', 'v6'),
+    ),
+    # analyze8.py：破碎线条，色块尺寸和纵横比受限
+    Profile(
+        name='v10_boogie_woogie',
+        description='破碎彩色线条，色块最大边长 1/20',
+        rules=_rules(0.40, 0.40, 0.20),
+        iterations=8,
+        colors=('white',) * 50 + ('red', DEEPER_YELLOW, 'blue') * 2 + (DEEPER_GRAY,) * 15,
+        split_ratios=_SPLIT_RATIOS,
+        interpreter='boogie_woogie',
+        line_width=0.010,
+        line_width_deviation=0.002,
+        grid_colors=('red', DEEPER_YELLOW, 'blue', DEEPER_GRAY) * 4,
+        primaries=('red', DEEPER_YELLOW, 'blue'),
+        required_primaries=2,
+        max_rect_dimension=1 / 20,
+        max_aspect_ratio=1.5,
+        min_length=10,
+        max_length=1000,
+        aliases=('analyze8', 'v10'),
+    ),
+    # analyze9.py：任何不合格区域整体留白并终止解析
+    Profile(
+        name='v11_boogie_woogie',
+        description='严格尺寸检查：不合格区域留白并终止，色块最大边长 1/12',
+        rules=_rules(0.40, 0.40, 0.20),
+        iterations=8,
+        colors=('white',) * 50 + ('red', DEEPER_YELLOW, 'blue') * 2 + (DEEPER_GRAY,) * 15,
+        split_ratios=_SPLIT_RATIOS,
+        interpreter='boogie_woogie_strict',
+        line_width=0.010,
+        line_width_deviation=0.002,
+        grid_colors=('red', DEEPER_YELLOW, 'blue', DEEPER_GRAY) * 4,
+        primaries=('red', DEEPER_YELLOW, 'blue'),
+        required_primaries=2,
+        max_rect_dimension=1 / 12,
+        max_aspect_ratio=1.5,
+        min_length=10,
+        max_length=1000,
+        aliases=('analyze9', 'v11'),
+    ),
+]
+
+# 名称 (及别名) 到配置的映射
+PROFILES = {}
+for _profile in _PROFILE_LIST:
+    PROFILES[_profile.name] = _profile
+    for _alias in _profile.aliases:
+        PROFILES[_alias] = _profile
+
+
+def profile_names():
+    """所有配置的正式名称 (不含别名)，按版本顺序排列。"""
+    return [profile.name for profile in _PROFILE_LIST]
+
+
+def get_profile(name):
+    """按名称或别名 (如 'v11'、'analyze9') 查找配置。"""
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"未知的配置: {name}，可选: {', '.join(profile_names())}") from None
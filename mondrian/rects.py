@@ -0,0 +1,190 @@
+# ----------------------------------------------------------------------
+# 列式矩形存储
+# ----------------------------------------------------------------------
+# 解释器原先返回 (x, y, w, h, color) 五元组组成的 list：每个矩形一个 tuple、
+# 四个 float 对象和一个指针，约 180 字节。RectBatch 按列存储：
+#   x / y / w / h 为 float32 数组，颜色为指向共享调色板的 uint8 下标，每个矩形 17 字节。
+# 它提供与 list 相同的 append / len / 迭代接口，解释器可以直接向其中追加。
+import numpy as np
+
+_INITIAL_CAPACITY = 64
+
+
+class Palette:
+    """颜色字符串 ('white'、'#FFD700'、'0.9' 等) 与 uint8 下标之间的对照表。"""
+
+    def __init__(self, colors=()):
+        self.colors = []
+        self._index = {}
+        for color in colors:
+            self.index(color)
+
+    def index(self, color):
+        """返回颜色的下标，首次出现时登记。"""
+        i = self._index.get(color)
+        if i is None:
+            i = len(self.colors)
+            if i > 255:
+                raise ValueError("调色板最多容纳 256 种颜色")
+            self._index[color] = i
+            self.colors.append(color)
+        return i
+
+    def __len__(self):
+        return len(self.colors)
+
+    def __getitem__(self, i):
+        return self.colors[i]
+
+
+# 所有 RectBatch 默认共享同一张调色板，不同构图之间的颜色下标可以直接比较
+SHARED_PALETTE = Palette(['white', 'black'])
+
+
+class RectBatch:
+    """
+    按列存储的矩形集合。
+
+    Attributes:
+        x, y, w, h (np.ndarray): float32 坐标与尺寸 (长度为 len(batch) 的视图)。
+        color (np.ndarray): uint8 颜色下标，对应 palette 中的颜色。
+        palette (Palette): 颜色对照表。
+    """
+
+    __slots__ = ('palette', '_size', '_x', '_y', '_w', '_h', '_color')
+
+    def __init__(self, palette=None, capacity=_INITIAL_CAPACITY):
+        self.palette = SHARED_PALETTE if palette is None else palette
+        self._size = 0
+        self._allocate(max(capacity, 1))
+
+    def _allocate(self, capacity):
+        n = self._size
+        for name, dtype in (('_x', np.float32), ('_y', np.float32), ('_w', np.float32),
+                            ('_h', np.float32), ('_color', np.uint8)):
+            column = np.empty(capacity, dtype=dtype)
+            if n:
+                column[:n] = getattr(self, name)[:n]
+            setattr(self, name, column)
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._x)
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            self._allocate(capacity)
+
+    def add(self, x, y, w, h, color):
+        """追加一个矩形。"""
+        i = self._size
+        if i == len(self._x):
+            self._allocate(2 * i)
+        self._x[i] = x
+        self._y[i] = y
+        self._w[i] = w
+        self._h[i] = h
+        self._color[i] = self.palette.index(color)
+        self._size = i + 1
+
+    def claim(self, n):
+        """追加 n 个占位行 (内容未定义，稍后用 assign 写入)，返回第一行的下标。"""
+        self._reserve(n)
+        start = self._size
+        self._size = start + n
+        return start
+
+    def assign(self, index, x, y, w, h, color):
+        """
+        按下标批量写入矩形 (配合 claim 使用)。
+
+        Args:
+            index (np.ndarray): 行下标。
+            x, y, w, h (np.ndarray): 坐标与尺寸。
+            color (np.ndarray): 颜色在 palette 中的下标。
+        """
+        self._x[index] = x
+        self._y[index] = y
+        self._w[index] = w
+        self._h[index] = h
+        self._color[index] = color
+
+    def append(self, rect):
+        """以 (x, y, w, h, color) 元组追加，与 list.append 兼容。"""
+        self.add(*rect)
+
+    def extend(self, rects):
+        """追加另一批矩形 (RectBatch 或任意五元组序列)。"""
+        if isinstance(rects, RectBatch):
+            n = len(rects)
+            self._reserve(n)
+            i = self._size
+            self._x[i:i + n] = rects.x
+            self._y[i:i + n] = rects.y
+            self._w[i:i + n] = rects.w
+            self._h[i:i + n] = rects.h
+            if rects.palette is self.palette:
+                self._color[i:i + n] = rects.color
+            else:
+                lut = np.array([self.palette.index(c) for c in rects.palette.colors], dtype=np.uint8)
+                self._color[i:i + n] = lut[rects.color]
+            self._size = i + n
+        else:
+            for rect in rects:
+                self.append(rect)
+
+    @property
+    def x(self):
+        return self._x[:self._size]
+
+    @property
+    def y(self):
+        return self._y[:self._size]
+
+    @property
+    def w(self):
+        return self._w[:self._size]
+
+    @property
+    def h(self):
+        return self._h[:self._size]
+
+    @property
+    def color(self):
+        return self._color[:self._size]
+
+    def color_names(self):
+        """每个矩形的颜色字符串列表 (按绘制顺序)。"""
+        colors = self.palette.colors
+        return [colors[i] for i in self.color.tolist()]
+
+    def total_area(self):
+        """所有矩形的面积之和。"""
+        return float(np.dot(self.w.astype(np.float64), self.h.astype(np.float64)))
+
+    def color_counts(self):
+        """各颜色的矩形数量，按颜色首次出现的顺序排列 (与逐个累加得到的字典一致)。"""
+        present, first = np.unique(self.color, return_index=True)
+        counts = np.bincount(self.color, minlength=len(self.palette))
+        return {self.palette[i]: int(counts[i]) for i in present[np.argsort(first)]}
+
+    def nbytes(self):
+        """有效数据占用的字节数。"""
+        return self._size * (4 * 4 + 1)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return zip(self.x.tolist(), self.y.tolist(), self.w.tolist(), self.h.tolist(), self.color_names())
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("RectBatch 下标越界")
+        return (float(self._x[i]), float(self._y[i]), float(self._w[i]), float(self._h[i]),
+                self.palette[self._color[i]])
+
+    def __repr__(self):
+        return f"RectBatch({self._size} rects, {len(self.palette)} colors)"
@@ -0,0 +1,210 @@
+# ----------------------------------------------------------------------
+# 直接栅格化的构图渲染器
+# ----------------------------------------------------------------------
+# plot_and_save_composition 原先为每个矩形创建一个 matplotlib patches.Rectangle，
+# 再用 savefig(bbox_inches='tight') 输出；analyze9.py 的断线网格每幅图有上千个 artist。
+# 构图只包含轴对齐、无边框的矩形，因此可以直接：
+#   * 把 [0,1]×[0,1] 坐标一次性换算成整数像素边界 (y 轴翻转，原点在左下角)；
+#   * 按绘制顺序用切片赋值把调色板下标写入 uint8 缓冲区 (每像素 1 字节)；
+#   * 用 zlib + struct 编码索引色 PNG (Up 过滤)，不依赖 matplotlib / PIL。
+# 默认尺寸 616 像素画布加 10 像素白边 (共 636×636)，与原 figsize=(8, 8)、aspect=equal、pad_inches=0.1 的输出一致。
+import struct
+import zlib
+
+import numpy as np
+
+DEFAULT_SIZE = 616
+DEFAULT_PAD = 10
+
+# 各版本实际用到的颜色 (取值与 matplotlib 的 CSS4 颜色表一致)
+_NAMED_COLORS = {
+    'white': (255, 255, 255),
+    'black': (0, 0, 0),
+    'red': (255, 0, 0),
+    'blue': (0, 0, 255),
+    'yellow': (255, 255, 0),
+    'lightgray': (211, 211, 211),
+    'lightgrey': (211, 211, 211),
+    'gray': (128, 128, 128),
+    'grey': (128, 128, 128),
+}
+
+_rgb_cache = {}
+
+
+def color_to_rgb(color):
+    """
+    把 matplotlib 风格的颜色字符串转换为 (r, g, b) 整数三元组。
+
+    支持颜色名、'#RRGGBB' 以及灰度字符串 (如 '0.9')；其余写法交给 matplotlib 解析。
+    """
+    rgb = _rgb_cache.get(color)
+    if rgb is not None:
+        return rgb
+
+    key = color.strip().lower()
+    if key in _NAMED_COLORS:
+        rgb = _NAMED_COLORS[key]
+    elif key.startswith('#') and len(key) == 7:
+        rgb = tuple(int(key[i:i + 2], 16) for i in (1, 3, 5))
+    else:
+        try:
+            level = float(key)
+        except ValueError:
+            level = None
+        if level is not None and 0.0 <= level <= 1.0:
+            rgb = (int(round(level * 255)),) * 3
+        else:
+            # 不常见的颜色写法才需要 matplotlib，按需导入
+            from matplotlib.colors import to_rgb
+            rgb = tuple(int(round(c * 255)) for c in to_rgb(color))
+
+    _rgb_cache[color] = rgb
+    return rgb
+
+
+def palette_lut(palette):
+    """把调色板 (Palette) 转换为 (len(palette), 3) 的 uint8 颜色查找表。"""
+    return np.array([color_to_rgb(c) for c in palette.colors], dtype=np.uint8).reshape(-1, 3)
+
+
+def _pixel_bounds(rect_data, size):
+    """一次性换算所有矩形的像素边界 (行号自上而下)；非零尺寸的矩形至少占一个像素。"""
+    x = rect_data.x.astype(np.float64)
+    y = rect_data.y.astype(np.float64)
+    x0 = np.rint(x * size).astype(np.int64)
+    x1 = np.rint((x + rect_data.w) * size).astype(np.int64)
+    y0 = np.rint(y * size).astype(np.int64)
+    y1 = np.rint((y + rect_data.h) * size).astype(np.int64)
+    x1 = np.where(rect_data.w > 0, np.maximum(x1, x0 + 1), x0)
+    y1 = np.where(rect_data.h > 0, np.maximum(y1, y0 + 1), y0)
+    np.clip(x0, 0, size, out=x0)
+    np.clip(x1, 0, size, out=x1)
+    # 图像行号自上而下，构图坐标自下而上
+    row0 = size - np.clip(y1, 0, size)
+    row1 = size - np.clip(y0, 0, size)
+    return row0, row1, x0, x1
+
+
+def render_indices(rect_data, size=DEFAULT_SIZE, pad=DEFAULT_PAD, background='white', index_map=None):
+    """
+    把矩形集合栅格化为调色板下标图像 (每像素 1 字节)。
+
+    Args:
+        rect_data (RectBatch): 矩形集合，坐标位于 [0,1]×[0,1]。
+        size (int): 画布边长 (像素)。
+        pad (int): 画布四周的白边宽度 (像素)。
+        background (str): 画布背景色。
+        index_map (np.ndarray): 可选的 256 项下标重映射表，写入前作用于每个颜色下标。
+
+    Returns:
+        np.ndarray: 形状为 (size + 2*pad, size + 2*pad) 的 uint8 图像，
+        取值为 rect_data.palette 中的下标 (或经 index_map 映射后的下标)。
+    """
+    palette = rect_data.palette
+    color = rect_data.color
+    white = palette.index('white')
+    fill = palette.index(background)
+    if index_map is not None:
+        color = index_map[color]
+        white = index_map[white]
+        fill = index_map[fill]
+
+    total = size + 2 * pad
+    image = np.full((total, total), white, dtype=np.uint8)
+    canvas = image[pad:pad + size, pad:pad + size]
+    canvas[:] = fill
+
+    if len(rect_data) == 0:
+        return image
+
+    row0, row1, x0, x1 = _pixel_bounds(rect_data, size)
+    # 后绘制的矩形覆盖先绘制的，必须按顺序写入
+    for r0, r1, c0, c1, c in zip(row0.tolist(), row1.tolist(), x0.tolist(), x1.tolist(), color.tolist()):
+        if r0 < r1 and c0 < c1:
+            canvas[r0:r1, c0:c1] = c
+    return image
+
+
+def render_rects(rect_data, size=DEFAULT_SIZE, pad=DEFAULT_PAD, background='white'):
+    """
+    把矩形集合栅格化为 RGB 图像。
+
+    Args:
+        同 render_indices。
+
+    Returns:
+        np.ndarray: 形状为 (size + 2*pad, size + 2*pad, 3) 的 uint8 图像。
+    """
+    indices = render_indices(rect_data, size=size, pad=pad, background=background)
+    return palette_lut(rect_data.palette)[indices]
+
+
+def _png_chunk(tag, data):
+    return (struct.pack('>I', len(data)) + tag + data
+            + struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+
+def _png_rows(pixels):
+    """按 PNG 的 Up 过滤 (类型 2) 组织扫描行：构图中大部分行与上一行相同，差分后几乎全为 0。"""
+    height = pixels.shape[0]
+    rows = pixels.reshape(height, -1)
+    raw = np.empty((height, rows.shape[1] + 1), dtype=np.uint8)
+    raw[:, 0] = 2
+    raw[0, 1:] = rows[0]
+    np.subtract(rows[1:], rows[:-1], out=raw[1:, 1:])
+    return raw.tobytes()
+
+
+def encode_png(image, palette=None, compress_level=1):
+    """
+    编码 PNG。
+
+    Args:
+        image (np.ndarray): (H, W, 3) 的 uint8 RGB 图像；或配合 palette 使用的 (H, W) 下标图像。
+        palette (np.ndarray): 下标图像对应的 (n, 3) uint8 颜色表，提供时写出索引色 PNG (每像素 1 字节)。
+        compress_level (int): zlib 压缩级别。
+
+    Returns:
+        bytes: PNG 文件内容。
+    """
+    height, width = image.shape[:2]
+    if palette is None:
+        header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+        extra = b''
+    else:
+        header = struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)
+        extra = _png_chunk(b'PLTE', np.ascontiguousarray(palette, dtype=np.uint8).tobytes())
+    return (b'\x89PNG\r\n\x1a\n'
+            + _png_chunk(b'IHDR', header)
+            + extra
+            + _png_chunk(b'IDAT', zlib.compress(_png_rows(image), compress_level))
+            + _png_chunk(b'IEND', b''))
+
+
+def _canonical_palette(rect_data, background='white'):
+    """
+    为构图建立只含用到的颜色、按 RGB 排序的紧凑调色板。
+
+    共享调色板的下标取决于各进程遇到颜色的先后，直接写出会让同一幅构图在不同进程中得到不同的文件字节；
+    按 RGB 值重新编号后，输出只取决于构图内容。
+
+    Returns:
+        tuple: (256 项下标重映射表, (n, 3) uint8 颜色表)
+    """
+    palette = rect_data.palette
+    lut = palette_lut(palette)
+    # 用到的颜色只取决于矩形列表 (外加白边和背景)，不必扫描整幅图像
+    used = np.union1d(rect_data.color, [palette.index('white'), palette.index(background)])
+    colors, remap = np.unique(lut[used], axis=0, return_inverse=True)
+    index_map = np.zeros(256, dtype=np.uint8)
+    index_map[used] = remap.ravel()
+    return index_map, colors
+
+
+def save_composition_png(rect_data, file_path, size=DEFAULT_SIZE, pad=DEFAULT_PAD):
+    """栅格化构图并写出索引色 PNG 文件 (plot_and_save_composition 的快速实现)。"""
+    index_map, colors = _canonical_palette(rect_data)
+    indices = render_indices(rect_data, size=size, pad=pad, index_map=index_map)
+    with open(file_path, 'wb') as f:
+        f.write(encode_png(indices, palette=colors))
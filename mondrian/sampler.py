@@ -0,0 +1,262 @@
+# ----------------------------------------------------------------------
+# 长度受限的 L 系统直接采样
+# ----------------------------------------------------------------------
+# analyze8.py / analyze9.py 用
+#     while len(l_string) < 10 or len(l_string) > 1000: 重新生成
+# 做拒绝采样，每次被拒绝都白白付出了完整展开的代价。
+# 这里先用动态规划算出“剩余 k 轮重写的符号 X 最终展开成长度 ℓ 的概率”，
+# 再自顶向下按条件分布直接抽样：先抽总长度，再抽规则，再把长度分配给各个子符号。
+# 得到的字符串与拒绝采样的结果同分布，但每次调用都一定落在长度窗口内。
+# 抽样时用到的累积分布按 (剩余轮数, 符号, 长度) 缓存，重复出现的节点只需一次二分查找。
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from mondrian.seeding import GLOBAL_STREAMS, LENGTH_STREAM
+
+
+def _convolve(a, b, max_len):
+    """截断到 max_len 的长度分布卷积 (下标即长度)。"""
+    return np.convolve(a, b)[:max_len + 1]
+
+
+class LengthBoundedSampler:
+    """
+    按长度窗口 [min_len, max_len] 条件化的 L 系统推导采样器。
+
+    Args:
+        axiom (str): 公理。
+        rules (dict): 产生式规则，格式同 MONDRIAN_EARLY_RULES。
+        iterations (int): 迭代次数。
+        min_len, max_len (int): 接受的字符串长度范围 (闭区间)。
+    """
+
+    def __init__(self, axiom, rules, iterations, min_len, max_len):
+        self.axiom = axiom
+        self.iterations = iterations
+        self.min_len = min_len
+        self.max_len = max_len
+
+        terminal = np.zeros(max_len + 1)
+        terminal[1] = 1.0
+        self._terminal = terminal
+
+        # 每条规则：(归一化概率, 后继串, 后继串中非终结符的位置, 终结符个数)
+        self._rules = {}
+        for symbol, options in rules.items():
+            total = sum(item[0] for item in options)
+            compiled = []
+            for probability, successor in options:
+                slots = [i for i, char in enumerate(successor) if char in rules]
+                compiled.append((probability / total, successor, slots, len(successor) - len(slots)))
+            self._rules[symbol] = compiled
+
+        # dist[k][X]: 剩余 k 轮重写时，非终结符 X 展开后的长度分布 (截断到 max_len)
+        # suffix[k][X][r][j]: 规则 r 中第 j 个及之后的非终结符 (各剩 k-1 轮) 的长度和分布
+        self._dist = [{symbol: terminal for symbol in self._rules}]
+        self._suffix = [None]
+        for k in range(1, iterations + 1):
+            below = self._dist[k - 1]
+            level_dist = {}
+            level_suffix = {}
+            for symbol, compiled in self._rules.items():
+                mixture = np.zeros(max_len + 1)
+                rule_suffixes = []
+                for probability, successor, slots, fixed in compiled:
+                    suffixes = [None] * (len(slots) + 1)
+                    acc = np.zeros(max_len + 1)
+                    acc[0] = 1.0
+                    suffixes[len(slots)] = acc
+                    for j in range(len(slots) - 1, -1, -1):
+                        acc = _convolve(below[successor[slots[j]]], acc, max_len)
+                        suffixes[j] = acc
+                    rule_suffixes.append(suffixes)
+                    if fixed <= max_len:
+                        mixture[fixed:] += probability * acc[:max_len + 1 - fixed]
+                level_dist[symbol] = mixture
+                level_suffix[symbol] = rule_suffixes
+            self._dist.append(level_dist)
+            self._suffix.append(level_suffix)
+
+        # 公理中的各符号都剩 iterations 轮重写
+        axiom_dist = np.zeros(max_len + 1)
+        axiom_dist[0] = 1.0
+        for char in axiom:
+            axiom_dist = _convolve(axiom_dist, self._symbol_dist(char, iterations), max_len)
+        window = np.zeros(max_len + 1)
+        window[min_len:] = axiom_dist[min_len:]
+        self._axiom_window = window
+
+        # 拒绝采样一次就落在窗口内的概率
+        self.acceptance_rate = float(window.sum())
+        if self.acceptance_rate <= 0:
+            raise ValueError(f"长度窗口 [{min_len}, {max_len}] 内没有可能的推导结果")
+
+        self._rule_cache = {}
+        self._split_cache = {}
+
+    @property
+    def expected_rejection_draws(self):
+        """拒绝采样平均需要完整生成的次数 (本采样器为 1)。"""
+        return 1.0 / self.acceptance_rate
+
+    def _symbol_dist(self, char, k):
+        if char in self._rules:
+            return self._dist[k][char]
+        return self._terminal
+
+    def sample(self, streams=None):
+        """
+        抽取一个长度落在窗口内的 L 系统字符串。
+
+        Args:
+            streams (CompositionStreams): 随机数流 (使用其中的 LENGTH_STREAM)；默认使用全局 random 模块。
+        """
+        if streams is None:
+            streams = GLOBAL_STREAMS
+        draw = streams.draws(LENGTH_STREAM)
+        out = []
+        length = _weighted_index(self._axiom_window, draw)
+        # 公理本身也按同样的方式把总长度分配给各个符号
+        remaining = [self._symbol_dist(char, self.iterations) for char in self.axiom]
+        for i, char in enumerate(self.axiom):
+            part = self._axiom_part(i, length, remaining, draw)
+            self._expand(char, self.iterations, part, out, draw)
+            length -= part
+        return ''.join(out)
+
+    def iter_sample(self, streams=None):
+        """
+        sample 的惰性版本：按从左到右的顺序逐段产出字符串，下游读取到哪里才展开到哪里。
+
+        随机数按与 sample 相同的深度优先顺序抽取，因此各段拼接起来与 sample(streams) 完全相同；
+        下游提前停止读取时 (例如解释器遇到 HALT)，其余部分不再展开。
+
+        Yields:
+            str: 字符串片段。
+        """
+        if streams is None:
+            streams = GLOBAL_STREAMS
+        draw = streams.draws(LENGTH_STREAM)
+        length = _weighted_index(self._axiom_window, draw)
+        # 公理本身也按同样的方式把总长度分配给各个符号
+        remaining = [self._symbol_dist(char, self.iterations) for char in self.axiom]
+        for i, char in enumerate(self.axiom):
+            part = self._axiom_part(i, length, remaining, draw)
+            yield from self._iter_expand(char, self.iterations, part, draw)
+            length -= part
+
+    def _axiom_part(self, i, length, remaining, draw):
+        """公理第 i 个符号分得的长度 (剩余总长度为 length)。"""
+        if i == len(self.axiom) - 1:
+            return length
+        rest = np.zeros(self.max_len + 1)
+        rest[0] = 1.0
+        for dist in remaining[i + 1:]:
+            rest = _convolve(rest, dist, self.max_len)
+        return _weighted_index(remaining[i][:length + 1] * rest[length::-1], draw)
+
+    def _rule_cdf(self, char, k, length):
+        """在展开长度为 length 的条件下，各规则的累积权重 (已缓存)。"""
+        key = (char, k, length)
+        cdf = self._rule_cache.get(key)
+        if cdf is None:
+            cdf = []
+            total = 0.0
+            for (probability, _, _, fixed), rule_suffixes in zip(self._rules[char], self._suffix[k][char]):
+                inner = length - fixed
+                if inner >= 0:
+                    total += probability * rule_suffixes[0][inner]
+                cdf.append(total)
+            self._rule_cache[key] = cdf
+        return cdf
+
+    def _split_cdf(self, char, k, r, j, inner):
+        """规则 r 的第 j 个非终结符在剩余长度为 inner 时的长度累积分布 (已缓存)。"""
+        key = (char, k, r, j, inner)
+        cdf = self._split_cache.get(key)
+        if cdf is None:
+            _, successor, slots, _ = self._rules[char][r]
+            dist = self._dist[k - 1][successor[slots[j]]]
+            rest = self._suffix[k][char][r][j + 1]
+            cdf = np.cumsum(dist[:inner + 1] * rest[inner::-1]).tolist()
+            self._split_cache[key] = cdf
+        return cdf
+
+    def _expand(self, char, k, length, out, draw):
+        """在“展开后长度恰为 length”的条件下展开符号 char (剩余 k 轮)。"""
+        if k == 0 or char not in self._rules:
+            out.append(char)
+            return
+
+        cdf = self._rule_cdf(char, k, length)
+        r = _pick(cdf, draw)
+        _, successor, slots, fixed = self._rules[char][r]
+        if k == 1:
+            # 子符号不再重写，后继串原样输出
+            out.append(successor)
+            return
+
+        # 依次为每个非终结符抽取长度：P(ℓ_j) ∝ dist(ℓ_j) * suffix_{j+1}(剩余 - ℓ_j)
+        inner = length - fixed
+        start = 0
+        last = len(slots) - 1
+        for j, slot in enumerate(slots):
+            if j == last:
+                part = inner
+            else:
+                cdf = self._split_cdf(char, k, r, j, inner)
+                part = _pick(cdf, draw)
+            out.append(successor[start:slot])
+            self._expand(successor[slot], k - 1, part, out, draw)
+            inner -= part
+            start = slot + 1
+        out.append(successor[start:])
+
+    def _iter_expand(self, char, k, length, draw):
+        """_expand 的生成器版本 (随机数的抽取顺序相同)，逐段产出展开结果。"""
+        if k == 0 or char not in self._rules:
+            yield char
+            return
+
+        cdf = self._rule_cdf(char, k, length)
+        r = _pick(cdf, draw)
+        _, successor, slots, fixed = self._rules[char][r]
+        if k == 1:
+            # 子符号不再重写，后继串原样输出
+            yield successor
+            return
+
+        # 依次为每个非终结符抽取长度：P(ℓ_j) ∝ dist(ℓ_j) * suffix_{j+1}(剩余 - ℓ_j)
+        inner = length - fixed
+        start = 0
+        last = len(slots) - 1
+        for j, slot in enumerate(slots):
+            if j == last:
+                part = inner
+            else:
+                cdf = self._split_cdf(char, k, r, j, inner)
+                part = _pick(cdf, draw)
+            yield successor[start:slot]
+            yield from self._iter_expand(successor[slot], k - 1, part, draw)
+            inner -= part
+            start = slot + 1
+        yield successor[start:]
+
+
+def _pick(cdf, draw):
+    """
+    按累积权重 cdf 抽取一个下标 (draw 返回 [0, 1) 均匀随机数)。
+
+    舍入使 draw() * 总权重 达到总权重时，取最后一个权重为正的下标：
+    不越界，也不会落在末尾权重为 0 (长度不可能出现) 的位置上。
+    """
+    total = cdf[-1]
+    return min(bisect_right(cdf, draw() * total), bisect_left(cdf, total))
+
+
+def _weighted_index(weights, draw):
+    """按非负权重数组抽取一个下标 (draw 返回 [0, 1) 均匀随机数)，越界处理同 _pick。"""
+    cum = np.cumsum(weights)
+    total = cum[-1]
+    return int(min(np.searchsorted(cum, draw() * total, side='right'), np.searchsorted(cum, total, side='left')))
@@ -0,0 +1,173 @@
+# ----------------------------------------------------------------------
+# 每幅构图独立、可拆分的随机数流
+# ----------------------------------------------------------------------
+# 原脚本的推导和解释都直接调用全局 random 模块，一幅构图的结果取决于此前所有随机数调用，
+# 不能单独复现，也不能在不同的执行方式之间对照。这里为每幅构图建立一组显式的随机数流：
+#   * (批次种子, 构图编号) 经 SeedSequence 派生出该构图的种子 (即 SeedSequence(seed).spawn 的第 index 个子序列)，
+#     再 spawn 为“推导”和“解释”两条互不相关的流；
+#   * 推导流是计数器式的 (SplitMix64)：推导树第 level 层从左到右第 position 次规则选择使用的随机数
+#     只取决于 (level, position)。逐轮重写 (广度优先)、流式展开 (深度优先) 和多幅构图的向量化推导
+#     访问同一层节点的顺序都是从左到右，因此同一种子在三种方式下得到相同的字符串；
+#   * 解释流是一个 random.Random，供颜色分配、分割比例、线宽抖动等解释阶段的逐个随机选择使用；
+#   * 线条小方块流同样是计数器式的：第 k 个小方块使用第 k 对随机数，批量铺设时一次取出 (见 segments.py)。
+#     GLOBAL_STREAMS 没有小方块流，颜色仍在画线时逐个从全局 random 模块抽取。
+# 不传随机数流时仍使用全局 random 模块 (GLOBAL_STREAMS)，行为与原脚本一致。
+import random
+
+import numpy as np
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+# 每条推导流占用 2^40 个计数器位置，互不重叠
+_STREAM_SHIFT = 40
+_UNIT = 2.0 ** -53
+
+# 长度窗口采样器 (sampler.py) 使用的推导流编号，与推导树各层 (0 ~ iterations-1) 不冲突
+LENGTH_STREAM = 0xFFFF
+
+
+def _splitmix_scalar(key, counter):
+    z = (key + counter * _GOLDEN) & _MASK64
+    z = ((z ^ (z >> 30)) * _MIX1) & _MASK64
+    z = ((z ^ (z >> 27)) * _MIX2) & _MASK64
+    z ^= z >> 31
+    return (z >> 11) * _UNIT
+
+
+def counter_uniforms(keys, stream, positions):
+    """
+    计数器式均匀随机数 (SplitMix64 第 stream·2^40 + position + 1 步的输出)。
+
+    Args:
+        keys (int | np.ndarray): 推导流密钥 (uint64)，可以是每个位置各自的密钥数组。
+        stream (int): 流编号 (推导树的层号或 LENGTH_STREAM)。
+        positions (int | np.ndarray): 流内位置 (非负整数)。
+
+    Returns:
+        np.ndarray: [0, 1) 区间的 float64 数组 (形状与广播后的输入相同)，与逐个调用 draws(stream) 的结果逐位相同。
+    """
+    keys = np.asarray(keys, dtype=np.uint64)
+    # 模 2^64 回绕是算法本身的一部分；标量输入走 NumPy 标量运算，溢出时会发出 RuntimeWarning，与数组输入保持一致
+    with np.errstate(over='ignore'):
+        counter = np.asarray(positions, dtype=np.uint64) + np.uint64((stream << _STREAM_SHIFT) + 1)
+        z = keys + counter * np.uint64(_GOLDEN)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(_MIX1)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(_MIX2)
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) * _UNIT
+
+
+def composition_sequence(seed, index):
+    """第 index 幅构图的 SeedSequence (等价于 SeedSequence(seed).spawn 的第 index 个子序列)。"""
+    return np.random.SeedSequence(seed, spawn_key=(index,))
+
+
+def derivation_key(seed, index):
+    """第 index 幅构图推导流的 64 位密钥 (与 CompositionStreams(seed, index).derivation_key 相同)。"""
+    child = np.random.SeedSequence(seed, spawn_key=(index, 0))
+    return int(child.generate_state(1, dtype=np.uint64)[0])
+
+
+def derivation_keys(seed, indices):
+    """一组构图的推导流密钥 (uint64 数组)，供向量化推导使用。"""
+    return np.array([derivation_key(seed, index) for index in indices], dtype=np.uint64)
+
+
+class CompositionStreams:
+    """
+    一幅构图的全部随机数流。
+
+    Args:
+        seed (int): 批次种子。
+        index (int): 构图编号。
+        attempt (int): 第几次重新生成 (0 为首次)。attempt > 0 时三条流由该构图序列
+            在三条流之后的第 attempt 个子序列派生，与首次的结果互不相关 (见 batch.run_batch 的重试)。
+
+    Attributes:
+        derivation_key (int): 推导流密钥。
+        interpretation (random.Random): 解释阶段的随机数生成器。
+        segment_key (int): 线条小方块流密钥。
+    """
+
+    def __init__(self, seed, index=0, attempt=0):
+        self.seed = seed
+        self.index = index
+        self.attempt = attempt
+        sequence = composition_sequence(seed, index)
+        if attempt:
+            sequence = np.random.SeedSequence(seed, spawn_key=(index, 2 + attempt))
+        derivation, interpretation, segments = sequence.spawn(3)
+        self._derivation_spawn_key = derivation.spawn_key
+        self.derivation_key = int(derivation.generate_state(1, dtype=np.uint64)[0])
+        words = interpretation.generate_state(4, dtype=np.uint32)
+        self.interpretation = random.Random(int.from_bytes(words.tobytes(), 'little'))
+        self.segment_key = int(segments.generate_state(1, dtype=np.uint64)[0])
+
+    def __repr__(self):
+        if self.attempt:
+            return f"CompositionStreams(seed={self.seed!r}, index={self.index!r}, attempt={self.attempt!r})"
+        return f"CompositionStreams(seed={self.seed!r}, index={self.index!r})"
+
+    def retry(self, attempt):
+        """
+        第 attempt 次重新推导使用的随机数流 (例如字符串过短被拒绝时)。
+
+        推导流换成由推导流序列的第 attempt 个子序列 (首次为 (批次种子, 构图编号, 0, attempt)) 派生的新密钥，
+        解释流保持不变。
+        """
+        streams = object.__new__(CompositionStreams)
+        streams.seed = self.seed
+        streams.index = self.index
+        streams.attempt = self.attempt
+        streams._derivation_spawn_key = self._derivation_spawn_key
+        child = np.random.SeedSequence(self.seed, spawn_key=self._derivation_spawn_key + (attempt,))
+        streams.derivation_key = int(child.generate_state(1, dtype=np.uint64)[0])
+        streams.interpretation = self.interpretation
+        streams.segment_key = self.segment_key
+        return streams
+
+    def uniforms(self, stream, count):
+        """推导流 stream 的前 count 个随机数 (列表)。"""
+        return counter_uniforms(self.derivation_key, stream, np.arange(count)).tolist()
+
+    def draws(self, stream):
+        """返回一个无参函数，每次调用依次给出推导流 stream 中的下一个随机数。"""
+        key = self.derivation_key
+        counter = (stream << _STREAM_SHIFT) + 1
+        position = -1
+
+        def draw():
+            nonlocal position
+            position += 1
+            return _splitmix_scalar(key, counter + position)
+
+        return draw
+
+    def segment_uniforms(self, first, count):
+        """第 first ~ first+count-1 个线条小方块的随机数，形状为 (count, 2)。"""
+        positions = np.arange(2 * first, 2 * (first + count))
+        return counter_uniforms(self.segment_key, 0, positions).reshape(count, 2)
+
+
+class _GlobalStreams:
+    """所有随机数都取自全局 random 模块 (原脚本的行为)。"""
+
+    interpretation = random
+
+    def __repr__(self):
+        return "GLOBAL_STREAMS"
+
+    def uniforms(self, stream, count):
+        return [random.random() for _ in range(count)]
+
+    def draws(self, stream):
+        return random.random
+
+    def retry(self, attempt):
+        # 全局 random 模块的状态已经前进，直接重新抽取即可
+        return self
+
+
+GLOBAL_STREAMS = _GlobalStreams()
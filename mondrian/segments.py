@@ -0,0 +1,294 @@
+# ----------------------------------------------------------------------
+# Boogie-Woogie 破碎线条的向量化铺设
+# ----------------------------------------------------------------------
+# analyze8.py / analyze9.py 每次 H/V 分割都用 for seg_i in range(num_segments) 逐个计算小方块，
+# 每个小方块各调用一次 random.random() 和 random.choice(GRID_COLORS)；
+# LINE_WIDTH_BASE = 0.010 时一条贯穿画布的线条约有 100 个小方块。这里：
+#   * step 函数只记录线条的几何 (起点、方向、小方块数、步长、尺寸)，并在 RectBatch 中预留对应的行，
+#     绘制顺序保持不变；
+#   * 解释结束后对所有线条一次性铺设：位置、尺寸合格检查 (MIN_SIZE / MAX_RECT_DIMENSION /
+#     MAX_ASPECT_RATIO) 和颜色抽取都是整段数组运算；
+#   * 第 k 个小方块 (按绘制顺序) 使用随机数流中第 k 对均匀随机数 (seeding.segment_uniforms)，
+#     因此流式解释逐条铺设与批量铺设的结果相同；
+#   * 不传随机数流 (GLOBAL_STREAMS) 时颜色仍在画线时逐个从全局 random 模块抽取，
+#     抽取次数与顺序都与原脚本相同，同一 random.seed 得到与原脚本相同的构图。
+# merge_segments 是可选的后处理：把同一条线条上相邻同色的小方块合并为一个矩形，
+# 并去掉落在白色背景上的白色小方块，渲染出的像素不变，元素数量通常减少一半以上。
+import numpy as np
+
+from mondrian.rects import SHARED_PALETTE, RectBatch
+from mondrian.render import DEFAULT_SIZE, _pixel_bounds
+from mondrian.seeding import GLOBAL_STREAMS
+
+
+class SegmentTiling:
+    """
+    一个配置的小方块铺设规则 (由 engine 按 Profile 构建一次)。
+
+    Args:
+        grid_colors (tuple): 线条颜色候选。
+        fill_probability (float): 每个小方块着色 (而非留白) 的概率。
+        min_size, max_dim, max_aspect (float): 小方块的尺寸与纵横比限制。
+        check_segments (bool): 是否检查每个小方块自身的尺寸 (analyze9.py)；不合格的小方块强制白色。
+    """
+
+    def __init__(self, grid_colors, fill_probability, min_size, max_dim, max_aspect, check_segments):
+        self.grid_colors = list(grid_colors)
+        self.fill_probability = fill_probability
+        self.min_size = min_size
+        self.max_dim = max_dim
+        self.max_aspect = max_aspect
+        self.check_segments = check_segments
+
+    def layout(self, lines):
+        """
+        一组线条上全部小方块的位置与尺寸。
+
+        Args:
+            lines (np.ndarray): (m, 7) float64 数组，每行为 (lx, ly, 是否水平, 小方块数, 步长, 沿线尺寸, 垂直尺寸)。
+
+        Returns:
+            tuple: (x, y, w, h, 是否允许着色) 五个数组，按线条及线内顺序排列。
+        """
+        counts = lines[:, 3].astype(np.int64)
+        owner = np.repeat(np.arange(len(lines)), counts)
+        # 每个小方块在所属线条中的序号
+        starts = np.cumsum(counts) - counts
+        seg_i = np.arange(len(owner)) - starts[owner]
+
+        lx, ly, horizontal, _, step, extent, cross = (lines[owner, k] for k in range(7))
+        horizontal = horizontal > 0
+        offset = seg_i * step
+        x = np.where(horizontal, lx + offset, lx)
+        y = np.where(horizontal, ly, ly + offset)
+        w = np.where(horizontal, extent, cross)
+        h = np.where(horizontal, cross, extent)
+
+        allowed = np.ones(len(x), dtype=bool)
+        if self.check_segments:
+            # 只有当小方块自身的尺寸合格时才可能着色，否则强制白色
+            allowed = ((w >= self.min_size) & (h >= self.min_size)
+                       & (w <= self.max_dim) & (h <= self.max_dim)
+                       & (np.maximum(w / h, h / w) <= self.max_aspect))
+        return x, y, w, h, allowed
+
+    def tile(self, lines, palette, uniforms):
+        """
+        铺设一组线条上的全部小方块。
+
+        Args:
+            lines (np.ndarray): 见 layout。
+            palette (Palette): 颜色下标所属的调色板。
+            uniforms (np.ndarray): (小方块总数, 2) 的均匀随机数，分别用于“是否着色”和“颜色”。
+
+        Returns:
+            tuple: (x, y, w, h, 颜色下标) 五个数组，按线条及线内顺序排列。
+        """
+        x, y, w, h, allowed = self.layout(lines)
+        filled = allowed & (uniforms[:, 0] < self.fill_probability)
+        grid_index = np.array([palette.index(c) for c in self.grid_colors], dtype=np.uint8)
+        choice = np.minimum((uniforms[:, 1] * len(grid_index)).astype(np.int64), len(grid_index) - 1)
+        color = np.where(filled, grid_index[choice], np.uint8(palette.index('white')))
+        return x, y, w, h, color
+
+    def draw(self, lines, palette, rng):
+        """
+        同 tile，但颜色由 rng 逐个抽取：每个允许着色的小方块先 rng.random()，着色时再 rng.choice，
+        与 analyze8.py / analyze9.py 原来的逐个循环消耗的随机数完全相同。
+        """
+        x, y, w, h, allowed = self.layout(lines)
+        white = palette.index('white')
+        grid_index = [palette.index(c) for c in self.grid_colors]
+        color = np.full(len(x), white, dtype=np.uint8)
+        for i in np.flatnonzero(allowed).tolist():
+            if rng.random() < self.fill_probability:
+                color[i] = rng.choice(grid_index)
+        return x, y, w, h, color
+
+
+class LineSegments:
+    """
+    一幅构图中待铺设小方块的线条。
+
+    Args:
+        tiling (SegmentTiling): 铺设规则。
+        streams: 随机数流 (CompositionStreams 或 GLOBAL_STREAMS)。
+        deferred (bool): True 时解释结果须为 RectBatch，add 只预留行，flush 时一次性写入；
+            False 时 (流式解释) add 立即铺设该线条并追加五元组。
+            GLOBAL_STREAMS 下颜色须按原脚本的顺序从全局 random 模块抽取，add 总是立即铺设。
+    """
+
+    def __init__(self, tiling, streams, deferred=True):
+        self.tiling = tiling
+        self.streams = streams
+        self._out = None
+        self.deferred = deferred
+        self.sequential = streams is GLOBAL_STREAMS
+        self.num_segments = 0
+        self._lines = []
+        self._slots = []
+
+    def add(self, final_rects, lx, ly, horizontal, num_segments, step, extent, cross):
+        """在 final_rects 中记录一条线条：从 (lx, ly) 起沿水平/垂直方向铺设 num_segments 个小方块。"""
+        line = (lx, ly, 1.0 if horizontal else 0.0, num_segments, step, extent, cross)
+        if self.deferred and not self.sequential:
+            self._out = final_rects
+            self._slots.append(final_rects.claim(num_segments))
+            self._lines.append(line)
+            self.num_segments += num_segments
+            return
+        palette = final_rects.palette if self.deferred else SHARED_PALETTE
+        if self.sequential:
+            x, y, w, h, color = self.tiling.draw(np.array([line]), palette, self.streams.interpretation)
+        else:
+            uniforms = self.streams.segment_uniforms(self.num_segments, num_segments)
+            x, y, w, h, color = self.tiling.tile(np.array([line]), palette, uniforms)
+        self.num_segments += num_segments
+        if self.deferred:
+            start = final_rects.claim(num_segments)
+            final_rects.assign(np.arange(start, start + num_segments), x, y, w, h, color)
+            return
+        names = SHARED_PALETTE.colors
+        for rect in zip(x.tolist(), y.tolist(), w.tolist(), h.tolist(), color.tolist()):
+            final_rects.append(rect[:4] + (names[rect[4]],))
+
+    def flush(self):
+        """把预留的行一次性填入所有小方块。"""
+        if not self._lines:
+            return
+        lines = np.array(self._lines, dtype=np.float64)
+        uniforms = self.streams.segment_uniforms(0, self.num_segments)
+        x, y, w, h, color = self.tiling.tile(lines, self._out.palette, uniforms)
+        counts = lines[:, 3].astype(np.int64)
+        starts = np.cumsum(counts) - counts
+        index = np.repeat(np.array(self._slots, dtype=np.int64) - starts, counts) + np.arange(len(x))
+        self._out.assign(index, x, y, w, h, color)
+        self._lines.clear()
+        self._slots.clear()
+
+
+def _run_starts(link):
+    """
+    由相邻两行之间的连接方向 (0 不可合并，1 左右相接，2 上下相接) 划分合并段，返回每段起始行。
+
+    一段内的连接方向必须一致，否则合并结果不是矩形。
+    """
+    n = len(link) + 1
+    start = np.ones(n, dtype=bool)
+    start[1:] = link == 0
+    # 前一个连接方向不同 (且非 0) 时，当前行另起一段
+    start[2:] |= (link[:-1] != 0) & (link[:-1] != link[1:])
+    return np.flatnonzero(start)
+
+
+def _covered_by_earlier(bounds, candidates, others):
+    """candidates 中的每一行是否与绘制顺序在它之前的某个 others 行有公共像素。"""
+    row0, row1, col0, col1 = bounds
+    hit = np.zeros(len(candidates), dtype=bool)
+    # 分块计算 (候选数 × 其他行数) 的相交矩阵，控制峰值内存
+    for begin in range(0, len(candidates), 256):
+        c = candidates[begin:begin + 256, None]
+        o = others[None, :]
+        overlap = ((o < c) & (row0[o] < row1[c]) & (row0[c] < row1[o])
+                   & (col0[o] < col1[c]) & (col0[c] < col1[o]))
+        hit[begin:begin + 256] = overlap.any(axis=1)
+    return hit
+
+
+def merge_segments(rect_data, size=DEFAULT_SIZE, drop_white=True):
+    """
+    合并相邻同色小方块、去掉白色背景上的白色小方块 (渲染结果逐像素不变)。
+
+    按绘制顺序相邻、颜色相同且在 size×size 画布上像素边界首尾相接的矩形合并为一个；
+    合并后的矩形若换算出的像素边界与各部分的并集不完全一致 (浮点舍入)，则保留原来的各部分。
+    白色矩形 (以及不占任何像素的矩形) 如果与此前绘制的所有非白色矩形都没有公共像素，就直接去掉；
+    整幅构图都是白色时保留第一个占有像素的矩形作为背景，结果不会是空的构图。
+    判断都在像素坐标下进行，因此只保证在该 size 下渲染结果相同。
+
+    Args:
+        rect_data (RectBatch): 解释结果。
+        size (int): 渲染画布边长 (像素)，与 save_composition_png 的 size 一致。
+        drop_white (bool): 是否去掉白色背景上的白色矩形。
+
+    Returns:
+        RectBatch: 新的矩形集合 (共用同一张调色板)；len 之差即为减少的元素数量。
+    """
+    n = len(rect_data)
+    palette = rect_data.palette
+    result = RectBatch(palette=palette, capacity=max(n, 1))
+    if n == 0:
+        return result
+
+    x = rect_data.x.astype(np.float64)
+    y = rect_data.y.astype(np.float64)
+    w = rect_data.w.astype(np.float64)
+    h = rect_data.h.astype(np.float64)
+    color = rect_data.color
+    row0, row1, col0, col1 = _pixel_bounds(rect_data, size)
+
+    # 相邻两行的连接方向
+    same = color[1:] == color[:-1]
+    same_rows = (row0[1:] == row0[:-1]) & (row1[1:] == row1[:-1])
+    same_cols = (col0[1:] == col0[:-1]) & (col1[1:] == col1[:-1])
+    touch_cols = (col0[1:] == col1[:-1]) | (col1[1:] == col0[:-1])
+    touch_rows = (row0[1:] == row1[:-1]) | (row1[1:] == row0[:-1])
+    link = np.zeros(n - 1, dtype=np.int8)
+    link[same & same_rows & touch_cols] = 1
+    link[same & same_cols & touch_rows] = 2
+
+    starts = _run_starts(link)
+    lengths = np.diff(np.append(starts, n))
+    run = np.repeat(np.arange(len(starts)), lengths)
+    direction = np.zeros(len(starts), dtype=np.int8)
+    multi = lengths > 1
+    direction[multi] = link[starts[multi]]
+
+    # 每段的合并结果：沿连接方向取并集，另一方向沿用第一行
+    mx = np.minimum.reduceat(x, starts)
+    my = np.minimum.reduceat(y, starts)
+    mw = np.maximum.reduceat(x + w, starts) - mx
+    mh = np.maximum.reduceat(y + h, starts) - my
+    mx = np.where(direction == 2, x[starts], mx)
+    mw = np.where(direction == 2, w[starts], mw)
+    my = np.where(direction == 1, y[starts], my)
+    mh = np.where(direction == 1, h[starts], mh)
+    merged = RectBatch(palette=palette, capacity=len(starts))
+    merged.assign(np.arange(merged.claim(len(starts)), len(starts)), mx, my, mw, mh, color[starts])
+
+    # 校验：合并后的像素边界必须等于各部分的并集，否则该段保留原来的各行
+    m_row0, m_row1, m_col0, m_col1 = _pixel_bounds(merged, size)
+    exact = ((m_row0 == np.minimum.reduceat(row0, starts)) & (m_row1 == np.maximum.reduceat(row1, starts))
+             & (m_col0 == np.minimum.reduceat(col0, starts)) & (m_col1 == np.maximum.reduceat(col1, starts)))
+    use_merged = exact[run]
+    is_start = np.zeros(n, dtype=bool)
+    is_start[starts] = True
+    keep = ~use_merged | is_start
+
+    def pick(original, merged_column):
+        return np.where(use_merged, merged_column[run], original)[keep]
+
+    out_x = pick(rect_data.x, merged.x)
+    out_y = pick(rect_data.y, merged.y)
+    out_w = pick(rect_data.w, merged.w)
+    out_h = pick(rect_data.h, merged.h)
+    out_color = color[keep]
+    out_bounds = tuple(np.where(use_merged, m[run], o)[keep]
+                       for o, m in ((row0, m_row0), (row1, m_row1), (col0, m_col0), (col1, m_col1)))
+
+    if drop_white:
+        b_row0, b_row1, b_col0, b_col1 = out_bounds
+        empty = (b_row0 >= b_row1) | (b_col0 >= b_col1)
+        white = out_color == palette.index('white')
+        candidates = np.flatnonzero(white & ~empty)
+        others = np.flatnonzero(~white & ~empty)
+        droppable = empty.copy()
+        droppable[candidates] = ~_covered_by_earlier(out_bounds, candidates, others)
+        retained = ~droppable
+        if not retained.any() and not empty.all():
+            # 例如 analyze9.py 整块留白后终止的构图：保留背景，写出的元素数不会变成 0
+            retained[np.flatnonzero(~empty)[0]] = True
+        out_x, out_y, out_w, out_h, out_color = (c[retained] for c in (out_x, out_y, out_w, out_h, out_color))
+
+    count = len(out_color)
+    result.assign(np.arange(result.claim(count), count), out_x, out_y, out_w, out_h, out_color)
+    return result
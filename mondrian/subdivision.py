@@ -0,0 +1,251 @@
+# ----------------------------------------------------------------------
+# 平面剖分：由带端点的线段恢复真实的矩形集合
+# ----------------------------------------------------------------------
+# revies1.build_dcel_and_stats 原先把每条水平线与每条竖直线都当作贯穿画布的直线，
+# 取全部 (行 × 列) 网格单元；而蒙德里安的线条大多只画到另一条线条为止，网格会把一个色块切成好几块。这里：
+#   * line_segments 沿每条检测到的网格线读取黑色掩膜 (两侧各 band 像素的窄带)，
+#     得到线条真正画出的区段 (x0, x1)；小于 max_gap 的断口接上，端点吸附到最近的垂直网格线或画布边缘；
+#   * planar_subdivision 以竖直扫描线从左到右扫过线段端点：扫描线被当前有效的水平线段分成若干区间，
+#     每个区间是一个尚未闭合的面；扫到竖直线段时，被它覆盖 (过半) 的面闭合输出为矩形，
+#     其右侧按此处有效的水平线段重新划分。没有黑色线段分隔的网格单元因此始终属于同一个面；
+#   * 悬空的线段端点 (检测误差、画布留边处没有黑线封口) 不会产生非矩形的面：
+#     在未闭合的面内部结束的水平线段延长到该面闭合处，在其内部开始的向左延长到该面的左边界；
+#   * 每个事件只处理被闭合的面、其右侧的新面和新开始的线段，总耗时约 O((线段数 + 面数) log 线段数)；
+#     相邻关系 (face_adjacency) 最后按公共边分组一次求出。
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+
+import numpy as np
+
+from mondrian.lines import band_presence
+
+
+def _default_scale(shape):
+    """与 lines.detect_grid_lines 的默认 merge_gap 相同：max(3, 图像长边 / 500)。"""
+    return max(3, max(shape) // 500)
+
+
+def _runs(present, max_gap, min_length):
+    """布尔序列中 True 的连续区段 [start, stop)；间隔不超过 max_gap 的区段合并，短于 min_length 的丢弃。"""
+    padded = np.concatenate(([False], present, [False]))
+    change = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, stops = change[0::2], change[1::2]
+    if len(starts) == 0:
+        return starts, stops
+    keep = np.ones(len(starts), dtype=bool)
+    keep[1:] = starts[1:] - stops[:-1] > max_gap
+    starts = starts[keep]
+    stops = stops[np.append(keep[1:], True)]
+    long_enough = stops - starts >= min_length
+    return starts[long_enough], stops[long_enough]
+
+
+def _snap(values, targets, tolerance):
+    """把 values 中距离某个 targets (升序) 不超过 tolerance 的值替换为该 target。"""
+    values = np.asarray(values, dtype=np.float64)
+    targets = np.asarray(targets, dtype=np.float64)
+    right = np.clip(np.searchsorted(targets, values), 1, len(targets) - 1)
+    left = right - 1
+    nearest = np.where(values - targets[left] <= targets[right] - values, targets[left], targets[right])
+    return np.where(np.abs(nearest - values) <= tolerance, nearest, values)
+
+
+def _axis_segments(black, positions, cross, band, max_gap, min_length, snap):
+    """沿 black 的第 p 行 (p 属于 positions) 提取线段，返回 (n, 3) 的 (p, 起点, 终点)。"""
+    segments = []
+    for p in positions:
+        starts, stops = _runs(band_presence(black, p, band), max_gap, min_length)
+        starts, stops = _snap(starts, cross, snap), _snap(stops, cross, snap)
+        segments.extend((p, a, b) for a, b in zip(starts.tolist(), stops.tolist()) if b > a)
+    return np.array(segments, dtype=np.float64).reshape(-1, 3)
+
+
+def line_segments(black, h_lines, v_lines, band=None, max_gap=None, min_length=None, snap=None):
+    """
+    沿检测到的网格线读取黑色掩膜，得到线条实际画出的区段。
+
+    Args:
+        black (np.ndarray): (H, W) 的黑色掩膜 (例如 colors.label_colors(img) == colors.BLACK)。
+        h_lines, v_lines (list): 水平线的 y 坐标、竖直线的 x 坐标 (见 lines.detect_grid_lines)。
+        band (int): 网格线两侧读取的像素数；以下四个参数为 None 时按图像尺寸取默认值。
+        max_gap (int): 合并的最大断口 (像素)。
+        min_length (int): 线段的最短长度 (像素)。
+        snap (int): 端点吸附到垂直网格线 / 画布边缘的最大距离 (像素)。
+
+    Returns:
+        tuple: (horizontal, vertical)。horizontal 为 (n, 3) 的 (y, x0, x1)，vertical 为 (m, 3) 的 (x, y0, y1)。
+    """
+    black = np.asarray(black, dtype=bool)
+    height, width = black.shape
+    scale = _default_scale(black.shape)
+    band = scale if band is None else band
+    max_gap = 2 * scale if max_gap is None else max_gap
+    min_length = 4 * scale if min_length is None else min_length
+    snap = 2 * scale if snap is None else snap
+    h_lines = [int(y) for y in h_lines]
+    v_lines = [int(x) for x in v_lines]
+    horizontal = _axis_segments(black, h_lines, sorted({0, width, *v_lines}), band, max_gap, min_length, snap)
+    vertical = _axis_segments(black.T, v_lines, sorted({0, height, *h_lines}), band, max_gap, min_length, snap)
+    return horizontal, vertical
+
+
+def _coverage(walls):
+    """把一组 (y0, y1) 区间合并为不相交的区间，返回 covered(a, b)：[a, b] 中被覆盖的长度。"""
+    merged = []
+    for y0, y1 in sorted(walls):
+        if merged and y0 <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], y1)
+        else:
+            merged.append([y0, y1])
+    lows = [m[0] for m in merged]
+    prefix = [0.0]
+    for y0, y1 in merged:
+        prefix.append(prefix[-1] + y1 - y0)
+
+    def below(t):
+        # [−∞, t] 中被覆盖的长度
+        i = bisect_right(lows, t) - 1
+        if i < 0:
+            return 0.0
+        return prefix[i] + min(t, merged[i][1]) - merged[i][0]
+
+    return merged, lambda a, b: below(b) - below(a)
+
+
+def planar_subdivision(horizontal, vertical, shape, min_cover=0.5):
+    """
+    扫描线构建轴对齐线段的平面剖分 (画布边缘视为线段)。
+
+    Args:
+        horizontal (array-like): (n, 3) 的水平线段 (y, x0, x1)，见 line_segments。
+        vertical (array-like): (m, 3) 的竖直线段 (x, y0, y1)。
+        shape (tuple): 画布尺寸 (H, W)。
+        min_cover (float): 竖直线段覆盖一个面的左右边界的比例不低于此值时，该面在此闭合。
+
+    Returns:
+        tuple: (bounds, areas, adjacency)。bounds 为 (k, 4) 的 (x0, y0, x1, y1)，按创建顺序排列；
+        areas 为 (k,) 面积；adjacency 为 (e, 2) 的 int64 下标对 (i < j)，两面共享一段长度为正的边界。
+    """
+    height, width = shape
+    starts, ends, walls = defaultdict(list), defaultdict(list), defaultdict(list)
+    for y, x0, x1 in np.asarray(horizontal, dtype=np.float64).reshape(-1, 3).tolist():
+        x0, x1 = max(x0, 0.0), min(x1, float(width))
+        if 0 < y < height and x1 > x0:
+            starts[x0].append(y)
+            ends[x1].append(y)
+    for x, y0, y1 in np.asarray(vertical, dtype=np.float64).reshape(-1, 3).tolist():
+        y0, y1 = max(y0, 0.0), min(y1, float(height))
+        if 0 < x < width and y1 > y0:
+            walls[x].append((y0, y1))
+    events = sorted(x for x in set(starts) | set(ends) | set(walls) if 0 < x < width)
+    events.append(float(width))
+
+    # 当前有效的水平线段 (y 升序，同一 y 上可能有多条) 与扫描线上尚未闭合的面 (按 y 排列的平行列表)
+    active, multiplicity = [], defaultdict(int)
+    tops, bottoms, faces = [], [], []
+    left, top, bottom, right = [], [], [], []
+
+    def new_face(x, y0, y1):
+        left.append(x)
+        top.append(y0)
+        bottom.append(y1)
+        right.append(None)
+        return len(left) - 1
+
+    def update_active(x):
+        for y in ends.get(x, ()):
+            multiplicity[y] -= 1
+            if multiplicity[y] == 0:
+                del multiplicity[y]
+                active.pop(bisect_left(active, y))
+        for y in starts.get(x, ()):
+            if multiplicity[y] == 0:
+                insort(active, y)
+            multiplicity[y] += 1
+
+    def reopen(x, a, b):
+        # 第 a..b 个面在 x 处闭合后，右侧的 [tops[a], bottoms[b]] 按此处有效的水平线段重新划分
+        cuts = active[bisect_right(active, tops[a]):bisect_left(active, bottoms[b])]
+        edges = [tops[a]] + cuts + [bottoms[b]]
+        tops[a:b + 1] = edges[:-1]
+        bottoms[a:b + 1] = edges[1:]
+        faces[a:b + 1] = [new_face(x, y0, y1) for y0, y1 in zip(edges[:-1], edges[1:])]
+
+    update_active(0.0)
+    tops.append(0.0)
+    bottoms.append(float(height))
+    faces.append(None)
+    reopen(0.0, 0, 0)
+
+    for x in events:
+        if x == width:
+            for face in faces:
+                right[face] = x
+            break
+        merged, covered = _coverage(walls.get(x, ()))
+        closing = set()
+        for lo, hi in merged:
+            for k in range(bisect_right(bottoms, lo), bisect_left(tops, hi)):
+                if covered(tops[k], bottoms[k]) >= min_cover * (bottoms[k] - tops[k]):
+                    closing.add(k)
+        closing = sorted(closing)
+        update_active(x)
+
+        # 连续闭合的面组成一段，段内整体重新划分；从后往前处理，前面的下标不变
+        breaks = [i + 1 for i in range(len(closing) - 1) if closing[i + 1] != closing[i] + 1]
+        runs = list(zip([0] + breaks, breaks + [len(closing)])) if closing else []
+        for first, last in reversed(runs):
+            a, b = closing[first], closing[last - 1]
+            for k in range(a, b + 1):
+                right[faces[k]] = x
+            reopen(x, a, b)
+
+        # 在未闭合的面内部开始的水平线段：向左延长到该面的左边界，把面一分为二
+        for y in sorted(set(starts.get(x, ()))):
+            k = bisect_right(tops, y) - 1
+            if tops[k] < y < bottoms[k]:
+                face = faces[k]
+                split = new_face(left[face], y, bottom[face])
+                bottom[face] = y
+                tops.insert(k + 1, y)
+                bottoms.insert(k + 1, bottoms[k])
+                bottoms[k] = y
+                faces.insert(k + 1, split)
+
+    bounds = np.array([left, top, right, bottom], dtype=np.float64).T.reshape(-1, 4)
+    areas = (bounds[:, 2] - bounds[:, 0]) * (bounds[:, 3] - bounds[:, 1])
+    return bounds, areas, face_adjacency(bounds)
+
+
+def face_adjacency(bounds):
+    """
+    互不重叠的轴对齐矩形中共享一段长度为正的边界的矩形对。
+
+    按公共边所在的坐标分组 (右边 = 左边、下边 = 上边)，组内按起点排序后双指针比较，O(k log k)。
+
+    Returns:
+        np.ndarray: (e, 2) 的 int64 下标对 (i < j)，按字典序排列。
+    """
+    rows = np.asarray(bounds, dtype=np.float64).reshape(-1, 4).tolist()
+    pairs = []
+    # (前一个矩形的边, 后一个矩形的边, 沿边方向的起点, 终点)：先左右相邻，再上下相邻
+    for near, far, lo, hi in ((2, 0, 1, 3), (3, 1, 0, 2)):
+        groups = defaultdict(lambda: ([], []))
+        for i, row in enumerate(rows):
+            groups[row[near]][0].append(i)
+            groups[row[far]][1].append(i)
+        for before, after in groups.values():
+            before.sort(key=lambda i: rows[i][lo])
+            after.sort(key=lambda i: rows[i][lo])
+            i = j = 0
+            while i < len(before) and j < len(after):
+                p, q = rows[before[i]], rows[after[j]]
+                if min(p[hi], q[hi]) > max(p[lo], q[lo]):
+                    pairs.append((before[i], after[j]))
+                if p[hi] <= q[hi]:
+                    i += 1
+                else:
+                    j += 1
+    # 矩形互不重叠，每一对只会在一条公共边上被找到一次，不需要去重
+    pairs = np.sort(np.array(pairs, dtype=np.int64).reshape(-1, 2), axis=1)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
@@ -0,0 +1,268 @@
+# ----------------------------------------------------------------------
+# 参数扫描：推导结果只生成一次，在多组解释参数下重放
+# ----------------------------------------------------------------------
+# 比较 SPLIT_RATIOS、LINE_WIDTH_BASE、NARROW_THRESHOLD 等常量时，原来的做法是改常量、重跑整个脚本，
+# 大部分时间花在重新生成与这些常量无关的 L 系统字符串上。这里：
+#   * DerivationStore 按 (文法、迭代次数、长度窗口、批次种子) 把字符串缓存到磁盘 (.npz)，
+#     第 i 个字符串与 run_batch 中第 i 张图像推导出的字符串相同；
+#   * 每组参数组合 × 一段种子区间作为一个任务分发到进程池，各组合共用同一批字符串和同一解释流
+#     (CompositionStreams 的推导流与解释流相互独立，基础配置下的结果与 run_batch 的图像完全相同)；
+#   * 输出每幅构图一行的整洁表格 (CSV)。
+# 用法 (在仓库根目录)：
+#   python -m mondrian.sweep --profile v5 -n 1000 \
+#       --grid "line_width=[0.01, 0.02]" --grid "narrow_threshold=[0.2, 0.111]" --out sweep.csv
+import argparse
+import ast
+import csv
+import hashlib
+import itertools
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from mondrian.engine import MondrianEngine
+from mondrian.profiles import get_profile
+from mondrian.seeding import CompositionStreams
+from mondrian.segments import merge_segments
+
+# 会改变推导结果的参数不能出现在扫描网格中 (它们决定了缓存的字符串)
+DERIVATION_FIELDS = ('rules', 'iterations', 'min_length', 'max_length')
+
+DEFAULT_STORE = 'mondrian_cache'
+
+# 随机数流的派生方式改变时递增，旧的缓存文件随之失效
+_STORE_VERSION = 2
+
+
+class DerivationStore:
+    """
+    磁盘上的 L 系统字符串缓存。
+
+    每个 (文法、迭代次数、长度窗口、批次种子) 对应一个 .npz 文件，
+    其中 symbols 为首尾相接的 uint8 符号、offsets 为各字符串的起止位置。
+    """
+
+    def __init__(self, directory=DEFAULT_STORE):
+        self.directory = Path(directory)
+
+    def path_for(self, profile, seed):
+        key = repr((_STORE_VERSION, sorted(profile.rules.items()), profile.iterations,
+                    profile.min_length, profile.max_length, seed))
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+        return self.directory / f"{profile.name}-{digest}.npz"
+
+    def load(self, profile, seed):
+        """读取已缓存的 (symbols, offsets)；没有缓存时返回 None。"""
+        path = self.path_for(profile, seed)
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            return data['symbols'], data['offsets']
+
+    def ensure(self, profile, seed, n):
+        """
+        保证缓存中至少有 n 个字符串，缺少的部分按种子补齐后写回。
+
+        Returns:
+            tuple: (缓存文件路径, 新生成的字符串数量)
+        """
+        path = self.path_for(profile, seed)
+        cached = self.load(profile, seed)
+        if cached is None:
+            symbols, offsets = np.zeros(0, dtype=np.uint8), np.zeros(1, dtype=np.int64)
+        else:
+            symbols, offsets = cached
+        have = len(offsets) - 1
+        if have >= n:
+            return path, 0
+
+        engine = MondrianEngine(profile)
+        pieces = [symbols]
+        lengths = []
+        for index in range(have + 1, n + 1):
+            # 与 run_batch 相同的随机数流：第 index 个字符串就是批量生成第 index 张图像时的推导结果
+            l_string = engine.derive(CompositionStreams(seed, index))
+            pieces.append(np.frombuffer(l_string.encode('ascii'), dtype=np.uint8))
+            lengths.append(len(l_string))
+        symbols = np.concatenate(pieces)
+        offsets = np.concatenate((offsets, offsets[-1] + np.cumsum(lengths, dtype=np.int64)))
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp.npz')
+        np.savez(tmp, symbols=symbols, offsets=offsets)
+        os.replace(tmp, path)
+        return path, n - have
+
+
+def composition_metrics(rects, primaries):
+    """单幅构图的统计指标。"""
+    colors = rects.color_names()
+    areas = rects.w.astype(np.float64) * rects.h.astype(np.float64)
+    white = sum(a for a, c in zip(areas.tolist(), colors) if c == 'white')
+    primary = sum(a for a, c in zip(areas.tolist(), colors) if c in primaries)
+    total = float(areas.sum())
+    return {
+        'num_rects': len(rects),
+        'num_rects_merged': len(merge_segments(rects)),
+        'num_colors': len(set(colors)),
+        'total_area': total,
+        'white_area': white,
+        'primary_area': primary,
+        'mean_rect_area': total / len(rects) if len(rects) else 0.0,
+    }
+
+
+def expand_grid(grid):
+    """把 {参数: [取值, ...]} 展开为参数组合列表 (笛卡尔积，按给定顺序)。"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+# 工作进程状态：(基础配置, 批次种子, 缓存文件路径) 以及按需加载的字符串和引擎
+_worker_state = None
+_worker_cache = {}
+
+
+def _init_worker(state):
+    global _worker_state
+    _worker_state = state
+    _worker_cache.clear()
+
+
+def _run_task(task):
+    combo_index, combo, start, stop = task
+    profile, seed, store_path = _worker_state
+    if 'strings' not in _worker_cache:
+        with np.load(store_path) as data:
+            _worker_cache['strings'] = (data['symbols'], data['offsets'])
+    symbols, offsets = _worker_cache['strings']
+    engine = _worker_cache.get(combo_index)
+    if engine is None:
+        engine = _worker_cache[combo_index] = MondrianEngine(profile.with_params(**combo))
+    primaries = set(engine.profile.primaries)
+
+    rows = []
+    for index in range(start, stop):
+        l_string = symbols[offsets[index - 1]:offsets[index]].tobytes().decode('ascii')
+        streams = CompositionStreams(seed, index)
+        t0 = time.perf_counter()
+        rects = engine.interpret(l_string, streams=streams)
+        elapsed = time.perf_counter() - t0
+        row = {'combo': combo_index}
+        row.update(combo)
+        row['index'] = index
+        row['string_length'] = len(l_string)
+        row.update(composition_metrics(rects, primaries))
+        row['interpret_ms'] = elapsed * 1000
+        rows.append(row)
+    return rows
+
+
+def run_sweep(profile, grid, n, seed=0, store=None, workers=None, chunk=500):
+    """
+    在参数网格的每个组合下重放同一批推导结果。
+
+    Args:
+        profile (Profile | str): 基础配置或其名称。
+        grid (dict): {Profile 字段名: [取值, ...]}，只能包含解释阶段的参数。
+        n (int): 每个组合的构图数量 (编号 1..n)。
+        seed (int): 批次种子。
+        store (DerivationStore): 字符串缓存；默认使用 DEFAULT_STORE 目录。
+        workers (int): 工作进程数；None 表示 CPU 核心数，1 表示在当前进程内执行。
+        chunk (int): 每个任务处理的构图数量。
+
+    Returns:
+        list: 每幅构图一行的字典列表 (combo 编号、参数取值、index、各项指标)。
+    """
+    if isinstance(profile, str):
+        profile = get_profile(profile)
+    for name in grid:
+        if name in DERIVATION_FIELDS:
+            raise ValueError(f"参数 {name} 会改变推导结果，不能出现在扫描网格中")
+        if not hasattr(profile, name):
+            raise ValueError(f"未知的配置参数: {name}")
+    if store is None:
+        store = DerivationStore()
+
+    start = time.perf_counter()
+    store_path, generated = store.ensure(profile, seed, n)
+    print(f"推导缓存: {store_path} (新生成 {generated} 个字符串，用时 {time.perf_counter() - start:.2f} 秒)")
+
+    combos = expand_grid(grid)
+    tasks = [(ci, combo, lo, min(lo + chunk, n + 1))
+             for ci, combo in enumerate(combos) for lo in range(1, n + 1, chunk)]
+    state = (profile, seed, str(store_path))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker(state)
+        batches = list(map(_run_task, tasks))
+    else:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(state,)) as pool:
+            batches = pool.map(_run_task, tasks)
+    rows = [row for batch in batches for row in batch]
+    print(f"{len(combos)} 组参数 × {n} 幅构图，解释用时 {time.perf_counter() - start:.2f} 秒 ({workers} 个进程)")
+    return rows
+
+
+def write_table(rows, path):
+    """把扫描结果写成 CSV。"""
+    if not rows:
+        return
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def summarize(rows, metrics=('num_rects', 'num_rects_merged', 'white_area', 'primary_area')):
+    """按参数组合汇总各指标的平均值，返回 {combo 编号: {指标: 平均值}}。"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(row['combo'], []).append(row)
+    return {ci: {m: float(np.mean([row[m] for row in group])) for m in metrics}
+            for ci, group in sorted(groups.items())}
+
+
+def _parse_grid(items):
+    grid = {}
+    for item in items:
+        name, _, values = item.partition('=')
+        values = ast.literal_eval(values)
+        if not isinstance(values, list):
+            values = [values]
+        grid[name.strip()] = values
+    return grid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="在多组解释参数下重放缓存的 L 系统推导结果")
+    parser.add_argument('--profile', default='v5', help="基础配置名称 (默认 v5，即 analyze6.py)")
+    parser.add_argument('--grid', action='append', default=[],
+                        help='参数及取值列表，例如 "line_width=[0.01, 0.02]"，可重复')
+    parser.add_argument('-n', type=int, default=1000, help="每组参数的构图数量")
+    parser.add_argument('--seed', type=int, default=0, help="批次种子")
+    parser.add_argument('--workers', type=int, default=None, help="工作进程数")
+    parser.add_argument('--store', default=DEFAULT_STORE, help="推导缓存目录")
+    parser.add_argument('--out', default='sweep.csv', help="输出 CSV 路径")
+    args = parser.parse_args(argv)
+
+    grid = _parse_grid(args.grid)
+    rows = run_sweep(args.profile, grid, args.n, seed=args.seed,
+                     store=DerivationStore(args.store), workers=args.workers)
+    write_table(rows, args.out)
+    combos = expand_grid(grid)
+    for ci, means in summarize(rows).items():
+        stats = '，'.join(f"{k}={v:.4g}" for k, v in means.items())
+        print(f"组合 {ci} {combos[ci]}: {stats}")
+    print(f"结果已写入 {args.out} ({len(rows)} 行)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# ----------------------------------------------------------------------
+# 批量向量化的 L 系统推导
+# ----------------------------------------------------------------------
+# generate_l_system_string 对每个非终结符单独调用一次 random.choices，
+# 而且每次都重建后继串列表和概率列表。这里一次推导 N 幅构图：
+#   * 符号直接用 ASCII 码存成 uint8 数组 (解码只需 tobytes().decode())；
+#   * 每一轮迭代中所有构图的所有非终结符只调用一次 RNG；
+#   * 用 cumsum / repeat 把后继串拼接进新的数组，不再有逐字符的 Python 循环。
+# 传入各构图的推导流密钥 (seeding.derivation_keys) 时，规则选择按 (层号, 层内次序) 取计数器式随机数，
+# 结果与逐幅调用 generate_l_system_string(streams=CompositionStreams(seed, index)) 逐字符相同。
+import numpy as np
+
+from mondrian.seeding import counter_uniforms
+
+# 一次处理的构图数量，控制中间数组 (int64 下标) 的峰值内存
+DEFAULT_CHUNK_SIZE = 20000
+
+
+def encode_symbols(text):
+    """把字符串编码为 uint8 符号数组 (ASCII 码)。"""
+    return np.frombuffer(text.encode('ascii'), dtype=np.uint8).copy()
+
+
+def decode_symbols(symbols):
+    """把 uint8 符号数组还原为字符串，可直接交给 interpret_mondrian_functional。"""
+    return symbols.tobytes().decode('ascii')
+
+
+class _CompiledRules:
+    """按符号编码预编译的规则表，整个批量推导过程中只构建一次。"""
+
+    def __init__(self, rules):
+        self.is_nonterminal = np.zeros(256, dtype=bool)
+        self.first_successor = np.zeros(256, dtype=np.int64)
+        self.cum_weights = {}
+
+        successor_codes = []
+        successor_start = []
+        successor_len = []
+        start = 0
+        for symbol, options in rules.items():
+            code = ord(symbol)
+            self.is_nonterminal[code] = True
+            self.first_successor[code] = len(successor_len)
+            # 与 random.choices 相同：累积权重不归一化，随机数乘以总权重后二分查找
+            self.cum_weights[code] = np.cumsum([item[0] for item in options], dtype=np.float64)
+            for _, successor in options:
+                successor_codes.append(encode_symbols(successor))
+                successor_start.append(start)
+                successor_len.append(len(successor))
+                start += len(successor)
+
+        self.successor_codes = np.concatenate(successor_codes) if successor_codes else np.zeros(0, np.uint8)
+        self.successor_start = np.array(successor_start, dtype=np.int64)
+        self.successor_len = np.array(successor_len, dtype=np.int64)
+
+    def choose(self, codes, u):
+        """根据均匀随机数 u 为每个非终结符 codes 选出后继串编号。"""
+        chosen = np.empty(len(codes), dtype=np.int64)
+        for code, cum in self.cum_weights.items():
+            mask = codes == code
+            # searchsorted(side='right') 等价于 random.choices 的 bisect
+            choice = np.searchsorted(cum, u[mask] * cum[-1], side='right')
+            np.minimum(choice, len(cum) - 1, out=choice)
+            chosen[mask] = self.first_successor[code] + choice
+        return chosen
+
+
+def rewrite_once(symbols, offsets, compiled, rng, keys=None, level=0):
+    """
+    对拼接在一起的多幅构图执行一轮并行重写。
+
+    Args:
+        symbols (np.ndarray): 所有构图首尾相接的 uint8 符号数组。
+        offsets (np.ndarray): 长度 N+1，第 i 幅构图占 symbols[offsets[i]:offsets[i+1]]。
+        compiled (_CompiledRules): 预编译规则。
+        rng (np.random.Generator): 随机数生成器 (未提供 keys 时使用)。
+        keys (np.ndarray): 各构图的推导流密钥 (uint64)；提供时使用计数器式随机数。
+        level (int): 本轮的层号 (从 0 开始)，配合 keys 使用。
+
+    Returns:
+        tuple: (新的符号数组, 新的 offsets)
+    """
+    is_nt = compiled.is_nonterminal[symbols]
+    nt_index = np.flatnonzero(is_nt)
+    if nt_index.size == 0:
+        return symbols, offsets
+
+    if keys is None:
+        # 本轮所有非终结符的规则选择：一次 RNG 调用
+        u = rng.random(nt_index.size)
+    else:
+        # 每个非终结符所属的构图，以及它在该构图本层中的次序
+        owner = np.searchsorted(offsets, nt_index, side='right') - 1
+        first = np.searchsorted(nt_index, offsets[:-1])
+        rank = np.arange(nt_index.size) - first[owner]
+        u = counter_uniforms(keys[owner], level, rank)
+    successor_id = compiled.choose(symbols[nt_index], u)
+
+    out_len = np.ones(symbols.size, dtype=np.int64)
+    out_len[nt_index] = compiled.successor_len[successor_id]
+    out_end = np.cumsum(out_len)
+    total = int(out_end[-1])
+
+    # 把后继串表和本轮符号拼成一张查找表：
+    # 非终结符从它选中的后继串开始读，终结符从自身位置读 (长度为 1)
+    table = np.concatenate((compiled.successor_codes, symbols))
+    base = np.arange(compiled.successor_codes.size, table.size, dtype=np.int64)
+    base[nt_index] = compiled.successor_start[successor_id]
+    # 第 j 个输出位置 = base[来源符号] + (j - 来源符号的输出起点)
+    shift = base - (out_end - out_len)
+    new_symbols = table[np.arange(total, dtype=np.int64) + np.repeat(shift, out_len)]
+
+    new_offsets = np.concatenate(([0], out_end))[offsets]
+    return new_symbols, new_offsets
+
+
+def generate_l_system_batch(axiom, rules, iterations, n, rng=None, chunk_size=DEFAULT_CHUNK_SIZE, keys=None):
+    """
+    一次推导 n 幅构图的 L 系统字符串 (向量化版本的 generate_l_system_string)。
+
+    Args:
+        axiom (str): 公理。
+        rules (dict): 产生式规则，格式同 MONDRIAN_EARLY_RULES。
+        iterations (int): 迭代次数。
+        n (int): 构图数量。
+        rng (np.random.Generator): 随机数生成器；默认新建一个。
+        chunk_size (int): 每批同时推导的构图数量。
+        keys (np.ndarray): 长度为 n 的推导流密钥 (seeding.derivation_keys)；
+            提供时忽略 rng，第 i 幅构图与使用同一密钥的逐幅推导结果相同。
+
+    Returns:
+        list: n 个 uint8 符号数组，用 decode_symbols 可还原为字符串。
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    compiled = _CompiledRules(rules)
+    axiom_codes = encode_symbols(axiom)
+
+    results = []
+    for chunk_begin in range(0, n, chunk_size):
+        m = min(chunk_size, n - chunk_begin)
+        symbols = np.tile(axiom_codes, m)
+        offsets = np.arange(m + 1, dtype=np.int64) * len(axiom_codes)
+        chunk_keys = None if keys is None else np.asarray(keys, dtype=np.uint64)[chunk_begin:chunk_begin + m]
+        for level in range(iterations):
+            symbols, offsets = rewrite_once(symbols, offsets, compiled, rng, chunk_keys, level)
+        results.extend(np.split(symbols, offsets[1:-1]))
+    return results
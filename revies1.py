@@ -1,119 +1,164 @@
+import argparse
+import functools
+
 import cv2
 import numpy as np
-from shapely.geometry import Polygon
-from shapely.ops import unary_union
-from scipy.stats import bootstrap
-import tqdm
+
+from mondrian.bootstrap import bootstrap, null_p_values
+from mondrian.colors import BLACK, PRIMARIES, color_area_ratios, label_colors, rect_color_fractions
+from mondrian.inverse import guillotine_decompose, score_profiles
+from mondrian.lines import detect_grid_lines, edge_map
+from mondrian.subdivision import line_segments, planar_subdivision
 
 # ---------- 0. 参数 ----------
 IMG_PATH = 'Piet_Mondriaan,_1930_-_Mondrian_Composition_II_in_Red,_Blue,_and_Yellow.jpg'   # 自行下载高清图
-RED_RANGE   = {'lower':(0,0,180), 'upper':(40,40,255)}   # BGR 空间红色区间
 AREA_RATIO_GOLDEN = 0.618
 N_BOOTSTRAP = 10000
 CONF_LEVEL  = 0.99
+SEED        = 42    # Bootstrap 的随机种子
+LINE_FACE_BLACK = 0.5   # 黑色像素超过此比例的面是线条本身，不计入色块统计
 
 # ---------- 1. 几何：矢量化 + DCEL ----------
-def build_dcel_and_stats(img_bgr):
-    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, 50, 150)
-
-    # 第一次试跑，阈值 2000
-    lines = cv2.HoughLines(edges, 1, np.pi/180, 2000)
-
-    # 如果没找到线，逐渐降阈值直到有结果
-    thresh = 2000
-    while lines is None and thresh > 100:
-        thresh -= 200
-        lines = cv2.HoughLines(edges, 1, np.pi/180, thresh)
-
-    # 极端情况：整张图就是空白，也返回空结构
-    if lines is None:
-        return [], np.array([]), {'pareto_ratio':0,
-                                  'direction_entropy':0,
-                                  'split_depth':0}
-
-    h_lines, v_lines = [], []
-    for rho, theta in lines[:, 0]:
-        if abs(theta) < 1*np.pi/180:      # 水平
-            h_lines.append(int(rho))
-        elif abs(theta - np.pi/2) < 1*np.pi/180:  # 竖直
-            v_lines.append(int(rho))
-
-    # 去重 + 排序
-    h_lines = sorted(set(h_lines))
-    v_lines = sorted(set(v_lines))
-
-    # —— 下面与原脚本完全一致 ——
-    rects, areas = [], []
-    H, W = img_bgr.shape[:2]
-    for y1, y2 in zip(h_lines[:-1], h_lines[1:]):
-        for x1, x2 in zip(v_lines[:-1], v_lines[1:]):
-            poly = Polygon([(x1, y1), (x2, y1), (x2, y2), (x1, y2)])
-            rects.append(poly)
-            areas.append(poly.area)
-    areas = np.array(areas)
-        # ===== 新增：防呆 =====
-    if areas.size == 0:          # 没有切出任何矩形
-        return rects, areas, {'pareto_ratio': 0.,
-                              'direction_entropy': 0.,
-                              'split_depth': 0.}
-    # =======================
+def build_dcel(img_bgr, line_method='projection', labels=None):
+    # 网格只有水平/竖直两个方向：一次行/列投影 (或只在 θ∈{0, π/2} 上的 Hough) 得到累加器，
+    # 不再逐次降低阈值重跑整幅 Hough 变换 (见 mondrian/lines.py)。
+    # 注意 θ≈0 的 Hough 直线是竖直线 x=ρ，θ≈π/2 才是水平线 y=ρ；原实现把两者标反了
+    # 只画到另一条线条为止的短线条票数很低：票数只作初筛，由黑色线条确认，画布 / 白边的边界随之去掉
+    if labels is None:
+        labels = label_colors(img_bgr)
+    black = labels == BLACK
+    h_lines, v_lines = detect_grid_lines(edge_map(img_bgr), method=line_method, black=black)
+
+    # 线条并不贯穿画布：沿每条网格线读取黑色线条实际画出的区段，扫描线合并没有被线条分隔的网格单元，
+    # 得到真实的矩形面 (n, 4) 的 (x1, y1, x2, y2) 及其相邻关系 (见 mondrian/subdivision.py)
+    horizontal, vertical = line_segments(black, h_lines, v_lines)
+    rects, areas, adjacency = planar_subdivision(horizontal, vertical, labels.shape)
+    return rects, areas, adjacency, (horizontal, vertical)
+
+def build_dcel_and_stats(img_bgr, line_method='projection', labels=None):
+    if labels is None:
+        labels = label_colors(img_bgr)
+    rects, areas, _, (horizontal, vertical) = build_dcel(img_bgr, line_method, labels)
+    # 粗黑线条的两条边缘各检测出一条网格线，线条本身也成为细长的面；只统计色块
+    fields = rect_color_fractions(labels, rects, ('black',))[:, 0] <= LINE_FACE_BLACK
+    rects, areas = rects[fields], areas[fields]
+    return rects, areas, grid_stats(areas, len(horizontal), len(vertical))
+
+def grid_stats(areas, num_h, num_v):
+    # 没有切出任何矩形 (包括整张图是空白) 时返回全 0
+    if areas.size == 0:
+        return {'pareto_ratio': 0.,
+                'direction_entropy': 0.,
+                'split_depth': 0.}
     # 1) 面积 Pareto
     areas_sorted = np.sort(areas)[::-1]
     cum = np.cumsum(areas_sorted)
     pareto_80 = np.searchsorted(cum, cum[-1]*0.8) + 1
     pareto_ratio = pareto_80 / len(areas)
-    # 2) 方向熵（这里只有 0°/90°，熵应接近 0）
-    angles = np.array([0]*len(h_lines) + [90]*len(v_lines))
-    counts = np.bincount(angles.astype(int), minlength=181)
-    prob = counts[counts>0] / counts.sum()
-    entropy = -np.sum(prob * np.log2(prob))
+    # 2) 方向熵（这里只有 0°/90° 两个方向）
+    counts = np.array([num_h, num_v])
+    prob = counts[counts > 0] / max(counts.sum(), 1)
+    # 只有一个方向时求和为 0，取负会得到 -0.0
+    entropy = 0.0 - np.sum(prob * np.log2(prob))
     # 3) 分割深度（简单二叉树深度）
-    depth = max(np.log2(len(h_lines)), np.log2(len(v_lines)))
-    return rects, areas, {'pareto_ratio':pareto_ratio,
-                          'direction_entropy':entropy,
-                          'split_depth':depth}
+    depth = np.log2(max(num_h, num_v, 1))
+    return {'pareto_ratio': pareto_ratio,
+            'direction_entropy': entropy,
+            'split_depth': depth}
 
 # ---------- 2. 数学：Bootstrap 检验 ----------
+def primary_area_ratios(img_bgr, rects, labels=None):
+    # 每幅图只做一次颜色分类 (红/黄/蓝/白/黑/灰)，每种颜色一张积分图，
+    # 每个矩形内各颜色的像素数 O(1) 得出 (见 mondrian/colors.py)；返回三原色各自的面积占比
+    if labels is None:
+        labels = label_colors(img_bgr)
+    return color_area_ratios(labels, rects, PRIMARIES)
+
 def red_area_ratio(img_bgr, rects):
-    mask_red = cv2.inRange(img_bgr, *RED_RANGE.values())
-    red_areas = []
-    for poly in rects:
-        # 取矩形中心点颜色作为代表
-        x,y = poly.centroid.coords[0]
-        if mask_red[int(y), int(x)] == 255:
-            red_areas.append(poly.area)
-    return np.sum(red_areas) / (img_bgr.shape[0]*img_bgr.shape[1])
-
-def bootstrap_test(obs_ratio):
-    # 构造虚拟总体：在 [0.1,0.9] 均匀分布里重采样
-    def sample_ratio(n, rng):
-        return rng.uniform(0.1, 0.9, size=n)
-    rng = np.random.default_rng(42)
-    data = sample_ratio(1000, rng)          # 大样本
-    # Bootstrap 采样均值
-    res = bootstrap((data,), np.mean, n_resamples=N_BOOTSTRAP,
-                    confidence_level=CONF_LEVEL, random_state=rng)
+    # 矩形内红色像素的精确面积 (原实现只看质心一个像素，红色就计入整块面积)
+    return primary_area_ratios(img_bgr, rects)['red']
+
+def _uniform_null(rng):
+    # 构造虚拟总体：在 [0.1,0.9] 均匀分布里抽 1000 个 (大样本)，再 Bootstrap 采样均值
+    data = rng.uniform(0.1, 0.9, size=1000)
+    res = bootstrap(data, np.mean, n_resamples=N_BOOTSTRAP,
+                    confidence_level=CONF_LEVEL, rng=rng)
+    return data, res
+
+@functools.lru_cache(maxsize=None)
+def _seeded_null(seed):
+    # 默认种子下零分布与观测值无关，所有画作共用同一份
+    return _uniform_null(np.random.default_rng(seed))
+
+def bootstrap_test(obs_ratio, rng=None):
+    # 向量化 Bootstrap (mondrian/bootstrap.py)，同一随机数生成器下与 scipy.stats.bootstrap 的结果一致
+    data, res = _seeded_null(SEED) if rng is None else _uniform_null(rng)
     ci_low, ci_high = res.confidence_interval
     # 单侧检验：观测值是否 > 0.618
     p_greater = (np.mean(data) > AREA_RATIO_GOLDEN).mean()
     return ci_low, ci_high, p_greater
 
-# ---------- 3. 主流程 ----------
-if __name__ == '__main__':
+def bootstrap_tests(obs_ratios, rng=None):
+    # 一组画作的观测占比一次与同一个 Bootstrap 零分布比较：
+    # 返回零分布的 CI 与每幅画的 P(零分布均值 >= 观测值)
+    data, res = _seeded_null(SEED) if rng is None else _uniform_null(rng)
+    ci_low, ci_high = res.confidence_interval
+    return ci_low, ci_high, null_p_values(obs_ratios, res.bootstrap_distribution, 'greater')
+
+# ---------- 3. 批量分析 ----------
+ANALYSIS_FIELDS = ('num_rects', 'pareto_ratio', 'direction_entropy', 'split_depth',
+                   'red_area_ratio', 'yellow_area_ratio', 'blue_area_ratio')
+
+def analyze_image(img_bgr):
+    # 一幅图像的几何与颜色统计 (批量分析时在工作进程中调用，键与 ANALYSIS_FIELDS 一致)
+    labels = label_colors(img_bgr)
+    rects, areas, stats = build_dcel_and_stats(img_bgr, labels=labels)
+    stats = {k: float(v) for k, v in stats.items()}
+    stats['num_rects'] = len(rects)
+    for name, ratio in primary_area_ratios(img_bgr, rects, labels).items():
+        stats[f'{name}_area_ratio'] = ratio
+    return stats
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='蒙德里安画作的几何与颜色统计')
+    parser.add_argument('inputs', nargs='*',
+                        help='图像文件、目录或通配符 (如 "composition_*.png")；不给出时只分析 IMG_PATH 并做 Bootstrap 检验')
+    parser.add_argument('--out', default='paintings.csv', help='批量分析的输出 CSV (已存在时续跑)')
+    parser.add_argument('--recursive', action='store_true', help='目录包括子目录')
+    parser.add_argument('--workers', type=int, default=None, help='分析进程数 (默认 CPU 核心数)')
+    parser.add_argument('--decode-threads', type=int, default=4, help='解码线程数')
+    return parser.parse_args(argv)
+
+def main_batch(args):
+    # 进程池、线程池与共享内存只在批量分析时才需要，按需导入
+    from mondrian.collection import expand_inputs, run_collection
+    paths = expand_inputs(args.inputs, recursive=args.recursive)
+    print(f'共找到 {len(paths)} 幅图像，结果写入 {args.out}')
+    report = run_collection(paths, args.out, analyze_image, ANALYSIS_FIELDS,
+                            workers=args.workers, decode_threads=args.decode_threads)
+    report.print_summary()
+
+# ---------- 4. 主流程 ----------
+def main_single():
     img = cv2.imread(IMG_PATH)
-    rects, areas, stats = build_dcel_and_stats(img)
-    if not rects:                # 还是空
+    labels = label_colors(img)
+    rects, areas, stats = build_dcel_and_stats(img, labels=labels)
+    if len(rects) == 0:          # 还是空
         print('[!] 没能检测到足够网格线，请：\n'
-              '   1) 把 cv2.HoughLines 阈值再调低；\n'
+              '   1) 给 detect_grid_lines 指定更低的 threshold；\n'
               '   2) 换一张更高清、对比度更强的 Mondrian 图。')
-        exit()
+        return
     print('=== 几何指标 ===')
     print(f'面积 Pareto 比例（块数占比）: {stats["pareto_ratio"]:.2f}')
     print(f'方向熵 (bits): {stats["direction_entropy"]:.3f}')
     print(f'分割深度 (log2): {stats["split_depth"]:.1f}')
 
-    obs_ratio = red_area_ratio(img, rects)
+    print(f'色块数: {len(rects)}')
+
+    ratios = primary_area_ratios(img, rects, labels)
+    print(f'三原色面积占比: 红 {ratios["red"]:.3f}，黄 {ratios["yellow"]:.3f}，蓝 {ratios["blue"]:.3f}')
+
+    obs_ratio = ratios['red']
     print('\n=== Bootstrap 检验 ===')
     print(f'观测红色面积占比: {obs_ratio:.3f}')
     ci_low, ci_high, p = bootstrap_test(obs_ratio)
@@ -122,4 +167,20 @@ if __name__ == '__main__':
     if obs_ratio > 0.618 and p < 0.01:
         print('→ 拒绝原假设，红色占比显著高于黄金分割！')
     else:
-        print('→ 无显著证据表明红色占比接近黄金分割。')
\ No newline at end of file
+        print('→ 无显著证据表明红色占比接近黄金分割。')
+
+    # 逆向：按贯穿的黑色线条递归切分画面，得到等价的 H/V/F 字符串，并按各版本的文法打分 (见 mondrian/inverse.py)
+    tree = guillotine_decompose(labels == BLACK)
+    print('\n=== 逆向推导 (断头台分解) ===')
+    print(f'L 系统字符串: {tree.l_string}')
+    print(f'叶子 {len(tree.leaves)} 个，深度 {tree.depth}，切割比例: '
+          + '、'.join(f'{r:.2f}' for r in tree.split_ratios))
+    for name, score in score_profiles(tree.l_string)[:3]:
+        print(f'  {name}: 对数概率 {score:.2f}')
+
+if __name__ == '__main__':
+    args = parse_args()
+    if not args.inputs:
+        main_single()
+    else:
+        main_batch(args)
\ No newline at end of file
@@ -0,0 +1,39 @@
+from mondrian.batch import BatchReport, run_batch
+from mondrian.engine import get_engine
+from mondrian.seeding import CompositionStreams
+
+ENGINE = get_engine('v2')
+
+
+def test_attempts_use_independent_streams():
+    first = CompositionStreams(3, 5)
+    assert CompositionStreams(3, 5, 0).derivation_key == first.derivation_key
+    again = CompositionStreams(3, 5, 1)
+    assert again.derivation_key != first.derivation_key
+    assert again.segment_key != first.segment_key
+    assert again.interpretation.random() != first.interpretation.random()
+    assert again.retry(1).derivation_key != first.retry(1).derivation_key
+
+
+def fail_first_attempt(l_string, streams):
+    # 只与随机数流有关的失败：用同一组流重试必然再次失败
+    if streams.attempt == 0:
+        raise RuntimeError("首次尝试失败")
+    return ENGINE.interpret(l_string, streams=streams)
+
+
+def test_retry_draws_a_new_composition(tmp_path):
+    report = run_batch(ENGINE.derive, fail_first_attempt, 4, tmp_path, seed=1, workers=1)
+    assert not report.failures
+    assert sorted(report.retried) == [(index, 1) for index in range(1, 5)]
+
+
+def test_per_image_reduction(capsys):
+    report = BatchReport(3, seed=1, workers=1)
+    report.add(1, 'ok', 10, 5, (0.0, 0.0, 0.0), None)
+    report.add(2, 'empty', 0, 0, (0.0, 0.0, 0.0), None)
+    report.add(3, 'ok', 20, 18, (0.0, 0.0, 0.0), None)
+    assert report.per_image == [(1, 10, 5), (3, 20, 18)]
+    assert [(index, round(r, 6)) for index, r in report.reductions()] == [(1, 0.5), (3, 0.1)]
+    report.print_summary()
+    assert "最少 10% (图像 3)" in capsys.readouterr().out
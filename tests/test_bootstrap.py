@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from mondrian.bootstrap import bootstrap
+
+stats = pytest.importorskip('scipy.stats')
+
+
+@pytest.mark.parametrize('method', ['BCa', 'percentile'])
+@pytest.mark.parametrize('statistic', [np.mean, np.median])
+def test_matches_scipy(method, statistic):
+    data = np.random.default_rng(1).exponential(size=300)
+    # 小内存预算使重采样分成多块，抽取的下标仍与 scipy 一次抽取的相同
+    ours = bootstrap(data, statistic, n_resamples=2000, confidence_level=0.99, method=method,
+                     rng=np.random.default_rng(42), memory_budget=1 << 16)
+    reference = stats.bootstrap((data,), statistic, n_resamples=2000, confidence_level=0.99, method=method,
+                                rng=np.random.default_rng(42))
+    assert np.array_equal(ours.bootstrap_distribution, reference.bootstrap_distribution)
+    assert ours.confidence_interval == pytest.approx(tuple(reference.confidence_interval), rel=1e-9)
+    assert ours.standard_error == pytest.approx(reference.standard_error, rel=1e-9)
@@ -0,0 +1,23 @@
+import numpy as np
+
+from mondrian.colors import (BLACK, BLUE, GREY, RED, RENDERED_WHITE_MIN_VALUE, WHITE, YELLOW,
+                             label_colors)
+from mondrian.profiles import DEEPER_GRAY, DEEPER_YELLOW
+from mondrian.render import color_to_rgb
+
+PALETTE = ['white', 'lightgray', '0.9', DEEPER_GRAY, 'black', 'red', 'yellow', DEEPER_YELLOW, 'blue']
+
+
+def labels(**kwargs):
+    rgb = np.array([[color_to_rgb(name) for name in PALETTE]], dtype=np.uint8)
+    return label_colors(np.ascontiguousarray(rgb[:, :, ::-1]), **kwargs).tolist()[0]
+
+
+def test_generator_palette_scan_threshold():
+    # 默认阈值针对扫描件偏暗的白色画布：'0.9' (明度 230) 与画布重叠，归入白色
+    assert labels() == [WHITE, GREY, WHITE, GREY, BLACK, RED, YELLOW, YELLOW, BLUE]
+
+
+def test_generator_palette_rendered_threshold():
+    assert labels(white_min_value=RENDERED_WHITE_MIN_VALUE) == [WHITE, GREY, GREY, GREY, BLACK,
+                                                                 RED, YELLOW, YELLOW, BLUE]
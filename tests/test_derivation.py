@@ -0,0 +1,41 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from mondrian.derivation import generate_l_system_string, iter_derivation
+from mondrian.profiles import get_profile, profile_names
+from mondrian.seeding import CompositionStreams, _splitmix_scalar, counter_uniforms, derivation_keys
+from mondrian.vectorized import decode_symbols, generate_l_system_batch
+
+
+@pytest.mark.parametrize('name', profile_names())
+def test_vectorised_matches_serial(name):
+    profile = get_profile(name)
+    indices = range(40)
+    # chunk_size 小于构图数，同时检验分块
+    batch = generate_l_system_batch('S', profile.rules, profile.iterations, len(indices),
+                                    keys=derivation_keys(5, indices), chunk_size=16)
+    for index, symbols in zip(indices, batch):
+        expected = generate_l_system_string('S', profile.rules, profile.iterations,
+                                            streams=CompositionStreams(5, index))
+        assert decode_symbols(symbols) == expected
+
+
+@pytest.mark.parametrize('name', profile_names())
+def test_depth_first_matches_serial(name):
+    profile = get_profile(name)
+    for index in range(40):
+        expected = generate_l_system_string('S', profile.rules, profile.iterations,
+                                            streams=CompositionStreams(5, index))
+        assert ''.join(iter_derivation('S', profile.rules, profile.iterations,
+                                       CompositionStreams(5, index))) == expected
+
+
+def test_counter_uniforms_scalar_wraps_silently():
+    key, stream, position = 12345678901234567, 3, 7
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        scalar = counter_uniforms(key, stream, position)
+        array = counter_uniforms(np.array([key], dtype=np.uint64), stream, np.array([position]))
+    assert scalar == array[0] == _splitmix_scalar(key, (stream << 40) + position + 1)
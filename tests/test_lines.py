@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from mondrian.colors import BLACK, label_colors
+from mondrian.lines import detect_grid_lines, edge_map
+from mondrian.rects import RectBatch
+from mondrian.render import DEFAULT_PAD, DEFAULT_SIZE, render_rects
+
+ROOT = Path(__file__).resolve().parent.parent
+LINE = 0.005
+
+
+def t_junctions():
+    """
+    一条贯穿的水平线，其余线条都只画到另一条线条为止：
+    下半部分一条竖直线，上半部分一条竖直线及其右侧的一条短水平线。
+    """
+    batch = RectBatch()
+    batch.add(0.0, 0.0, 0.3, 0.5, 'red')
+    batch.add(0.6, 0.75, 0.4, 0.25, 'blue')
+    batch.add(0.0, 0.5, 1.0, LINE, 'black')
+    batch.add(0.3, 0.0, LINE, 0.5, 'black')
+    batch.add(0.6, 0.5, LINE, 0.5, 'black')
+    batch.add(0.6, 0.75, 0.4, LINE, 'black')
+    # 线条中心的像素坐标 (行号自上而下)
+    rows = [DEFAULT_PAD + DEFAULT_SIZE - round((y + LINE / 2) * DEFAULT_SIZE) for y in (0.75, 0.5)]
+    cols = [DEFAULT_PAD + round((x + LINE / 2) * DEFAULT_SIZE) for x in (0.3, 0.6)]
+    return np.ascontiguousarray(render_rects(batch)[:, :, ::-1]), rows, cols
+
+
+def assert_lines(found, expected, tolerance=4):
+    assert len(found) == len(expected), (found, expected)
+    for position, line in zip(found, expected):
+        assert abs(position - line) <= tolerance, (found, expected)
+
+
+def test_partial_lines_are_detected():
+    img, rows, cols = t_junctions()
+    h_lines, v_lines = detect_grid_lines(edge_map(img), black=label_colors(img) == BLACK)
+    assert_lines(h_lines, rows)
+    assert_lines(v_lines, cols)
+
+
+def test_scanned_composition():
+    # composition_001 的线条大多只画到另一条线条为止；四周是 10 像素的白边
+    img = cv2.imread(str(ROOT / 'composition_001.png'))
+    h_lines, v_lines = detect_grid_lines(edge_map(img), black=label_colors(img) == BLACK)
+    for row in (47, 133, 163, 422):
+        assert min(abs(position - row) for position in h_lines) <= 3, h_lines
+    last = DEFAULT_SIZE + DEFAULT_PAD
+    for position in h_lines + v_lines:
+        assert abs(position - DEFAULT_PAD) > 3 and abs(position - last) > 3
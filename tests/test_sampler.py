@@ -0,0 +1,22 @@
+import pytest
+
+from mondrian.engine import get_engine
+
+
+class ConstantStreams:
+    """每次都给出同一个“随机数”的推导流 (模拟 draw() * 总权重 舍入到总权重的最坏情况)。"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def draws(self, stream):
+        return lambda: self.value
+
+
+@pytest.mark.parametrize('value', [0.0, 0.5, 1.0])
+def test_length_window_at_extreme_draws(value):
+    engine = get_engine('v10_boogie_woogie')
+    sampler = engine.length_sampler
+    l_string = sampler.sample(ConstantStreams(value))
+    assert engine.profile.min_length <= len(l_string) <= engine.profile.max_length
+    assert ''.join(sampler.iter_sample(ConstantStreams(value))) == l_string
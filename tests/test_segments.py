@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from mondrian.engine import get_engine
+from mondrian.rects import RectBatch
+from mondrian.render import render_indices
+from mondrian.seeding import CompositionStreams
+from mondrian.segments import merge_segments
+
+
+@pytest.mark.parametrize('name', ['v10_boogie_woogie', 'v11_boogie_woogie'])
+def test_merge_keeps_pixels(name):
+    engine = get_engine(name)
+    for index in range(20):
+        rects = engine.compose(CompositionStreams(0, index))
+        merged = merge_segments(rects)
+        assert 0 < len(merged) <= len(rects)
+        assert np.array_equal(render_indices(merged), render_indices(rects))
+
+
+def test_merge_keeps_white_background():
+    # analyze9.py 的构图在第一个区域过大时整块留白并终止
+    rects = RectBatch()
+    rects.add(0.0, 0.0, 1.0, 1.0, 'white')
+    merged = merge_segments(rects)
+    assert len(merged) == 1 and merged.color_names() == ['white']
@@ -0,0 +1,33 @@
+import math
+
+import numpy as np
+import pytest
+
+from mondrian.engine import MondrianEngine
+from mondrian.profiles import get_profile
+from mondrian.render import render_rects
+from mondrian.seeding import CompositionStreams
+from revies1 import build_dcel_and_stats, grid_stats
+
+
+def render(profile, seed, index):
+    engine = MondrianEngine(get_profile(profile))
+    streams = CompositionStreams(seed, index)
+    batch = engine.interpret(engine.derive(streams), streams=streams)
+    return batch, np.ascontiguousarray(render_rects(batch)[:, :, ::-1])
+
+
+@pytest.mark.parametrize('index', [2, 14, 28])
+def test_faces_match_generated_composition(index):
+    batch, img = render('v2', 0, index)
+    black = np.array(batch.color_names()) == 'black'
+    # 每条线条把一个矩形分成两个：n 条线条、n + 1 个面 (未展开的 S 留白，也是一个面)
+    lines = np.flatnonzero(black)
+    assert np.any((batch.w[lines] < 0.99) & (batch.h[lines] < 0.99)), "需要有不贯穿画布的线条 (T 形交点)"
+    rects, _, _ = build_dcel_and_stats(img)
+    assert len(rects) == len(lines) + 1
+
+
+def test_direction_entropy_of_one_direction_is_positive_zero():
+    entropy = grid_stats(np.array([0.5, 0.5]), 1, 0)['direction_entropy']
+    assert entropy == 0.0 and math.copysign(1.0, entropy) == 1.0